@@ -1,5 +1,6 @@
 from .version import __version__  # noqa
 from .buildsimhub import BuildSimHubAPIClient
+from .async_buildsimhub import AsyncBuildSimHubAPIClient
 
 import BuildSimHubAPI.htmlParser
 import BuildSimHubAPI.helpers
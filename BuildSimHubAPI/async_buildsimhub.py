@@ -0,0 +1,129 @@
+"""
+This file provides the asyncio BuildSim API client
+
+It has the same methods as BuildSimHubAPIClient, but every network call is a coroutine
+running on a non-blocking transport, so one process can keep many result requests in flight:
+
+bsh = AsyncBuildSimHubAPIClient(concurrency=50)
+models = await asyncio.gather(*[bsh.model_results(project_key, key) for key in model_keys])
+euis = await asyncio.gather(*[model.net_site_eui() for model in models])
+"""
+
+from BuildSimHubAPI import helpers
+from BuildSimHubAPI.helpers.async_httpurllib import AsyncTransport
+from BuildSimHubAPI.helpers.async_httpurllib import request_large_data
+from BuildSimHubAPI.logger import BuildSimLogger
+
+
+class AsyncBuildSimHubAPIClient(object):
+
+    def __init__(self, base_url=None, logger=False, concurrency=20, vendor_id=None, retry_policy=None,
+                 circuit_breaker=None):
+        """
+        Construct asyncio BuildSimHub API object
+
+        :param base_url: optional, the base_url in info.config is used if None
+        :param logger: True to log the API calls
+        :param concurrency: maximum number of requests in flight at the same time
+        :param vendor_id: optional, overrides the configured vendor_id for this client
+        :param retry_policy: optional, the RetryPolicy of this client's requests
+        :param circuit_breaker: optional, the CircuitBreaker of this client's requests
+        :type concurrency: int
+        """
+        info = helpers.bldgsim_info.MetaInfo()
+        if logger is True:
+            self._logger = BuildSimLogger()
+        else:
+            self._logger = None
+
+        if base_url is None:
+            self._base_url = info.base_url
+        else:
+            self._base_url = base_url
+
+        if vendor_id is None and retry_policy is None and circuit_breaker is None:
+            session = helpers.get_default_session()
+        else:
+            session = helpers.Session(vendor_id, retry_policy, circuit_breaker)
+        self._transport = AsyncTransport(concurrency, session=session)
+
+    @property
+    def transport(self):
+        return self._transport
+
+    def request_stats(self):
+        """
+        Retry and circuit breaker metrics of this client's requests, see BuildSimHubAPIClient.request_stats
+
+        :rtype: dict
+        """
+        return self._transport.session.stats()
+
+    async def model_results(self, project_key, model_key):
+        """
+        retrieve a model's results based on project key and model key
+
+        :param project_key: the key to access the project
+        :param model_key: the key to access the model
+        :return: the model results
+        :rtype: AsyncModel
+        """
+        results = helpers.AsyncModel(project_key, model_key, self._base_url, self._logger, self._transport)
+        return await results.resolve()
+
+    def parametric_results(self, project_key, model_key):
+        """
+        retrieve a parametric study results based on project key and model key
+
+        :return: the parametric results
+        :rtype: AsyncParametricModel
+        """
+        return helpers.AsyncParametricModel(project_key, model_key, self._base_url, self._logger, self._transport)
+
+    def new_simulation_job(self, project_key):
+        """
+        Generate a new simulation job
+
+        :rtype: AsyncSimulationJob
+        """
+        return helpers.AsyncSimulationJob(project_key, self._base_url, self._logger, self._transport)
+
+    def new_parametric_job(self, project_key, model_key=""):
+        """
+        Generate a new parametric job
+
+        :rtype: AsyncParametricJob
+        """
+        return helpers.AsyncParametricJob(project_key, model_key, self._base_url, self._logger, self._transport)
+
+    async def model_list(self, project_key, model_key):
+        """
+        This method retrieves all the model history of one model
+
+        :param project_key:
+        :param model_key:
+        :return:
+        """
+        url = self._base_url + 'GetModelHistoryKey_API'
+        payload = {
+            'project_api_key': project_key,
+            'folder_api_key': model_key
+        }
+        return await request_large_data(url, payload, self._transport)
+
+    async def project_model_list(self, project_key):
+        """
+        This method retrieves all the model information under a project
+
+        :param project_key:
+        :return:
+        """
+        url = self._base_url + 'GetModelList_API'
+        payload = {
+            'project_api_key': project_key
+        }
+        return await request_large_data(url, payload, self._transport)
+
+    async def close(self):
+        """close the idle connections of this client"""
+        await self._transport.close()
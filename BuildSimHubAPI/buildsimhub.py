@@ -11,6 +11,7 @@ This file provides the BuildSim API client
 
 from BuildSimHubAPI import helpers
 from BuildSimHubAPI.helpers.httpurllib import request_large_data
+from BuildSimHubAPI.helpers.httpurllib import iter_large_data
 from BuildSimHubAPI.logger import BuildSimLogger
 # from BuildSimHubAPI.helpers.network_connectivity import internet
 
@@ -29,12 +30,23 @@ class BuildSimHubAPIClient(object):
 
     """
 
-    def __init__(self, base_url=None, logger=False):
+    def __init__(self, base_url=None, logger=False, vendor_id=None, retry_policy=None, circuit_breaker=None,
+                 upload_cache=None, result_cache=None):
         """
         Construct BuildSimHub API object
 
         user_api and base_url should specified in the info.config
-        in the API package
+        in the API package, or in the BUILDSIMHUB_BASE_URL / BUILDSIMHUB_VENDOR_ID
+        environment variables
+
+        :param base_url: optional, overrides the configured base_url
+        :param vendor_id: optional, overrides the configured vendor_id for this client
+        :param retry_policy: optional, the RetryPolicy of this client's requests
+        :param circuit_breaker: optional, the CircuitBreaker of this client's requests
+        :param upload_cache: optional, True or an UploadCache - repeat uploads of the same model files
+            are copied on the server instead of sent again
+        :param result_cache: optional, True or a ResultCache - the results of completed simulations
+            are kept on disk and not requested again
         """
         info = helpers.bldgsim_info.MetaInfo()
         if logger is True:
@@ -47,6 +59,17 @@ class BuildSimHubAPIClient(object):
         else:
             self._base_url = base_url
 
+        # the request headers are built once for all the helpers of this client
+        if upload_cache is True:
+            upload_cache = helpers.UploadCache()
+        if result_cache is True:
+            result_cache = helpers.ResultCache()
+        if vendor_id is None and retry_policy is None and circuit_breaker is None and upload_cache is None \
+                and result_cache is None:
+            self._session = helpers.get_default_session()
+        else:
+            self._session = helpers.Session(vendor_id, retry_policy, circuit_breaker, upload_cache, result_cache)
+
         # Check internet connection - this code is not using in the API library for now
         # if not internet():
         #    print("Cannot connect with internet - please check your internet settings")
@@ -55,6 +78,20 @@ class BuildSimHubAPIClient(object):
         # else:
         #     print("Connected with internet - Lets start!")
 
+    @property
+    def session(self):
+        return self._session
+
+    def request_stats(self):
+        """
+        Retry and circuit breaker metrics of this client's requests
+
+        :return: retries, exhausted (requests that failed after all their retries),
+            trips (times a circuit opened), rejected (requests failed fast) and open_hosts
+        :rtype: dict
+        """
+        return self._session.stats()
+
     def model_results(self, project_key, model_key):
         """
         retrieve a model's results based on project key and model key
@@ -64,7 +101,7 @@ class BuildSimHubAPIClient(object):
         a7ce63-0e58-4efc-93f3-73b7ddaa0 or 111-111-111
         :return: the model results
         """
-        results = helpers.Model(project_key, model_key, self._base_url, self._logger)
+        results = helpers.Model(project_key, model_key, self._base_url, self._logger, self._session)
         return results
 
     def parametric_results(self, project_key, model_key):
@@ -76,7 +113,7 @@ class BuildSimHubAPIClient(object):
         :return: the parametric results
 
         """
-        results = helpers.ParametricModel(project_key, model_key, self._base_url)
+        results = helpers.ParametricModel(project_key, model_key, self._base_url, session=self._session)
         return results
 
     def new_simulation_job(self, project_key):
@@ -88,7 +125,7 @@ class BuildSimHubAPIClient(object):
         :rtype: SimulationJob or None
 
         """
-        sj = helpers.simulation_job.SimulationJob(project_key, self._base_url, self._logger)
+        sj = helpers.simulation_job.SimulationJob(project_key, self._base_url, self._logger, self._session)
         return sj
 
     def new_parametric_job(self, project_key, model_key=""):
@@ -100,9 +137,21 @@ class BuildSimHubAPIClient(object):
         :return: a parametric job object
         :rtype: ParametricJob or None
         """
-        pj = helpers.parametric_job.ParametricJob(project_key, model_key, self._base_url, self._logger)
+        pj = helpers.parametric_job.ParametricJob(project_key, model_key, self._base_url, self._logger,
+                                                  self._session)
         return pj
 
+    def new_job_tracker(self, project_key, max_workers=8):
+        """
+        Generate a job tracker that tracks many simulations / parametric studies at once
+
+        :param project_key: required
+        :param max_workers: maximum number of tracking requests in flight
+        :return: a job tracker object
+        :rtype: JobTracker
+        """
+        return helpers.JobTracker(project_key, self._base_url, self._logger, self._session, max_workers)
+
     def model_list(self, project_key, model_key):
         """
         This method retrieves all the model history of one model
@@ -119,7 +168,7 @@ class BuildSimHubAPIClient(object):
             'folder_api_key': model_key
         }
 
-        data_list = request_large_data(url, params=payload)
+        data_list = request_large_data(url, params=payload, session=self._session)
         return data_list
 
     def project_model_list(self, project_key):
@@ -133,9 +182,37 @@ class BuildSimHubAPIClient(object):
         payload = {
             'project_api_key': project_key
         }
-        data_list = request_large_data(url, params=payload)
+        data_list = request_large_data(url, params=payload, session=self._session)
         return data_list
 
+    def iter_model_list(self, project_key, model_key):
+        """
+        Streaming version of model_list, the model information is yielded page by page
+
+        :param project_key:
+        :param model_key:
+        :return: generator of model information
+        """
+        url = self._base_url + 'GetModelHistoryKey_API'
+        payload = {
+            'project_api_key': project_key,
+            'folder_api_key': model_key
+        }
+        return iter_large_data(url, params=payload, session=self._session)
+
+    def iter_project_model_list(self, project_key):
+        """
+        Streaming version of project_model_list, the model information is yielded page by page
+
+        :param project_key:
+        :return: generator of model information
+        """
+        url = self._base_url + 'GetModelList_API'
+        payload = {
+            'project_api_key': project_key
+        }
+        return iter_large_data(url, params=payload, session=self._session)
+
     @staticmethod
     def compare_models(src_model, target_model):
         """
@@ -1,4 +1,6 @@
 from .bldgsim_info import MetaInfo
+from .bldgsim_info import configure_meta_info
+from .bldgsim_info import invalidate_meta_info
 from .energy_model import Model
 from .parametric_model import ParametricModel
 from .parametric_job import ParametricJob
@@ -7,4 +9,24 @@ from .simulation_type import SimulationType
 from .class_template import ClassTemplate
 from .design_template import DesignTemplate
 from .eplus_object import EnergyPlusObject
+from .job_tracker import JobTracker
 
+from .connection_pool import ConnectionPool
+from .connection_pool import get_connection_pool
+from .connection_pool import configure_connection_pool
+from .compression import CompressionStats
+from .compression import get_compression_stats
+from .streaming_response import StreamingResponse
+from .session import Session
+from .session import get_default_session
+from .retry import RetryPolicy
+from .retry import CircuitBreaker
+from .retry import CircuitOpenError
+from .upload_cache import UploadCache
+from .result_cache import ResultCache
+from .add_files_zip import AddFilesZipCache
+from .add_files_zip import get_add_files_zip_cache
+from .async_energy_model import AsyncModel
+from .async_parametric_model import AsyncParametricModel
+from .async_simulation_job import AsyncSimulationJob
+from .async_parametric_job import AsyncParametricJob
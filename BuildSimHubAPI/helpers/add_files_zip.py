@@ -0,0 +1,124 @@
+"""
+The add_files folder of a simulation zipped in memory.
+
+Every upload gets its own file object over the archive bytes, so concurrent jobs
+don't share a file on disk and nothing is written to the package directory.
+The archive of a folder is kept and reused until a file of the folder is added,
+removed or modified (the listing, sizes and modification times are compared).
+"""
+import io
+import os
+import zipfile
+import threading
+from collections import OrderedDict
+
+# the file name the server receives
+ZIP_NAME = 'add_folder.zip'
+
+
+class AddFilesZipCache(object):
+
+    def __init__(self, max_entries=16, max_bytes=64 * 1024 * 1024):
+        """
+        Construct an archive cache
+
+        :param max_entries: maximum number of folders kept, the least recently used are dropped first
+        :param max_bytes: maximum total size of the archives kept, a larger archive is built for every upload
+        :type max_entries: int
+        :type max_bytes: int
+        """
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # folder -> (signature, archive bytes), least recently used first
+        self._archives = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    def archive(self, path):
+        """
+        Zip a folder
+
+        :param path: the add_files folder
+        :return: a new file object over the archive, named add_folder.zip
+        :rtype: io.BytesIO
+        """
+        key = os.path.abspath(path)
+        signature = self.__signature(key)
+        with self._lock:
+            cached = self._archives.get(key)
+            if cached is not None and cached[0] == signature:
+                self._archives.move_to_end(key)
+                self._hits += 1
+                return self.__open(cached[1])
+            self._misses += 1
+
+        data = self.__zip(key, signature)
+
+        with self._lock:
+            old = self._archives.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+            if len(data) <= self._max_bytes:
+                self._archives[key] = (signature, data)
+                self._size += len(data)
+                while len(self._archives) > self._max_entries or self._size > self._max_bytes:
+                    folder, entry = self._archives.popitem(last=False)
+                    self._size -= len(entry[1])
+        return self.__open(data)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'entries': len(self._archives),
+                    'bytes': self._size}
+
+    def clear(self):
+        with self._lock:
+            self._archives = OrderedDict()
+            self._size = 0
+
+    @staticmethod
+    def __signature(path):
+        signature = list()
+        for root, dirs, files in os.walk(path):
+            # os.walk order depends on the file system
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                stat = os.stat(file_path)
+                signature.append((os.path.relpath(file_path, path), stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    @staticmethod
+    def __zip(path, signature):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for rel_path, size, mtime in signature:
+                # the files are flattened into the root of the archive
+                zipf.write(os.path.join(path, rel_path), arcname=os.path.basename(rel_path))
+        return buf.getvalue()
+
+    @staticmethod
+    def __open(data):
+        f = io.BytesIO(data)
+        f.name = ZIP_NAME
+        return f
+
+
+_zip_cache = AddFilesZipCache()
+
+
+def get_add_files_zip_cache():
+    """The archive cache shared by all the jobs of the process"""
+    return _zip_cache
+
+
+def zip_add_files(path):
+    """
+    Zip the add_files folder of a simulation for upload
+
+    :param path: the add_files folder
+    :return: a new file object over the archive, named add_folder.zip
+    """
+    return _zip_cache.archive(path)
@@ -0,0 +1,607 @@
+import re
+import json
+import asyncio
+from collections import OrderedDict
+from .async_httpurllib import request_get
+from .energy_model import RESULT_METRICS
+from .energy_model import _results_frame
+from .energy_model import _hourly_frame
+
+
+class AsyncModel(object):
+    # every call will connect to this base URL
+    BASE_URL = 'https://my.buildsim.io/'
+
+    def __init__(self, project_api_key, track_token, base_url=None, logger=None, transport=None):
+        """
+        Construct asyncio Model object
+
+        The async twin of Model for retrieving model info and simulation results,
+        every result method is a coroutine and returns the same data as Model:
+
+        model = await bsh.model_results(project_api_key, model_api_key)
+        eui, area = await asyncio.gather(model.net_site_eui(), model.gross_floor_area())
+
+        :param project_api_key: required
+        :param track_token: required - track_token and model_api_key can be used interchangeably,
+            a model_api_key is resolved to its latest track_token by resolve()
+        :param base_url: optional, this is only for testing purpose
+        :param logger: a buildsim logger object - None means no log
+        :param transport: the AsyncTransport to send requests, None uses the shared one
+        :type project_api_key: str
+        :type track_token: str
+        """
+        self._project_api_key = project_api_key
+        self._last_parameter_unit = ""
+        self._track_token = track_token
+        self._base_url = AsyncModel.BASE_URL
+        self._logger = None
+        self._transport = transport
+
+        if logger is not None:
+            self._logger = logger
+
+        if base_url is not None:
+            self._base_url = base_url
+
+    @property
+    def project_api_key(self):
+        return self._project_api_key
+
+    @property
+    def track_token(self):
+        return self._track_token
+
+    @property
+    def last_parameter_unit(self):
+        """The unit of data that retrieved from the latest API call"""
+        return self._last_parameter_unit
+
+    async def resolve(self):
+        """if this is model api key, we will record the commit id"""
+        test = self._track_token.split('-')
+        if len(test) == 3:
+            return self
+
+        url = self._base_url + 'GetFirstModelOfBranch_API'
+        payload = {
+            'project_api_key': self._project_api_key,
+            'folder_api_key': self._track_token
+        }
+        r = await request_get(url, payload, self._transport)
+        resp_json = r.json()
+        if r.status_code > 200:
+            try:
+                print('Code: ' + str(r.status_code) + ' message: ' + resp_json['error_msg'])
+            except TypeError:
+                print(resp_json)
+            return self
+        if resp_json['status'] == 'success':
+            self._track_token = resp_json['commit_id']
+            print('find the track token...' + self._track_token)
+        return self
+
+    async def get_design_day_condition(self):
+        """
+        Get the design condition of the energy model
+
+        :return: design in dict data structure with cooling, heating and site keys
+        """
+        url = self._base_url + 'GetDesignDayData_API'
+        payload = self.__payload()
+        r = await request_get(url, payload, self._transport)
+        resp_json = r.json()
+        self.__log('DesignDay', r.status_code, 'design_day')
+
+        if r.status_code > 200:
+            return self.__print_error(r, resp_json)
+        if resp_json['status'] == 'success':
+            self._last_parameter_unit = ''
+            design = dict()
+            design['cooling'] = resp_json['cooling_design_day']
+            design['heating'] = resp_json['heating_design_day']
+            design['site'] = resp_json['site']
+            return design
+        else:
+            return -1
+
+    async def zone_info(self, zone_name):
+        """Get a zone's information regarding lighting, people, equipment, HVAC systems"""
+        data = await self.__basic_info('ZoneInfo', 'ZoneInfo', zone_name)
+        if isinstance(data, dict):
+            self._last_parameter_unit = ''
+            return data['value']
+        return data
+
+    async def zone_list(self):
+        """Get the list of zones in the model"""
+        data = await self.__basic_info('ZoneList', 'ZoneList')
+        if isinstance(data, dict):
+            self._last_parameter_unit = ''
+            return data['array']
+        return data
+
+    async def bldg_orientation(self):
+        """Get the building orientation."""
+        data = await self.__basic_info('Orientation', 'BuildingOrientation')
+        if isinstance(data, dict):
+            self._last_parameter_unit = 'deg'
+            return data['value']
+        return data
+
+    async def num_above_ground_floor(self):
+        """Estimate the number of floors above the ground"""
+        data = await self.__basic_info('BuildingStories', 'NumberAboveGroundFloor')
+        if isinstance(data, dict):
+            data = data['value']
+            self._last_parameter_unit = 'floor'
+            if 'total_cond_floor' in data:
+                return data['total_cond_floor']
+            else:
+                print(data)
+                return False
+        return data
+
+    async def num_total_floor(self):
+        """Total floor = above ground floors + below ground floors"""
+        data = await self.__basic_info('BuildingStories', 'NumberTotalFloor')
+        if isinstance(data, dict):
+            self._last_parameter_unit = 'floor'
+            return data['value']['total_floor']
+        return data
+
+    async def num_zones(self):
+        """Include conditioned & unconditioned zones"""
+        data = await self.__basic_info('TotalZoneNumber', 'NumZone')
+        if isinstance(data, dict):
+            self._last_parameter_unit = 'zones'
+            return data['value']
+        return data
+
+    async def num_condition_zones(self):
+        """Conditioned zones only"""
+        data = await self.__basic_info('ConditionedZoneNumber', 'NumConditionedZones')
+        if isinstance(data, dict):
+            self._last_parameter_unit = 'zones'
+            return data['value']
+        return data
+
+    async def condition_floor_area(self, unit='si'):
+        """Total conditioned floor area"""
+        data = await self.__basic_info('ConditionedZoneFloorArea', 'ConditionedFloorArea')
+        if isinstance(data, dict):
+            return self.__floor_area(float(data['value']), unit)
+        return data
+
+    async def gross_floor_area(self, unit='si'):
+        """Total floor area"""
+        data = await self.__basic_info('ZoneFloorArea', 'GrossFloorArea')
+        if isinstance(data, dict):
+            return self.__floor_area(float(data['value']), unit)
+        return data
+
+    async def window_wall_ratio(self):
+        """Window to wall ratio"""
+        data = await self.__basic_info('TotalWindowToWallRatio', 'WindowWallRatio')
+        if isinstance(data, dict):
+            self._last_parameter_unit = ""
+            return data['value']
+        return data
+
+    async def zone_load(self, zone_name=None):
+        """
+        Zone load list. If a zone_name is provided, then a detail
+        zone load components will be returned
+        """
+        url = self._base_url + 'GetZoneLoadInfo_API'
+        payload = self.__payload()
+        if zone_name is not None:
+            payload['zone_name'] = zone_name
+
+        r = await request_get(url, payload, self._transport)
+        resp_json = r.json()
+        self.__log('ZoneLoad', r.status_code, 'zone_load: ' + str(zone_name))
+
+        if r.status_code > 200:
+            return self.__print_error(r, resp_json)
+        if resp_json['status'] == 'success':
+            return resp_json['data']
+        else:
+            return -1
+
+    async def get_simulation_results(self, result_type="html", accept='file'):
+        """
+        get a simulation result file (only use after the simulation is completed)
+
+        :param result_type: currently available option include html, err, eso, eio, rdd
+        :param accept:
+        :return: text of the file, or error code
+        """
+        url = self._base_url + 'GetSimulationResult_API'
+        payload = self.__payload()
+        payload['result_type'] = result_type
+        payload['accept'] = accept
+
+        r = await request_get(url, payload, self._transport)
+        self.__log('SimulationResults', r.status_code, 'simulation_results: ' + result_type)
+        if r.status_code == 200:
+            if accept == 'string':
+                res = json.loads(r.json())
+                return res['file_name'], res['data']
+            else:
+                return r.json()
+        else:
+            return self.__print_error(r, r.json())
+
+    async def get_value(self, class_label, field_label=None, field_index=None, class_name=None):
+        """Retrieve the value of a specific object, see Model.get_value"""
+        url = self._base_url + 'GetSingleValueFromModel_API'
+        payload = self.__payload()
+        payload['class_label'] = class_label
+        payload['field_key'] = "" if field_label is None else field_label
+        payload['field_index'] = "" if field_index is None else str(field_index)
+        payload['class_name'] = "" if class_name is None else class_name
+
+        r = await request_get(url, payload, self._transport)
+        self.__log('GetValue', r.status_code, 'value from: ' + class_label)
+        if r.status_code == 200:
+            return r.json()['data']['value']
+        else:
+            self.__print_error(r, r.json())
+            return False
+
+    async def get_class(self, class_label, class_name=None):
+        """Retrieve the data under a class in EnergyPlus file, see Model.get_class"""
+        url = self._base_url + 'GetObjectsFromModel_API'
+        payload = self.__payload()
+        payload['class_label'] = class_label
+        payload['class_name'] = "" if class_name is None else class_name
+
+        r = await request_get(url, payload, self._transport)
+        self.__log('GetClass', r.status_code, 'class from: ' + class_label)
+        if r.status_code == 200:
+            return r.json()['data']
+        else:
+            self.__print_error(r, r.json())
+            return False
+
+    async def download_model(self):
+        """Download the latest history of the model"""
+        url = self._base_url + 'GetModel_API'
+        r = await request_get(url, self.__payload(), self._transport)
+        self.__log('DownloadModel', r.status_code, 'download_model')
+        if r.status_code == 200:
+            return r.json()
+        else:
+            self.__print_error(r, r.json())
+            return False
+
+    async def hourly_data(self, data=None):
+        """Hourly data of an output variable, or the variable list if data is None"""
+        url = self._base_url + 'GetHourlyVariableFromEso_API'
+        payload = self.__payload()
+        if data is not None:
+            payload['variable'] = data
+
+        r = await request_get(url, payload, self._transport)
+        self.__log('HourlyData', r.status_code, 'hourly_data')
+        if r.status_code == 200:
+            data_array = r.json()['data']
+            if data is None:
+                return data_array['variableList']
+            return data_array['value'][data]
+        else:
+            self.__print_error(r, r.json())
+            return False
+
+    async def hourly_frame(self, variables=None, memmap_path=None):
+        """
+        Get the hourly data of many variables at once, the requests are sent concurrently, see Model.hourly_frame
+
+        :return: DataFrame with a timestamp column and one column per variable, or HourlySeries if memmap_path
+        """
+        if variables is None:
+            variables = await self.hourly_data()
+            if variables is False:
+                return False
+        if len(variables) == 0:
+            return False
+        fetched = await asyncio.gather(*[self.hourly_data(variable) for variable in variables])
+        return _hourly_frame(zip(variables, fetched), memmap_path)
+
+    async def html_table(self, report, table, report_for='EntireFacility'):
+        """
+        get an HTML table for plot
+        :param report: report name e.g. Annual Building Utility Performance Summary
+        :param table: table name e.g. End Uses
+        :param report_for: typically it is EntireFacility, but with some exceptions
+        """
+        url = self._base_url + 'GetTableFromHTML_API'
+        table_id = re.sub(r'\W', '', report) + ":" + re.sub(r'\W', '', report_for) + ":" + re.sub(r'\W', '', table)
+        payload = self.__payload()
+        payload['table_name'] = table_id
+
+        r = await request_get(url, payload, self._transport)
+        self.__log('HTMLTable', r.status_code, report + ' ' + table)
+        if r.status_code == 200:
+            return r.json()
+        else:
+            self.__print_error(r, r.json())
+            return False
+
+    async def monthly_electricity(self):
+        return await self.__monthly_call_api('ElectricityMonthly')
+
+    async def monthly_hvac_air_system_load(self, air_system=None):
+        return await self.__monthly_call_api('HVACAirSystemLoadsMonthly', air_system)
+
+    async def monthly_hvac_system_energy(self):
+        return await self.__monthly_call_api('HVACSystemEnergyMonthly')
+
+    async def monthly_natural_gas(self):
+        return await self.__monthly_call_api('NaturalGasMonthly')
+
+    async def monthly_occupant_comfort_zone(self, zone=None):
+        return await self.__monthly_call_api('OccupantComfortZoneMonthly', zone)
+
+    async def monthly_outdoor_air_zone(self, zone=None):
+        return await self.__monthly_call_api('OutdoorAirZoneMonthly', zone)
+
+    async def monthly_setpoint_not_met_zone(self, zone=None):
+        return await self.__monthly_call_api('SetpointNotMetZoneMonthly', zone)
+
+    async def results(self, metrics=None, as_frame=False):
+        """
+        Get many result metrics at once, the requests are sent concurrently, see Model.results
+
+        :return: metric -> {'value': value, 'unit': unit or None}, or a one row pandas DataFrame if as_frame
+        """
+        if metrics is None:
+            metrics = list(RESULT_METRICS.keys())
+        fetched = await asyncio.gather(*[self.__fetch_result(RESULT_METRICS.get(metric, metric))
+                                         for metric in metrics])
+        results = OrderedDict()
+        for metric, (value, unit) in zip(metrics, fetched):
+            results[metric] = {'value': value, 'unit': unit}
+        if as_frame:
+            return _results_frame(self._track_token, results)
+        return results
+
+    # Below are the methods use for retrieving results
+    async def net_site_eui(self):
+        return await self.__call_api('NetSiteEUI')
+
+    async def total_site_eui(self):
+        return await self.__call_api('TotalSiteEUI')
+
+    async def not_met_hour_cooling(self):
+        return await self.__call_api('NotMetHoursCooling')
+
+    async def not_met_hour_heating(self):
+        return await self.__call_api('NotMetHoursHeating')
+
+    async def not_met_hour_total(self):
+        return await self.__call_api('NotMetHoursTotal')
+
+    async def total_end_use_electricity(self):
+        return await self.__call_api('TotalEndUseElectricity')
+
+    async def total_end_use_naturalgas(self):
+        return await self.__call_api('TotalEndUseNaturalGas')
+
+    async def cooling_electricity(self):
+        return await self.__call_api('CoolingElectricity')
+
+    async def cooling_naturalgas(self):
+        return await self.__call_api('CoolingNaturalGas')
+
+    async def domestic_hotwater_electricity(self):
+        return await self.__call_api('DomesticHotWaterElectricity')
+
+    async def domestic_hotwater_naturalgas(self):
+        return await self.__call_api('DomesticHotWaterNaturalGas')
+
+    async def exterior_equipment_electricity(self):
+        return await self.__call_api('ExteriorEquipmentElectricity')
+
+    async def exterior_equipment_naturalgas(self):
+        return await self.__call_api('ExteriorEquipmentNaturalGas')
+
+    async def exterior_lighting_electricity(self):
+        return await self.__call_api('ExteriorLightingElectricity')
+
+    async def exterior_lighting_naturalgas(self):
+        return await self.__call_api('ExteriorLightingNaturalGas')
+
+    async def fan_electricity(self):
+        return await self.__call_api('FansElectricity')
+
+    async def fan_naturalgas(self):
+        return await self.__call_api('FansNaturalGas')
+
+    async def heating_electricity(self):
+        return await self.__call_api('HeatingElectricity')
+
+    async def heating_naturalgas(self):
+        return await self.__call_api('HeatingNaturalGas')
+
+    async def heat_rejection_electricity(self):
+        return await self.__call_api('HeatRejectionElectricity')
+
+    async def heat_rejection_naturalgas(self):
+        return await self.__call_api('HeatRejectionNaturalGas')
+
+    async def interior_equipment_electricity(self):
+        return await self.__call_api('InteriorEquipmentElectricity')
+
+    async def interior_equipment_naturalgas(self):
+        return await self.__call_api('InteriorEquipmentNaturalGas')
+
+    async def interior_lighting_electricity(self):
+        return await self.__call_api('InteriorLightingElectricity')
+
+    async def interior_lighting_naturalgas(self):
+        return await self.__call_api('InteriorLightingNaturalGas')
+
+    async def pumps_electricity(self):
+        return await self.__call_api('PumpsElectricity')
+
+    async def pumps_naturalgas(self):
+        return await self.__call_api('PumpsNaturalGas')
+
+    async def bldg_lpd(self):
+        return await self.__call_api('BuildingLPD')
+
+    async def bldg_epd(self):
+        return await self.__call_api('BuildingEPD')
+
+    async def bldg_ppl(self):
+        return await self.__call_api('BuildingPPL')
+
+    async def wall_rvalue(self):
+        return await self.__call_api('WallRValue')
+
+    async def roof_rvalue(self):
+        return await self.__call_api('RoofRValue')
+
+    async def window_uvalue(self):
+        return await self.__call_api('WindowUValue')
+
+    async def window_shgc(self):
+        return await self.__call_api('WindowSHGC')
+
+    async def roof_absorption(self):
+        return await self.__call_api('RoofAbsorption')
+
+    async def bldg_infiltration(self):
+        return await self.__call_api('Infiltration')
+
+    async def bldg_water_heater_efficiency(self):
+        return await self.__call_api('WaterHeaterEfficiency')
+
+    async def bldg_dx_cooling_efficiency(self):
+        return await self.__call_api('DXCoolingCoilEfficiency')
+
+    async def bldg_chiller_efficiency(self):
+        return await self.__call_api('ChillerEfficiency')
+
+    async def bldg_electric_boiler_efficiency(self):
+        return await self.__call_api('ElectricBoilerEfficiency')
+
+    async def bldg_fuel_boiler_efficiency(self):
+        return await self.__call_api('FuelBoilerEfficiency')
+
+    async def bldg_dx_heating_efficiency(self):
+        return await self.__call_api('ElectricHeatingDXCoils')
+
+    async def bldg_sys_loads(self, type="cooling"):
+        return await self.__call_api('BuildingSysLoad', type)
+
+    def __payload(self):
+        track = "folder_api_key"
+        test = self._track_token.split("-")
+        if len(test) == 3:
+            track = "track_token"
+        return {
+            'project_api_key': self._project_api_key,
+            track: self._track_token
+        }
+
+    def __log(self, request, code, result):
+        if self._logger is not None:
+            self._logger.write_in_message('AsyncModel', request, self._project_api_key,
+                                          self._track_token, code, result)
+
+    @staticmethod
+    def __print_error(r, resp_json):
+        try:
+            print('Code: ' + str(r.status_code) + ' message: ' + resp_json['error_msg'])
+        except TypeError:
+            print(resp_json)
+            return
+        return False
+
+    def __floor_area(self, value, unit):
+        self._last_parameter_unit = 'm2'
+        if unit == 'ip':
+            value = value * 10.7639
+            self._last_parameter_unit = 'ft2'
+        return value
+
+    async def __basic_info(self, request_data, log_request, zone_name=None):
+        """
+        request GetBuildingBasicInfo_API
+
+        :return: the data dict when success, otherwise what the Model method returns on error
+        """
+        url = self._base_url + 'GetBuildingBasicInfo_API'
+        payload = self.__payload()
+        payload['request_data'] = request_data
+        if zone_name is not None:
+            payload['zone_name'] = zone_name
+
+        r = await request_get(url, payload, self._transport)
+        resp_json = r.json()
+        self.__log(log_request, r.status_code, request_data)
+
+        if r.status_code > 200:
+            return self.__print_error(r, resp_json)
+        if resp_json['status'] == 'success':
+            return resp_json['data']
+        else:
+            return -1
+
+    async def __monthly_call_api(self, request_data, request_component=None):
+        url = self._base_url + 'GetBuildingMonthlyResults_API'
+        payload = self.__payload()
+        payload['request_data'] = request_data
+        if request_component is not None:
+            payload['request_for'] = request_component
+
+        r = await request_get(url, payload, self._transport)
+        self.__log('MonthlyData', r.status_code, request_data)
+        return self.__parse_result(r)
+
+    async def __call_api(self, request_data, zone_name=''):
+        value, unit = await self.__fetch_result(request_data, zone_name)
+        if unit is not None:
+            self._last_parameter_unit = unit
+        return value
+
+    async def __fetch_result(self, request_data, zone_name=''):
+        url = self._base_url + 'GetBuildingSimulationResults_API'
+        payload = self.__payload()
+        payload['request_data'] = request_data
+        payload['zone_name'] = zone_name
+
+        r = await request_get(url, payload, self._transport)
+        self.__log('SimulationResult', r.status_code, request_data)
+        return self.__parse_value(r)
+
+    def __parse_result(self, r):
+        value, unit = self.__parse_value(r)
+        if unit is not None:
+            self._last_parameter_unit = unit
+        return value
+
+    def __parse_value(self, r):
+        """:return: (value, unit) - the unit is None if the server did not send one"""
+        resp_json = r.json()
+        if r.status_code > 200:
+            return self.__print_error(r, resp_json), None
+
+        if resp_json['status'] == 'success':
+            data = resp_json['data']
+            value_type = data['type']
+            collections = data['collection']
+
+            if value_type == 'Numeric':
+                return data['value'], data.get('unit')
+            elif value_type == 'JsonObject':
+                if collections == 'true':
+                    return data['array'], None
+                else:
+                    return data['value'], None
+            return None, None
+        else:
+            return -1, None
@@ -0,0 +1,406 @@
+"""
+Non-blocking twin of httpurllib built on asyncio streams.
+
+Requests share an AsyncTransport which keeps idle keep-alive connections per host
+and limits the number of requests in flight with a semaphore.
+"""
+import asyncio
+import json
+import ssl
+import time
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from . import httpurllib
+from .httpurllib import HTTPConnect
+from .retry import IDEMPOTENT_METHODS
+from .session import get_default_session
+from .compression import ACCEPT_ENCODING
+from .compression import GzipBody
+from .compression import decode_body
+
+
+class AsyncTransport(object):
+
+    def __init__(self, concurrency=20, max_idle=10, session=None, idle_timeout=4):
+        """
+        Construct an asyncio transport
+
+        :param concurrency: maximum number of requests in flight at the same time
+        :param max_idle: maximum number of idle connections kept for each host
+        :param session: optional, the Session the request settings come from
+        :param idle_timeout: seconds an idle connection is kept, below the keep-alive timeout of the server
+        :type concurrency: int
+        :type max_idle: int
+        :type idle_timeout: float
+        """
+        self._concurrency = concurrency
+        self._max_idle = max_idle
+        self._idle_timeout = idle_timeout
+        if session is None:
+            session = get_default_session()
+        self._session = session
+        self._semaphore = None
+        self._loop = None
+        # (is_ssl, host) -> list of (reader, writer, last used time)
+        self._idle = dict()
+
+        try:
+            self._context = ssl._create_unverified_context()
+        except AttributeError:
+            self._context = None
+
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    @property
+    def session(self):
+        return self._session
+
+    def _get_semaphore(self):
+        # created lazily so the semaphore belongs to the running loop
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            # the connections of a previous loop cannot be used by this one
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+            self._idle = dict()
+        return self._semaphore
+
+    async def send(self, process, method, url, body=None, headers=None):
+        """
+        send one request and read the whole response
+
+        The retry policy and the circuit breaker of the session are applied,
+        connection errors are raised again once the retries are exhausted
+
+        :param process: the split path returned by httpurllib
+        :return: status code and response body
+        :rtype: (int, bytes)
+        """
+        policy = self._session.retry_policy
+        breaker = self._session.circuit_breaker
+        host = process['host']
+        attempt = 0
+        while True:
+            breaker.before_request(host)
+            try:
+                status, data, resp_headers = await self._send_once(process, method, url, body, headers)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                breaker.record_failure(host)
+                if not policy.retry_on_error(method, attempt, e):
+                    raise
+                if hasattr(body, 'rewind') and not body.rewind():
+                    raise
+                await asyncio.sleep(policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if status >= 500:
+                breaker.record_failure(host)
+            else:
+                breaker.record_success(host)
+
+            if not policy.retry_on_status(method, attempt, status):
+                return status, data
+            if hasattr(body, 'rewind') and not body.rewind():
+                return status, data
+            await asyncio.sleep(policy.backoff(attempt, resp_headers.get('retry-after')))
+            attempt += 1
+
+    async def _send_once(self, process, method, url, body, headers):
+        async with self._get_semaphore():
+            key = (process['is_ssl'], process['host'])
+            reader, writer = self._acquire(key)
+            reused = reader is not None
+            if not reused:
+                reader, writer = await self._open(process)
+
+            sent = False
+            try:
+                await self._write_request(writer, process['host'], method, url, body, headers)
+                sent = True
+                status, keep_alive, data, resp_headers = await self._read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                if sent and method.upper() not in IDEMPOTENT_METHODS:
+                    # the response was lost, the retry policy decides
+                    raise
+                if hasattr(body, 'rewind') and not body.rewind():
+                    raise
+                # the server closed the idle connection - try once on a new one
+                reader, writer = await self._open(process)
+                try:
+                    status, keep_alive, data, resp_headers = await self._exchange(reader, writer, process['host'],
+                                                                                  method, url, body, headers)
+                except Exception:
+                    writer.close()
+                    raise
+            except Exception:
+                writer.close()
+                raise
+
+            conns = self._idle.setdefault(key, [])
+            if keep_alive and len(conns) < self._max_idle:
+                conns.append((reader, writer, time.time()))
+            else:
+                writer.close()
+            return status, data, resp_headers
+
+    def _acquire(self, key):
+        """an idle connection the server has not closed, (None, None) if there is none"""
+        conns = self._idle.get(key, [])
+        now = time.time()
+        while conns:
+            reader, writer, last_used = conns.pop()
+            # the event loop has already seen the EOF of a connection closed by the server
+            if now - last_used > self._idle_timeout or reader.at_eof() or writer.is_closing():
+                writer.close()
+                continue
+            return reader, writer
+        return None, None
+
+    async def close(self):
+        """Close every idle connection"""
+        idle = self._idle
+        self._idle = dict()
+        for conns in idle.values():
+            for reader, writer, last_used in conns:
+                writer.close()
+
+    async def _open(self, process):
+        host = process['host']
+        port_idx = host.find(':')
+        if port_idx < 0:
+            name = host
+            port = 443 if process['is_ssl'] else 80
+        else:
+            name = host[:port_idx]
+            port = int(host[port_idx + 1:])
+
+        ssl_context = None
+        if process['is_ssl']:
+            ssl_context = self._context if self._context is not None else True
+        return await asyncio.open_connection(name, port, ssl=ssl_context)
+
+    @classmethod
+    async def _exchange(cls, reader, writer, host, method, url, body, headers):
+        await cls._write_request(writer, host, method, url, body, headers)
+        return await cls._read_response(reader)
+
+    @staticmethod
+    async def _write_request(writer, host, method, url, body, headers):
+        lines = ['%s %s HTTP/1.1' % (method, url),
+                 'Host: %s' % host,
+                 'Connection: keep-alive']
+        if headers is None:
+            headers = dict()
+        if 'Accept-Encoding' not in headers:
+            headers['Accept-Encoding'] = ACCEPT_ENCODING
+        for key, val in headers.items():
+            lines.append('%s: %s' % (key, val))
+        if hasattr(body, 'read'):
+            # streaming body, its headers are given by the caller
+            if body.len is None:
+                lines.append('Transfer-Encoding: chunked')
+        elif body is not None or method == 'POST':
+            lines.append('Content-Length: %d' % (0 if body is None else len(body)))
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if hasattr(body, 'read'):
+            # reading the files is blocking - keep it off the loop
+            loop = asyncio.get_event_loop()
+            chunk = await loop.run_in_executor(None, body.read, body.CHUNK_SIZE)
+            while chunk:
+                if body.len is None:
+                    writer.write(('%x\r\n' % len(chunk)).encode('latin-1') + chunk + b'\r\n')
+                else:
+                    writer.write(chunk)
+                await writer.drain()
+                chunk = await loop.run_in_executor(None, body.read, body.CHUNK_SIZE)
+            if body.len is None:
+                writer.write(b'0\r\n\r\n')
+        elif body:
+            writer.write(body)
+        await writer.drain()
+
+    @staticmethod
+    async def _read_response(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('server closed the connection')
+        status = int(status_line.split()[1])
+
+        resp_headers = dict()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, val = line.decode('latin-1').partition(':')
+            resp_headers[key.strip().lower()] = val.strip()
+
+        keep_alive = resp_headers.get('connection', '').lower() != 'close'
+        if resp_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = list()
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # skip the trailers
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b''.join(chunks)
+        elif 'content-length' in resp_headers:
+            data = await reader.readexactly(int(resp_headers['content-length']))
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return status, keep_alive, decode_body(data, resp_headers.get('content-encoding')), resp_headers
+
+
+_default_transport = None
+
+
+def get_async_transport():
+    """The transport shared by the async helpers that are not given one"""
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = AsyncTransport()
+    return _default_transport
+
+
+def _url(process, params):
+    if params is None:
+        return process['req_path']
+    return process['req_path'] + "?" + urlencode(params)
+
+
+async def request_get(path, params, transport=None):
+    """
+    send GET request to server
+
+    :param path: url
+    :param params: query parameters
+    :param transport: AsyncTransport, the shared one is used if None
+    :return: HTTPConnect
+    """
+    if transport is None:
+        transport = get_async_transport()
+    process = httpurllib.__split_path(path)
+    if process['status'] != 'success':
+        return HTTPConnect(404, process)
+
+    header = transport.session.headers()
+    status, data = await transport.send(process, "GET", _url(process, params), headers=header)
+    return HTTPConnect(status, data)
+
+
+async def request_post(path, params, files=None, transport=None, compress=False):
+    """
+    send POST request to server
+
+    :param path: url
+    :param params: form fields
+    :param files: optional, form field name -> opened file, sent as multipart/form-data
+    :param transport: AsyncTransport, the shared one is used if None
+    :param compress: gzip the multipart body, the server has to accept Content-Encoding: gzip
+    :return: HTTPConnect
+    """
+    if transport is None:
+        transport = get_async_transport()
+    process = httpurllib.__split_path(path)
+    if process['status'] != 'success':
+        return HTTPConnect(404, process)
+
+    if files:
+        # the body is read while it is sent
+        header, body = httpurllib.__encode_multipart_formdata(params, files)
+        if compress:
+            body = GzipBody(body)
+            header = body.headers()
+        header.update(transport.session.headers())
+        try:
+            status, data = await transport.send(process, "POST", process['req_path'], body, header)
+        finally:
+            body.close()
+    else:
+        header = transport.session.headers()
+        status, data = await transport.send(process, "POST", _url(process, params), headers=header)
+    return HTTPConnect(status, data)
+
+
+async def __request_page(path, params, start, transport):
+    """
+    request one page of a large data request
+
+    :return: the page json, or None if the request failed
+    """
+    page_params = dict(params)
+    page_params['start'] = str(start)
+    r = await request_get(path, page_params, transport)
+    resp_obj = r.json()
+    if r.status_code != 200:
+        print("Code: " + str(r.status_code))
+        print(resp_obj)
+        return None
+    if type(resp_obj) is str:
+        try:
+            resp_obj = json.loads(resp_obj)
+        except ValueError:
+            print("parse json str failed")
+            return None
+    elif type(resp_obj) is not dict:
+        print("result not str")
+        print(resp_obj)
+        return None
+    return resp_obj
+
+
+async def request_large_data(path, params, transport=None):
+    """
+    This function is used to request parametric data
+
+    The first page tells the total number of records and the page size,
+    the remaining pages are then requested concurrently and put back in order.
+
+    :return: list of records
+    """
+    result = []
+    resp_obj = await __request_page(path, params, 0, transport)
+    if resp_obj is None:
+        return result
+    total = int(resp_obj['total'])
+    start = int(resp_obj['next_start'])
+    result.extend(resp_obj['data'])
+
+    page_size = start
+    if 0 < page_size < total:
+        starts = list(range(start, total, page_size))
+        pages = await asyncio.gather(*[__request_page(path, params, page_start, transport)
+                                       for page_start in starts])
+        for page_start, page in zip(starts, pages):
+            expected = min(page_start + page_size, total)
+            if page is None or int(page['next_start']) != expected or int(page['total']) != total:
+                # the server does not page as expected - continue one page at a time
+                break
+            result.extend(page['data'])
+            start = expected
+
+    while start < total:
+        resp_obj = await __request_page(path, params, start, transport)
+        if resp_obj is None:
+            break
+        total = int(resp_obj['total'])
+        next_start = int(resp_obj['next_start'])
+        result.extend(resp_obj['data'])
+        if next_start <= start:
+            break
+        start = next_start
+    return result
@@ -0,0 +1,159 @@
+import asyncio
+from .parametric_job import BaseParametricJob
+from .async_parametric_model import AsyncParametricModel
+from .async_httpurllib import request_get
+from .async_httpurllib import request_post
+
+
+class AsyncParametricJob(BaseParametricJob):
+
+    def __init__(self, project_api_key, model_api_key='', base_url=None, logger=None, transport=None):
+        """
+        Construct an asyncio parametric job
+
+        The async twin of ParametricJob: the submit and tracking methods are coroutines
+        and tracking waits with asyncio.sleep
+
+        :param project_api_key: required
+        :param model_api_key: optional
+        :param base_url: optional - use for testing only
+        :param transport: the AsyncTransport to send requests, None uses the shared one
+        :type project_api_key: str
+        :type model_api_key: str
+        :type base_url: str
+        """
+        BaseParametricJob.__init__(self, project_api_key, model_api_key, base_url, logger)
+        self._transport = transport
+
+    async def submit_parametric_study_local(self, file_dir, epw_dir=None, unit='ip', simulation_type="parametric",
+                                            track=False, request_time=5, customize='false', design_condition='yes',
+                                            algorithm='Default', size=200, comment=None):
+        """
+        Submit an energy model from local as the seed model, see ParametricJob.submit_parametric_study_local
+
+        :return: True success, False otherwise, or an AsyncParametricModel if tracking = True
+        """
+        url = self._base_url + 'ParametricSettingUploadModel_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'simulation_type': simulation_type,
+            'agents': 1,
+            'unit': unit,
+            'customize': customize,
+            'algorithm': algorithm,
+            'size': size,
+            'design_cond': design_condition
+        }
+
+        if comment is not None:
+            # this will override the model description
+            payload['comment'] = comment
+
+        if not self._add_measures(payload, algorithm, customize):
+            return
+
+        # Upload files
+        files = dict()
+        # binary so the files are streamed as they are, without decoding
+        files['model'] = open(file_dir, 'rb')
+        if epw_dir is not None:
+            files['weather_file'] = open(epw_dir, 'rb')
+
+        print('Submitting parametric simulation job request...')
+        r = await request_post(url, payload, files, self._transport)
+        return await self.__submit_response(r, 'UploadRun', track, request_time)
+
+    async def submit_parametric_study(self, unit='ip', simulation_type='parametric', model_api_key=None,
+                                      design_condition="yes", track=False, request_time=5, customize='false',
+                                      algorithm='Default', size=200, comment=None):
+        """
+        Select a model in the project as the seed model and do parametric study,
+        see ParametricJob.submit_parametric_study
+
+        :return: True if success, False otherwise, or an AsyncParametricModel if tracking = True
+        """
+        if model_api_key is not None:
+            self._model_api_key = model_api_key
+
+        if self._model_api_key == '':
+            print('submit_parametric_study requires a valid model_api_key')
+            return False
+
+        url = self._base_url + 'ParametricSettingCopyModel_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'model_api_key': self._model_api_key,
+            'simulation_type': simulation_type,
+            'agents': 1,
+            'unit': unit,
+            'customize': customize,
+            'algorithm': algorithm,
+            'design_cond': design_condition,
+            'size': size
+        }
+
+        if comment is not None:
+            # this will override the model description
+            payload['comment'] = comment
+
+        if not self._add_measures(payload, algorithm, customize):
+            return
+
+        print('Submitting parametric simulation job request...')
+        r = await request_post(url, payload, transport=self._transport)
+        return await self.__submit_response(r, 'Run', track, request_time)
+
+    async def track_simulation(self):
+        if self._track_token == "":
+            return self._track_status
+
+        url = self._base_url + 'ParametricTracking_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'folder_api_key': self._track_token
+        }
+
+        try:
+            r = await request_get(url, payload, self._transport)
+            resp_json = r.json()
+        except ConnectionError:
+            # the retries are exhausted or the circuit is open - keep tracking
+            return "Reconnecting to server..."
+
+        return self._parametric_track_info(r.status_code, resp_json)
+
+    async def __submit_response(self, r, log_request, track, request_time):
+        if r.status_code == 500:
+            print('Code: ' + str(r.status_code))
+            return False
+        resp_json = r.json()
+        if r.status_code > 200:
+            try:
+                print('Code: ' + str(r.status_code) + ' message: ' + resp_json['error_msg'])
+            except TypeError:
+                print(resp_json)
+            return False
+
+        print('Received server response')
+        if resp_json['status'] != 'success':
+            print(resp_json['error_msg'])
+            return False
+
+        self._track_token = resp_json['tracking']
+
+        # log
+        if self._logger is not None:
+            self._logger.write_in_message('ParametricSimulation', log_request, self._project_key,
+                                          self._track_token, '200', self._track_token)
+
+        print('You can track the parametric using API key: ' + self._track_token)
+        if track:
+            while await self.track_simulation():
+                print(self._track_status)
+                await asyncio.sleep(request_time)
+            print(self._track_status)
+            print('Completed! You can retrieve results using the key: ' + self._track_token)
+            return AsyncParametricModel(self._project_key, self._track_token, self._base_url,
+                                        transport=self._transport)
+        else:
+            return True
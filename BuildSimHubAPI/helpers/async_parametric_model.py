@@ -0,0 +1,226 @@
+from .async_httpurllib import request_large_data
+
+
+class AsyncParametricModel(object):
+    # every call will connect to this base URL
+    BASE_URL = 'https://my.buildsim.io/'
+
+    def __init__(self, project_key, track_token, base_url=None, logger=None, transport=None):
+        """
+        Construct asyncio parametric result object
+
+        The async twin of ParametricModel, every result method is a coroutine
+        and returns the same dict of value, model and model_plot lists
+
+        :param project_key: required
+        :param track_token: required
+        :param base_url: optional
+        :param transport: the AsyncTransport to send requests, None uses the shared one
+        :type project_key: str
+        :type track_token: str
+        :type base_url: str
+
+        """
+        self._project_key = project_key
+        self._last_parameter_unit = ""
+        self._track_token = track_token
+        self._base_url = AsyncParametricModel.BASE_URL
+        self._logger = None
+        self._transport = transport
+
+        if base_url is not None:
+            self._base_url = base_url
+        if logger is not None:
+            self._logger = logger
+
+    @property
+    def last_parameter_unit(self):
+        return self._last_parameter_unit
+
+    async def bldg_load(self, load_type='cooling'):
+        """
+        Building load of every case in the parametric study
+
+        :param load_type: cooling or heating
+        :return:
+        """
+        url = self._base_url + 'GetTotalLoadForParametric_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'folder_api_key': self._track_token,
+            'type': 'parametric',
+            'load_type': load_type
+        }
+
+        data_list = await request_large_data(url, payload, self._transport)
+
+        # log action
+        if self._logger is not None:
+            self._logger.write_in_message('AsyncParametricModel', 'BuildingLoad', self._project_key,
+                                          self._track_token, '200', "building load: " + load_type)
+        return self.__to_result(data_list)
+
+    # Below are the methods use for retrieving results
+    async def net_site_eui(self):
+        return await self.__call_api('NetSiteEUI')
+
+    async def total_site_eui(self):
+        return await self.__call_api('TotalSiteEUI')
+
+    async def not_met_hour_cooling(self):
+        return await self.__call_api('NotMetHoursCooling')
+
+    async def not_met_hour_heating(self):
+        return await self.__call_api('NotMetHoursHeating')
+
+    async def not_met_hour_total(self):
+        return await self.__call_api('NotMetHoursTotal')
+
+    async def total_end_use_electricity(self):
+        return await self.__call_api('TotalEndUseElectricity')
+
+    async def total_end_use_naturalgas(self):
+        return await self.__call_api('TotalEndUseNaturalGas')
+
+    async def cooling_electricity(self):
+        return await self.__call_api('CoolingElectricity')
+
+    async def cooling_naturalgas(self):
+        return await self.__call_api('CoolingNaturalGas')
+
+    async def domestic_hotwater_electricity(self):
+        return await self.__call_api('DomesticHotWaterElectricity')
+
+    async def domestic_hotwater_naturalgas(self):
+        return await self.__call_api('DomesticHotWaterNaturalGas')
+
+    async def exterior_equipment_electricity(self):
+        return await self.__call_api('ExteriorEquipmentElectricity')
+
+    async def exterior_equipment_naturalgas(self):
+        return await self.__call_api('ExteriorEquipmentNaturalGas')
+
+    async def exterior_lighting_electricity(self):
+        return await self.__call_api('ExteriorLightingElectricity')
+
+    async def exterior_lighting_naturalgas(self):
+        return await self.__call_api('ExteriorLightingNaturalGas')
+
+    async def fan_electricity(self):
+        return await self.__call_api('FansElectricity')
+
+    async def fan_naturalgas(self):
+        return await self.__call_api('FansNaturalGas')
+
+    async def heating_electricity(self):
+        return await self.__call_api('HeatingElectricity')
+
+    async def heating_naturalgas(self):
+        return await self.__call_api('HeatingNaturalGas')
+
+    async def heat_rejection_electricity(self):
+        return await self.__call_api('HeatRejectionElectricity')
+
+    async def heat_rejection_naturalgas(self):
+        return await self.__call_api('HeatRejectionNaturalGas')
+
+    async def interior_equipment_electricity(self):
+        return await self.__call_api('InteriorEquipmentElectricity')
+
+    async def interior_equipment_naturalgas(self):
+        return await self.__call_api('InteriorEquipmentNaturalGas')
+
+    async def interior_lighting_electricity(self):
+        return await self.__call_api('InteriorLightingElectricity')
+
+    async def interior_lighting_naturalgas(self):
+        return await self.__call_api('InteriorLightingNaturalGas')
+
+    async def pumps_electricity(self):
+        return await self.__call_api('PumpsElectricity')
+
+    async def pumps_naturalgas(self):
+        return await self.__call_api('PumpsNaturalGas')
+
+    async def bldg_lpd(self):
+        return await self.__call_api('BuildingLPD')
+
+    async def bldg_epd(self):
+        return await self.__call_api('BuildingEPD')
+
+    async def bldg_ppl(self):
+        return await self.__call_api('BuildingPPL')
+
+    async def wall_rvalue(self):
+        return await self.__call_api('WallRValue')
+
+    async def roof_rvalue(self):
+        return await self.__call_api('RoofRValue')
+
+    async def window_uvalue(self):
+        return await self.__call_api('WindowUValue')
+
+    async def window_shgc(self):
+        return await self.__call_api('WindowSHGC')
+
+    async def roof_absorption(self):
+        return await self.__call_api('RoofAbsorption')
+
+    async def bldg_infiltration(self):
+        return await self.__call_api('Infiltration')
+
+    async def bldg_water_heater_efficiency(self):
+        return await self.__call_api('WaterHeaterEfficiency')
+
+    async def bldg_dx_cooling_efficiency(self):
+        return await self.__call_api('DXCoolingCoilEfficiency')
+
+    async def bldg_chiller_efficiency(self):
+        return await self.__call_api('ChillerEfficiency')
+
+    async def bldg_electric_boiler_efficiency(self):
+        return await self.__call_api('ElectricBoilerEfficiency')
+
+    async def bldg_fuel_boiler_efficiency(self):
+        return await self.__call_api('FuelBoilerEfficiency')
+
+    async def bldg_dx_heating_efficiency(self):
+        return await self.__call_api('ElectricHeatingDXCoils')
+
+    async def bldg_sys_loads(self, type='cooling'):
+        return await self.__call_api('BuildingSysLoad', type)
+
+    async def __call_api(self, request_data, zone_name=''):
+        url = self._base_url + 'ParametricResults_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'folder_api_key': self._track_token,
+            'request_data': request_data,
+            'zone_name': zone_name
+        }
+
+        data_list = await request_large_data(url, payload, self._transport)
+
+        # log action
+        if self._logger is not None:
+            self._logger.write_in_message('AsyncParametricModel', 'ParametricResults', self._project_key,
+                                          self._track_token, '200', "results: " + request_data)
+        return self.__to_result(data_list)
+
+    def __to_result(self, data_list):
+        value = list()
+        model = list()
+        model_plot = list()
+        counter = 1
+        for i in range(len(data_list)):
+            value.append(data_list[i]['value'])
+            model.append(data_list[i]['model'])
+            model_plot.append('case' + str(counter))
+            counter += 1
+            if 'unit' in data_list[i]:
+                self._last_parameter_unit = data_list[i]['unit']
+        result = dict()
+        result['value'] = value
+        result['model'] = model
+        result['model_plot'] = model_plot
+        return result
@@ -0,0 +1,327 @@
+import asyncio
+from .simulation_job import BaseSimulationJob
+from .async_energy_model import AsyncModel
+from .async_parametric_model import AsyncParametricModel
+from .async_httpurllib import request_get
+from .async_httpurllib import request_post
+from .add_files_zip import zip_add_files
+
+
+class AsyncSimulationJob(BaseSimulationJob):
+
+    def __init__(self, project_key, base_url=None, logger=None, transport=None):
+        """
+        Create asyncio simulation job object.
+
+        The async twin of SimulationJob: run, create_model, run_model_simulation and
+        the tracking methods are coroutines and tracking waits with asyncio.sleep,
+        so many jobs can be submitted and tracked from one event loop.
+
+        :param project_key: the project key, required
+        :param base_url: api connection url
+        :param transport: the AsyncTransport to send requests, None uses the shared one
+        :type project_key: basestring
+        :type base_url: basestring
+        """
+        BaseSimulationJob.__init__(self, project_key, base_url, logger)
+        self._transport = transport
+
+    async def track_batch_simulation(self):
+        if self._track_token == "":
+            return self._track_status
+
+        url = self._base_url + 'ParametricTracking_API'
+        payload = {
+            'folder_api_key': self._track_token,
+            'project_api_key': self._project_key
+        }
+
+        try:
+            r = await request_get(url, payload, self._transport)
+            resp_json = r.json()
+        except ConnectionError:
+            # the retries are exhausted or the circuit is open - keep tracking
+            return "Reconnecting to server..."
+
+        return self._batch_track_info(r.status_code, resp_json)
+
+    async def track_simulation(self):
+        """
+        track the simulation progress
+
+        :return: True if server is still simulating the model, False otherwise
+        :rtype: bool
+        """
+        if self._track_token == "":
+            return self._track_status
+
+        url = self._base_url + 'TrackSimulation_API'
+        payload = {
+            'track_token': self._track_token,
+            'project_api_key': self._project_key
+        }
+
+        try:
+            r = await request_get(url, payload, self._transport)
+            resp_json = r.json()
+        except ConnectionError:
+            # the retries are exhausted or the circuit is open - keep tracking
+            return "Reconnecting to server..."
+
+        return self._simulation_track_info(resp_json)
+
+    async def run(self, file_dir, epw_dir=None, add_files=None, unit='ip', design_condition='yes', agent=1,
+                  comment="Python API", track=False, request_time=5, max_workers=4, submit_interval=1):
+        """
+        Upload a model or a list of models and run cloud simulation, see SimulationJob.run
+
+        The models of a list after the first one are uploaded concurrently,
+        at most max_workers at a time and started submit_interval seconds apart.
+
+        :return: True if server accepts simulation request, False otherwise,
+            or an AsyncModel (AsyncParametricModel for a list of models) if tracking = True
+        :rtype: bool or AsyncModel or AsyncParametricModel
+        """
+        url = self._base_url + 'CreateModel_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'agents': agent,
+            'comment': comment,
+            'design_cond': design_condition,
+            'unit': unit,
+            'do_load_simulation': 'no'
+        }
+
+        if type(file_dir) is str:
+            files = self._decode_model_and_epw(file_dir, epw_dir)
+            if add_files is not None:
+                files['schedule_csv'] = zip_add_files(add_files)
+
+            print("Submitting simulation request...")
+            r = await request_post(url, payload, files, self._transport)
+            if not self._http_code_check(r):
+                return False
+            resp_json = r.json()
+            if resp_json['status'] != 'success':
+                try:
+                    print(resp_json['error_msg'])
+                except KeyError:
+                    print(resp_json)
+                return False
+
+            self._track_token = resp_json['tracking']
+            self._model_api_key = resp_json['model_api_key']
+
+            # log
+            if self._logger is not None:
+                self._logger.write_in_message('ModelSimulation', 'BatchRun', self._project_key,
+                                              self._track_token, '200', self._track_token)
+            if track:
+                while await self.track_simulation():
+                    print(self.track_status)
+                    await asyncio.sleep(request_time)
+            if self.track_status == 'Simulation finished successfully':
+                print(self.track_status)
+                print('Completed! You can retrieve results using the key: ' + self._track_token)
+                return AsyncModel(self._project_key, self._track_token, self._base_url, transport=self._transport)
+            else:
+                print(self.track_status)
+                return False
+        elif type(file_dir) is list:
+            if len(file_dir) == 0:
+                print("Model directory list should not be empty")
+                return False
+            print("Submitting the model number: 1")
+            files = self._decode_model_and_epw(file_dir[0], epw_dir)
+            if add_files is not None:
+                files['schedule_csv'] = zip_add_files(add_files)
+
+            r = await request_post(url, payload, files, self._transport)
+            if not self._http_code_check(r):
+                return False
+            resp_json = r.json()
+            if resp_json['status'] != 'success':
+                try:
+                    print(resp_json['error_msg'])
+                except KeyError:
+                    print(resp_json)
+                return False
+
+            # in this case, we are getting the branch key / model key
+            self._track_token = resp_json['model_api_key']
+            self._model_api_key = resp_json['model_api_key']
+
+            # log
+            if self._logger is not None:
+                self._logger.write_in_message('ModelSimulation', 'Run', self._project_key,
+                                              self._track_token, '200', self._track_token)
+
+            payload['model_api_key'] = self._track_token
+            self._batch_status = [self._batch_model_status(file_dir[0], r)]
+            await self.__submit_batch(url, payload, file_dir, max_workers, submit_interval)
+            if track:
+                while await self.track_batch_simulation():
+                    print(self._track_status)
+                    await asyncio.sleep(request_time)
+                print(self._track_status)
+                print('Completed! You can retrieve results using the key: ' + self._track_token)
+                return AsyncParametricModel(self._project_key, self._track_token, self._base_url,
+                                            transport=self._transport)
+            else:
+                return True
+        else:
+            print("Error: file_dir should be either a str or a list of str")
+            return False
+
+    async def __submit_batch(self, url, payload, file_dir, max_workers, submit_interval):
+        """
+        upload the models after the first one concurrently, a failed model does not stop the others
+        """
+        total = len(file_dir)
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+        lock = asyncio.Lock()
+        # start time of the next upload
+        loop = asyncio.get_running_loop()
+        next_start = [loop.time()]
+
+        async def submit(i):
+            async with semaphore:
+                async with lock:
+                    wait = next_start[0] - loop.time()
+                    next_start[0] = max(next_start[0], loop.time()) + submit_interval
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    temp_files = self._decode_model_and_epw(file_dir[i], None)
+                    r = await request_post(url, payload, temp_files, self._transport)
+                    status = self._batch_model_status(file_dir[i], r)
+                except (IOError, OSError, EOFError, ValueError) as e:
+                    # lost connection or an unreadable response - recorded, the other models go on
+                    status = {'model': file_dir[i], 'status': 'error', 'message': str(e)}
+            if status['status'] == 'success':
+                print("Submitted the model number: " + str(i + 1) + " of " + str(total))
+            else:
+                print("Failed to submit the model number: " + str(i + 1) + " " + status['message'])
+            return status
+
+        self._batch_status.extend(await asyncio.gather(*[submit(i) for i in range(1, total)]))
+
+        failed = len([status for status in self._batch_status if status['status'] != 'success'])
+        print("Submitted " + str(total - failed) + " of " + str(total) + " models")
+
+    async def run_model_simulation(self, track_token=None, unit='ip', design_condition='yes', agent=1,
+                                   simulation_type="regular", track=False, request_time=5):
+        """
+        Run a model (not simulated) on the cloud, see SimulationJob.run_model_simulation
+
+        :return: True if server accepts simulation request, False otherwise, or an AsyncModel if tracking = True
+        """
+        url = self._base_url + 'RunSimulation_API'
+
+        if track_token is not None:
+            self._track_token = track_token
+
+        if self._track_token == "":
+            return 'error: no model is created in this simulation job. ' \
+                   'Please create a model use create_model method.'
+
+        payload = {
+            'project_api_key': self._project_key,
+            'track_token': self._track_token,
+            'simulation_type': simulation_type,
+            'agents': agent,
+            'design_cond': design_condition,
+            'unit': unit,
+        }
+
+        if simulation_type == 'regular':
+            payload['do_load_simulation'] = 'no'
+        else:
+            payload['do_load_simulation'] = 'yes'
+
+        print("Submitting simulation request...")
+        r = await request_post(url, payload, transport=self._transport)
+        if not self._http_code_check(r):
+            return False
+        resp_json = r.json()
+        if resp_json['status'] != 'success':
+            return resp_json['error_msg']
+
+        self._track_token = resp_json['tracking']
+
+        # log
+        if self._logger is not None:
+            self._logger.write_in_message('ModelSimulation', 'RunModelSimulation', self._project_key,
+                                          self._track_token, '200', self._track_token)
+
+        if track:
+            while await self.track_simulation():
+                print(self.track_status)
+                await asyncio.sleep(request_time)
+        print(self.track_status)
+        if self.track_status == 'Simulation finished successfully':
+            print('Completed! You can retrieve results using the key: ' + self._track_token)
+            return AsyncModel(self._project_key, self._track_token, self._base_url, transport=self._transport)
+        else:
+            return True
+
+    async def create_run_model(self, file_dir, epw_dir=None, add_files=None, unit='ip', design_condition='yes',
+                               agent=1, comment="Python API", track=False, request_time=5, max_workers=4,
+                               submit_interval=1):
+        """deprecated - works the same as the run function now."""
+        return await self.run(file_dir, epw_dir, add_files, unit, design_condition, agent,
+                              comment, track, request_time, max_workers, submit_interval)
+
+    async def create_model(self, file_dir, epw_dir=None, add_files=None, comment="Upload through Python API"):
+        """
+        Upload an energy model but no simulation, see SimulationJob.create_model
+
+        :return: AsyncModel, upload success or False, otherwise
+        """
+        url = self._base_url + 'CreateModel_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'comment': comment,
+            'do_load_simulation': 'no',
+            'agents': ''
+        }
+
+        files = dict()
+        # binary so the files are streamed as they are, without decoding
+        files['model'] = open(file_dir, 'rb')
+        if epw_dir is not None:
+            files['weather_file'] = open(epw_dir, 'rb')
+        if add_files is not None:
+            files['schedule_csv'] = zip_add_files(add_files)
+
+        print('submitting model to the server...')
+        r = await request_post(url, payload, files, self._transport)
+        if r.status_code == 500:
+            self._track_status = 'Code: ' + str(r.status_code)
+            print(self._track_status)
+            return False
+        resp_json = r.json()
+        if r.status_code > 200:
+            try:
+                self._track_status = 'Code: ' + str(r.status_code) + \
+                    ' message: ' + resp_json['error_msg']
+            except (KeyError, TypeError):
+                print(self._track_status)
+            return False
+
+        if resp_json['status'] == 'no_simulation':
+            self._track_token = resp_json['tracking']
+            self._model_api_key = resp_json['model_api_key']
+
+            # log
+            if self._logger is not None:
+                self._logger.write_in_message('ModelSimulation', 'UploadModel', self._project_key,
+                                              self._track_token, '200', self._track_token)
+            print(self._track_token)
+            return AsyncModel(self.project_key, self._track_token, self._base_url, transport=self._transport)
+        else:
+            if 'error_msg' in resp_json:
+                print(resp_json['error_msg'])
+            else:
+                print(resp_json)
+            return False
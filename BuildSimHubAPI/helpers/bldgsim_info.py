@@ -1,5 +1,87 @@
-
+import os
 import os.path
+import threading
+
+# environment variables that override the info.config settings
+ENV_VARS = {
+    'user_api_key': 'BUILDSIMHUB_USER_API_KEY',
+    'base_url': 'BUILDSIMHUB_BASE_URL',
+    'vendor_id': 'BUILDSIMHUB_VENDOR_ID'
+}
+
+_lock = threading.Lock()
+# the resolved settings, loaded on first use
+_settings = None
+# settings given in memory through configure_meta_info
+_overrides = dict()
+
+
+def _config_path():
+    dirpath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    return os.path.join(dirpath, 'info.config')
+
+
+def _load_settings():
+    settings = {'user_api_key': None, 'base_url': None, 'vendor_id': None}
+
+    q = _config_path()
+    if os.path.exists(q):
+        with open(q, 'r') as f:
+            for line in f:
+                if '=' not in line:
+                    continue
+                key, value = line.strip().split("=", 1)
+                key = key.strip()
+                if key in settings:
+                    settings[key] = value.strip()
+
+    for key, env in ENV_VARS.items():
+        if os.environ.get(env):
+            settings[key] = os.environ[env].strip()
+    settings.update(_overrides)
+    return settings
+
+
+def get_settings():
+    """
+    The resolved settings, info.config is only read the first time
+
+    Priority: configure_meta_info > environment variables > info.config
+    """
+    global _settings
+    settings = _settings
+    if settings is None:
+        with _lock:
+            if _settings is None:
+                _settings = _load_settings()
+            settings = _settings
+    return settings
+
+
+def invalidate_meta_info():
+    """Forget the cached settings, info.config and the environment are read again on next use"""
+    global _settings
+    with _lock:
+        _settings = None
+
+
+def configure_meta_info(user_api_key=None, base_url=None, vendor_id=None):
+    """
+    Set the settings in memory, they take priority over info.config and the environment variables
+
+    :param user_api_key: optional
+    :param base_url: optional
+    :param vendor_id: optional
+    """
+    global _settings
+    with _lock:
+        if user_api_key is not None:
+            _overrides['user_api_key'] = user_api_key
+        if base_url is not None:
+            _overrides['base_url'] = base_url
+        if vendor_id is not None:
+            _overrides['vendor_id'] = vendor_id
+        _settings = None
 
 
 class MetaInfo(object):
@@ -9,24 +91,16 @@ class MetaInfo(object):
     read the info configuration
     api and base_url (for testing)
 
+    The configuration is loaded once per process and shared,
+    see invalidate_meta_info and configure_meta_info
+
     """
 
     def __init__(self):
-        dirpath = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        assert(os.path.isdir(dirpath))
-
-        q = os.path.join(dirpath, 'info.config')
-        assert(os.path.exists(q))
-
-        with open(q, 'r') as f:
-            for line in f:
-                key, value = line.strip().split("=")
-                if key == 'user_api_key':
-                    self._user_key = value.strip()
-                elif key == 'base_url':
-                    self._base_url = value.strip()
-                elif key == 'vendor_id':
-                    self._vendor_id = value.strip()
+        settings = get_settings()
+        self._user_key = settings['user_api_key']
+        self._base_url = settings['base_url']
+        self._vendor_id = settings['vendor_id']
 
     @property
     def user_key(self):
@@ -6,9 +6,10 @@ class ClassTemplate(object):
     # every call will connect to this base URL
     BASE_URL = 'https://my.buildsim.io/'
 
-    def __init__(self, project_api_key, track_token, class_label, base_url=None, logger=None):
+    def __init__(self, project_api_key, track_token, class_label, base_url=None, logger=None, session=None):
 
         self._project_api_key = project_api_key
+        self._session = session
         self._track_token = track_token
         self._base_url = ClassTemplate.BASE_URL
         self._class_label = class_label
@@ -35,7 +36,7 @@ class ClassTemplate(object):
             'class_label': class_label
         }
         url = self._base_url + 'GetClassTemplate_API'
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
         resp_json = r.json()
         if r.status_code > 200:
             try:
@@ -0,0 +1,199 @@
+"""
+gzip / deflate support for httpurllib.
+
+Responses are requested with Accept-Encoding and decompressed transparently,
+upload bodies can optionally be sent gzip compressed.
+The counters returned by get_compression_stats() tell how many bytes went over
+the wire compared with the uncompressed size.
+"""
+import zlib
+import threading
+
+ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class CompressionStats(object):
+
+    def __init__(self):
+        """Byte counters of the compressed transfers"""
+        self._lock = threading.Lock()
+        self._received_wire = 0
+        self._received_decoded = 0
+        self._sent_wire = 0
+        self._sent_decoded = 0
+
+    @property
+    def bytes_received(self):
+        """Number of response bytes received over the wire"""
+        return self._received_wire
+
+    @property
+    def bytes_received_decoded(self):
+        """Number of response bytes after decompression"""
+        return self._received_decoded
+
+    @property
+    def bytes_sent(self):
+        """Number of compressed upload bytes sent over the wire"""
+        return self._sent_wire
+
+    @property
+    def bytes_sent_decoded(self):
+        """Number of upload bytes before compression"""
+        return self._sent_decoded
+
+    @property
+    def bytes_saved(self):
+        """Number of bytes the compression saved in both directions"""
+        return (self._received_decoded - self._received_wire) + (self._sent_decoded - self._sent_wire)
+
+    def record_response(self, wire, decoded):
+        with self._lock:
+            self._received_wire += wire
+            self._received_decoded += decoded
+
+    def record_upload(self, wire, decoded):
+        with self._lock:
+            self._sent_wire += wire
+            self._sent_decoded += decoded
+
+    def stats(self):
+        with self._lock:
+            return {'bytes_received': self._received_wire, 'bytes_received_decoded': self._received_decoded,
+                    'bytes_sent': self._sent_wire, 'bytes_sent_decoded': self._sent_decoded}
+
+    def reset_stats(self):
+        with self._lock:
+            self._received_wire = 0
+            self._received_decoded = 0
+            self._sent_wire = 0
+            self._sent_decoded = 0
+
+
+_compression_stats = CompressionStats()
+
+
+def get_compression_stats():
+    """The byte counters shared by all the requests"""
+    return _compression_stats
+
+
+def decompressor(encoding):
+    """
+    A decompress object for the Content-Encoding of a response
+
+    :return: a zlib decompress object, None if the response is not compressed
+    """
+    if encoding is None:
+        return None
+    encoding = encoding.strip().lower()
+    if encoding in ('gzip', 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return _DeflateDecompressor()
+    return None
+
+
+def decode_body(data, encoding):
+    """
+    Decompress a complete response body and count the saved bytes
+
+    :param data: the body as received
+    :param encoding: the Content-Encoding header, None if there is none
+    :return: the decompressed body
+    """
+    decomp = decompressor(encoding)
+    if decomp is None:
+        return data
+    decoded = decomp.decompress(data) + decomp.flush()
+    _compression_stats.record_response(len(data), len(decoded))
+    return decoded
+
+
+class _DeflateDecompressor(object):
+    # servers send deflate either zlib wrapped or raw, pick the right one on the first bytes
+
+    def __init__(self):
+        self._obj = None
+
+    def decompress(self, data):
+        if self._obj is None:
+            if not data:
+                return b''
+            self._obj = zlib.decompressobj()
+            try:
+                return self._obj.decompress(data)
+            except zlib.error:
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._obj.decompress(data)
+
+    def flush(self):
+        if self._obj is None:
+            return b''
+        return self._obj.flush()
+
+
+class GzipBody(object):
+
+    def __init__(self, body, level=6):
+        """
+        gzip compress a streaming body (e.g. MultipartEncoder) while it is read
+
+        The compressed length is unknown up front, the body is sent with chunked transfer encoding
+
+        :param body: file-like object with read, rewind and close
+        :param level: compression level 1 - 9
+        """
+        self._body = body
+        self._level = level
+        self.CHUNK_SIZE = body.CHUNK_SIZE
+        self.len = None
+        self._compressor = zlib.compressobj(self._level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._buffer = b''
+        self._done = False
+
+    def headers(self):
+        headers = self._body.headers()
+        headers.pop('Content-Length', None)
+        headers['Content-Encoding'] = 'gzip'
+        return headers
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            chunks = list()
+            chunk = self.read(self.CHUNK_SIZE)
+            while chunk:
+                chunks.append(chunk)
+                chunk = self.read(self.CHUNK_SIZE)
+            return b''.join(chunks)
+
+        while len(self._buffer) < size and not self._done:
+            data = self._body.read(self.CHUNK_SIZE)
+            if data:
+                compressed = self._compressor.compress(data)
+            else:
+                compressed = self._compressor.flush()
+                self._done = True
+            _compression_stats.record_upload(len(compressed), len(data))
+            self._buffer += compressed
+
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def __iter__(self):
+        chunk = self.read(self.CHUNK_SIZE)
+        while chunk:
+            yield chunk
+            chunk = self.read(self.CHUNK_SIZE)
+
+    def rewind(self):
+        if not self._body.rewind():
+            return False
+        self._compressor = zlib.compressobj(self._level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._buffer = b''
+        self._done = False
+        return True
+
+    def close(self):
+        self._body.close()
@@ -0,0 +1,208 @@
+"""
+Per-host keep-alive connection pool used by httpurllib.
+
+All the helpers (Model, ParametricModel, SimulationJob, ParametricJob, ClassTemplate)
+send their requests through httpurllib, so they all share the pool returned by
+get_connection_pool()
+"""
+import ssl
+import time
+import select
+import threading
+
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+
+
+class ConnectionPool(object):
+
+    def __init__(self, max_size=10, idle_timeout=4):
+        """
+        Construct a connection pool
+
+        :param max_size: maximum number of idle connections kept for each host
+        :param idle_timeout: seconds an idle connection stays in the pool before it is evicted,
+            keep it below the keep-alive timeout of the server (often 5 s)
+        :type max_size: int
+        :type idle_timeout: float
+        """
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # (is_ssl, host) -> list of (connection, last used time)
+        self._idle = dict()
+        self._hits = 0
+        self._misses = 0
+        self._reconnects = 0
+
+        try:
+            self._context = ssl._create_unverified_context()
+        except AttributeError:
+            # Python < 2.7.9 doesn't support ssl
+            self._context = None
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        self._max_size = value
+
+    @property
+    def idle_timeout(self):
+        return self._idle_timeout
+
+    @idle_timeout.setter
+    def idle_timeout(self, value):
+        self._idle_timeout = value
+
+    @property
+    def hits(self):
+        """Number of requests served by a reused connection"""
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of requests that had to open a new connection"""
+        return self._misses
+
+    @property
+    def reconnects(self):
+        """Number of reused connections found closed by the server and replaced"""
+        return self._reconnects
+
+    def stats(self):
+        with self._lock:
+            idle = 0
+            for conns in self._idle.values():
+                idle += len(conns)
+            return {'hits': self._hits, 'misses': self._misses,
+                    'reconnects': self._reconnects, 'idle': idle}
+
+    def new_connection(self, host, is_ssl):
+        if is_ssl and self._context is not None:
+            return httplib.HTTPSConnection(host, context=self._context)
+        return httplib.HTTPConnection(host)
+
+    def acquire(self, host, is_ssl):
+        """
+        Get a connection to the host, reuse an idle one if there is any
+
+        :return: the connection and whether it was reused from the pool
+        :rtype: (HTTPConnection, bool)
+        """
+        key = (is_ssl, host)
+        now = time.time()
+        expired = list()
+        conn = None
+        with self._lock:
+            conns = self._idle.get(key, [])
+            while conns:
+                candidate, last_used = conns.pop()
+                if now - last_used > self._idle_timeout or not self._is_alive(candidate):
+                    expired.append(candidate)
+                else:
+                    conn = candidate
+                    break
+            if conn is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        for stale in expired:
+            stale.close()
+
+        if conn is not None:
+            return conn, True
+        return self.new_connection(host, is_ssl), False
+
+    @staticmethod
+    def _is_alive(conn):
+        """
+        whether an idle connection can take a request: nothing is expected from the server,
+        a readable socket means it was closed (EOF) or sent something unasked
+        """
+        sock = conn.sock
+        if sock is None:
+            return False
+        try:
+            if hasattr(select, 'poll'):
+                poller = select.poll()
+                poller.register(sock, select.POLLIN | select.POLLPRI | select.POLLHUP | select.POLLERR)
+                return len(poller.poll(0)) == 0
+            return len(select.select([sock], [], [], 0)[0]) == 0
+        except (OSError, ValueError):
+            return False
+
+    def release(self, host, is_ssl, conn, reusable=True):
+        """
+        Give a connection back to the pool once its response has been read completely
+
+        :param reusable: False if the server asked to close the connection
+        """
+        if not reusable:
+            conn.close()
+            return
+
+        key = (is_ssl, host)
+        now = time.time()
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            # evict the connections that have been idle for too long
+            keep = list()
+            for candidate, last_used in conns:
+                if now - last_used > self._idle_timeout:
+                    candidate.close()
+                else:
+                    keep.append((candidate, last_used))
+            if len(keep) < self._max_size:
+                keep.append((conn, now))
+                conn = None
+            self._idle[key] = keep
+
+        if conn is not None:
+            conn.close()
+
+    def record_reconnect(self):
+        with self._lock:
+            self._reconnects += 1
+
+    def clear(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle = self._idle
+            self._idle = dict()
+        for conns in idle.values():
+            for conn, last_used in conns:
+                conn.close()
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._reconnects = 0
+
+
+_connection_pool = ConnectionPool()
+
+
+def get_connection_pool():
+    """The connection pool shared by all the requests"""
+    return _connection_pool
+
+
+def configure_connection_pool(max_size=None, idle_timeout=None):
+    """
+    Change the shared connection pool settings
+
+    :param max_size: maximum number of idle connections kept for each host
+    :param idle_timeout: seconds an idle connection stays in the pool
+    """
+    if max_size is not None:
+        _connection_pool.max_size = max_size
+    if idle_timeout is not None:
+        _connection_pool.idle_timeout = idle_timeout
+    return _connection_pool
@@ -1,18 +1,115 @@
 import re
 import webbrowser
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from .httpurllib import request_get
 from .httpurllib import request_post
 from .httpurllib import make_url
+from .httpurllib import HTTPConnect
+from .result_cache import cached_request_get
+from .result_cache import get_result_cache
 from .class_template import ClassTemplate
 from .eplus_object import EnergyPlusObject
 
+# Model.results metric name (the name of the Model method) -> request_data of GetBuildingSimulationResults_API
+RESULT_METRICS = OrderedDict([
+    ('net_site_eui', 'NetSiteEUI'),
+    ('total_site_eui', 'TotalSiteEUI'),
+    ('not_met_hour_cooling', 'NotMetHoursCooling'),
+    ('not_met_hour_heating', 'NotMetHoursHeating'),
+    ('not_met_hour_total', 'NotMetHoursTotal'),
+    ('total_end_use_electricity', 'TotalEndUseElectricity'),
+    ('total_end_use_naturalgas', 'TotalEndUseNaturalGas'),
+    ('cooling_electricity', 'CoolingElectricity'),
+    ('cooling_naturalgas', 'CoolingNaturalGas'),
+    ('domestic_hotwater_electricity', 'DomesticHotWaterElectricity'),
+    ('domestic_hotwater_naturalgas', 'DomesticHotWaterNaturalGas'),
+    ('exterior_equipment_electricity', 'ExteriorEquipmentElectricity'),
+    ('exterior_equipment_naturalgas', 'ExteriorEquipmentNaturalGas'),
+    ('exterior_lighting_electricity', 'ExteriorLightingElectricity'),
+    ('exterior_lighting_naturalgas', 'ExteriorLightingNaturalGas'),
+    ('fan_electricity', 'FansElectricity'),
+    ('fan_naturalgas', 'FansNaturalGas'),
+    ('heating_electricity', 'HeatingElectricity'),
+    ('heating_naturalgas', 'HeatingNaturalGas'),
+    ('heat_rejection_electricity', 'HeatRejectionElectricity'),
+    ('heat_rejection_naturalgas', 'HeatRejectionNaturalGas'),
+    ('interior_equipment_electricity', 'InteriorEquipmentElectricity'),
+    ('interior_equipment_naturalgas', 'InteriorEquipmentNaturalGas'),
+    ('interior_lighting_electricity', 'InteriorLightingElectricity'),
+    ('interior_lighting_naturalgas', 'InteriorLightingNaturalGas'),
+    ('pumps_electricity', 'PumpsElectricity'),
+    ('pumps_naturalgas', 'PumpsNaturalGas'),
+    ('bldg_lpd', 'BuildingLPD'),
+    ('bldg_epd', 'BuildingEPD'),
+    ('bldg_ppl', 'BuildingPPL'),
+    ('wall_rvalue', 'WallRValue'),
+    ('roof_rvalue', 'RoofRValue'),
+    ('window_uvalue', 'WindowUValue'),
+    ('window_shgc', 'WindowSHGC'),
+    ('roof_absorption', 'RoofAbsorption'),
+    ('bldg_infiltration', 'Infiltration'),
+    ('bldg_water_heater_efficiency', 'WaterHeaterEfficiency'),
+    ('bldg_dx_cooling_efficiency', 'DXCoolingCoilEfficiency'),
+    ('bldg_chiller_efficiency', 'ChillerEfficiency'),
+    ('bldg_electric_boiler_efficiency', 'ElectricBoilerEfficiency'),
+    ('bldg_fuel_boiler_efficiency', 'FuelBoilerEfficiency'),
+    ('bldg_dx_heating_efficiency', 'ElectricHeatingDXCoils')
+])
+
+# GetBuildingBasicInfo_API request_data requested at once by Model.prefetch_basic_info
+BASIC_INFO_REQUESTS = ('ZoneList', 'Orientation', 'BuildingStories', 'TotalZoneNumber', 'ConditionedZoneNumber',
+                       'ConditionedZoneFloorArea', 'ZoneFloorArea', 'TotalWindowToWallRatio')
+
+
+def _results_frame(track_token, results):
+    """one row DataFrame of Model.results, indexed by the track token, the units are in frame.attrs['units']"""
+    try:
+        import pandas as pd
+    except ImportError:
+        print('pandas is not installed')
+        return None
+    frame = pd.DataFrame([[entry['value'] for entry in results.values()]],
+                         index=[track_token], columns=list(results.keys()))
+    frame.attrs['units'] = dict((metric, entry['unit']) for metric, entry in results.items())
+    return frame
+
+
+def _hourly_frame(fetched, memmap_path=None):
+    """
+    Align the hourly data of Model.hourly_frame on one timestamp index
+
+    :param fetched: iterable of (variable, data returned from Model.hourly_data)
+    :param memmap_path: return the HourlySeries with the values in this memory-mapped file
+    :return: DataFrame with a timestamp column, the units are in frame.attrs['units'], or HourlySeries
+    """
+    from ..postprocess.hourly_series import HourlySeries
+    series = None
+    for variable, data in fetched:
+        if data is False or data is None:
+            print('Skipped ' + variable + ', the hourly data is not available')
+        elif series is None:
+            series = HourlySeries(data, variable)
+        elif not series.add_column(data, variable):
+            print('Skipped ' + variable)
+    if series is None:
+        return False
+    if memmap_path is not None:
+        series.to_memmap(memmap_path)
+        return series
+    frame = series.pandas_df()
+    if frame is not None:
+        frame.attrs['units'] = series.units
+    return frame
+
 
 class Model(object):
     # every call will connect to this base URL
     BASE_URL = 'https://my.buildsim.io/'
 
-    def __init__(self, project_api_key, track_token, base_url=None, logger=None):
+    def __init__(self, project_api_key, track_token, base_url=None, logger=None, session=None):
         """
         Construct Model object
 
@@ -31,17 +128,24 @@ class Model(object):
         :param track_token: required - track_token and model_api_key can be used interchangeably
         :param base_url: optional, this is only for testing purpose
         :param logger: a buildsim logger object - None means no log
+        :param session: optional, the Session the request settings come from - None uses the shared one
         :type project_api_key: str
         :type track_token: str
 
         """
         self._project_api_key = project_api_key
+        self._session = session
         self._last_parameter_unit = ""
         self._track_token = track_token
         self._base_url = Model.BASE_URL
         self._logger = None
         # record all the messages in API calling
         self._log = ""
+        # (request_data, zone_name) -> GetBuildingBasicInfo_API response, see prefetch_basic_info
+        self._basic_info = dict()
+        self._basic_info_lock = threading.Lock()
+        # whether the simulation finished successfully, only then the results are cached
+        self._finished = False
 
         if logger is not None:
             self._logger = logger
@@ -50,13 +154,13 @@ class Model(object):
             self._base_url = base_url
         # if this is model api key, we will record the commit id
         test = self._track_token.split('-')
-        if len(test) is not 3:
+        if len(test) != 3:
             url = self._base_url + 'GetFirstModelOfBranch_API'
             payload = {
                 'project_api_key': self._project_api_key,
                 'folder_api_key': self._track_token
             }
-            r = request_get(url, params=payload)
+            r = request_get(url, params=payload, session=self._session)
             resp_json = r.json()
             if r.status_code > 200:
                 try:
@@ -98,14 +202,14 @@ class Model(object):
         url = self._base_url + 'Viewer3DData_API'
         track = 'model_api_key'
         test = self._track_token.split('-')
-        if len(test) is 3:
+        if len(test) == 3:
             track = 'track_token'
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'json': data
         }
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
         resp_json = r.json()
         if r.status_code > 200:
             try:
@@ -134,7 +238,7 @@ class Model(object):
         url = self._base_url + 'IDF3DViewerSocket.html'
         track = 'model_api_key'
         test = self._track_token.split('-')
-        if len(test) is 3:
+        if len(test) == 3:
             track = 'tracking'
 
         payload = {
@@ -156,7 +260,7 @@ class Model(object):
 
     def class_template(self, class_label):
         class_template = ClassTemplate(self._project_api_key, self._track_token,
-                                       class_label, self._base_url, self._logger)
+                                       class_label, self._base_url, self._logger, self._session)
         data = class_template.get_raw_data()
         return data
 
@@ -172,7 +276,7 @@ class Model(object):
             'cmp_model_api_key': target_key
         }
         print('comparing: ' + self._track_token + ' with ' + target_key)
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
         resp_json = r.json()
 
         # log action
@@ -203,7 +307,7 @@ class Model(object):
             'base_model_api_key': self._track_token,
             'cmp_model_api_key': target_key
         }
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
         resp_json = r.json()
 
         # log action
@@ -238,7 +342,7 @@ class Model(object):
 
         if project_api_key != '':
             payload['target_project_api_key'] = project_api_key
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
         resp_json = r.json()
 
         # log action
@@ -273,15 +377,12 @@ class Model(object):
         :return: design in dict data structure
         """
         url = self._base_url + 'GetDesignDayData_API'
-        track = 'folder_api_key'
-        test = self._track_token.split('-')
-        if len(test) is 3:
-            track = 'track_token'
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
         }
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
         resp_json = r.json()
 
         # log action
@@ -309,6 +410,38 @@ class Model(object):
         else:
             return -1
 
+    def prefetch_basic_info(self, max_workers=8):
+        """
+        Request the building basic info (zone list, orientation, stories, number of zones, floor areas
+        and window to wall ratio) at once, concurrently.
+
+        The basic info is memoized by the model: zone_list, bldg_orientation, num_above_ground_floor,
+        num_total_floor, num_zones, num_condition_zones, condition_floor_area, gross_floor_area
+        and window_wall_ratio don't send a request once it is fetched. apply_measures,
+        parameter_batch_modification, add_object, add_modify_zone and hvac_swap forget it.
+
+        :param max_workers: maximum number of requests in flight
+        :return: True if all the basic info was fetched, False otherwise
+        """
+        url = self._base_url + 'GetBuildingBasicInfo_API'
+        track = self.__track_key()
+
+        def fetch(request_data):
+            payload = {
+                'project_api_key': self._project_api_key,
+                track: self._track_token,
+                'request_data': request_data
+            }
+            return self.__basic_info_get(url, payload).status_code == 200
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(BASIC_INFO_REQUESTS)))) as executor:
+            return all(list(executor.map(fetch, BASIC_INFO_REQUESTS)))
+
+    def invalidate_basic_info(self):
+        """Forget the memoized building basic info, it is requested again on next use"""
+        with self._basic_info_lock:
+            self._basic_info = dict()
+
     def zone_info(self, zone_name):
         """
         Get a zone's information regarding:
@@ -327,17 +460,14 @@ class Model(object):
 
         """
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = 'folder_api_key'
-        test = self._track_token.split('-')
-        if len(test) is 3:
-            track = 'track_token'
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'ZoneInfo',
             'zone_name': zone_name
         }
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         # log action
@@ -375,17 +505,14 @@ class Model(object):
         'zone_vent': 'VAV Sys 1', 'zone_exhaust': ''}]
         """
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = 'folder_api_key'
-        test = self._track_token.split('-')
-        if len(test) is 3:
-            track = 'track_token'
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'ZoneList'
         }
 
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         # log action
@@ -416,10 +543,7 @@ class Model(object):
         :return:
         """
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -427,7 +551,7 @@ class Model(object):
             'request_data': 'Orientation'
         }
 
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         if r.status_code > 200:
@@ -458,11 +582,10 @@ class Model(object):
         """
         Test function - do not use it
         """
+        # the model changes - the memoized basic info is outdated
+        self.invalidate_basic_info()
         url = self._base_url + 'HVACModelSwap_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -484,9 +607,9 @@ class Model(object):
         files = dict()
         if temp_dir is not None:
             files['model'] = open(temp_dir, 'rb')
-            r = request_post(url, params=payload, files=files)
+            r = request_post(url, params=payload, files=files, session=self._session)
         else:
-            r = request_post(url, params=payload)
+            r = request_post(url, params=payload, session=self._session)
 
         resp_json = r.json()
         if r.status_code > 200:
@@ -537,17 +660,14 @@ class Model(object):
         :return:
         """
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'BuildingStories'
         }
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         if r.status_code > 200:
@@ -580,16 +700,13 @@ class Model(object):
     def num_total_floor(self):
         """Total floor = above ground floors + below ground floors"""
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'BuildingStories'
         }
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         if r.status_code > 200:
@@ -618,17 +735,14 @@ class Model(object):
     def num_zones(self):
         """Include conditioned & unconditioned zones"""
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'TotalZoneNumber'
         }
 
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         if r.status_code > 200:
@@ -657,16 +771,13 @@ class Model(object):
     def num_condition_zones(self):
         """Conditioned zones only"""
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'ConditionedZoneNumber'
         }
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         if r.status_code > 200:
@@ -695,16 +806,13 @@ class Model(object):
     def condition_floor_area(self, unit='si'):
         """Total conditioned floor area"""
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'ConditionedZoneFloorArea'
         }
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
 
         if r.status_code > 200:
@@ -739,16 +847,13 @@ class Model(object):
     def gross_floor_area(self, unit='si'):
         """Total floor area"""
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'ZoneFloorArea'
         }
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
         if r.status_code > 200:
 
@@ -782,16 +887,13 @@ class Model(object):
     def window_wall_ratio(self):
         """Window to wall ratio"""
         url = self._base_url + 'GetBuildingBasicInfo_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'request_data': 'TotalWindowToWallRatio'
         }
-        r = request_get(url, params=payload)
+        r = self.__basic_info_get(url, payload)
         resp_json = r.json()
         if r.status_code > 200:
             # log action
@@ -831,11 +933,7 @@ class Model(object):
         :return:
         """
         url = self._base_url + 'GetZoneLoadInfo_API'
-        track = "folder_api_key"
-
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -845,7 +943,8 @@ class Model(object):
         if zone_name is not None:
             payload['zone_name'] = zone_name
 
-        r = request_get(url, params=payload)
+        r = cached_request_get(url, payload, self._project_api_key, self._track_token, self._session,
+                               self.__is_finished)
         resp_json = r.json()
 
         # log action
@@ -884,18 +983,17 @@ class Model(object):
                 temp_obj = template.get_object()
                 idf_data.append(temp_obj)
 
+        # the model changes - the memoized basic info is outdated
+        self.invalidate_basic_info()
         url = self._base_url + 'AddNewObjects_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
             'object_list': idf_data
         }
 
-        r = request_post(url, params=payload)
+        r = request_post(url, params=payload, session=self._session)
         if r.status_code == 200:
             data = r.json()
             print(data['message'])
@@ -937,11 +1035,10 @@ class Model(object):
                 return -1
             temp_data.append(template.get_object())
 
+        # the model changes - the memoized basic info is outdated
+        self.invalidate_basic_info()
         url = self._base_url + 'ModifyZoneDataInModel_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -952,7 +1049,7 @@ class Model(object):
         data['zone_list'] = zone_list
         data['component_template'] = temp_data
         payload['request_content'] = data
-        r = request_post(url, params=payload)
+        r = request_post(url, params=payload, session=self._session)
         if r.status_code == 200:
             data = r.json()
             print(data['message'])
@@ -975,20 +1072,18 @@ class Model(object):
                 print(r_json)
             return False
 
-    def get_simulation_results(self, result_type="html", accept='file'):
+    def get_simulation_results(self, result_type="html", accept='file', dest=None):
         """
         get a simulation result file (only use after the simulation is completed)
 
         :param result_type: currently available option include html, err, eso, eio, rdd
         :param accept:
-        :return: text of the file, or error code
+        :param dest: optional, a file path - the result file is streamed straight to this file
+        :return: text of the file, or error code. If dest is provided, the dest path
         :rtype: string
 
         """
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         url = self._base_url + 'GetSimulationResult_API'
         payload = {
@@ -997,13 +1092,16 @@ class Model(object):
             'accept': accept,
             track: self._track_token
         }
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, stream=dest is not None, session=self._session)
 
         # log action
         if self._logger is not None:
             self._logger.write_in_message('Model', 'SimulationResults', self._project_api_key,
                                           self._track_token, r.status_code, 'simulation_results: ' + result_type)
         if r.status_code == 200:
+            if dest is not None:
+                r.save_to(dest)
+                return dest
             if accept == 'string':
                 res = json.loads(r.json())
                 return res['file_name'], res['data']
@@ -1034,10 +1132,7 @@ class Model(object):
         """
 
         url = self._base_url + 'GetSingleValueFromModel_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -1048,7 +1143,7 @@ class Model(object):
             track: self._track_token
         }
 
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
 
         # log action
         if self._logger is not None:
@@ -1080,10 +1175,7 @@ class Model(object):
         """
 
         url = self._base_url + 'GetObjectsFromModel_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -1091,7 +1183,7 @@ class Model(object):
             'class_name': "" if class_name is None else class_name,
             track: self._track_token
         }
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, session=self._session)
 
         # log action
         if self._logger is not None:
@@ -1123,11 +1215,10 @@ class Model(object):
          under the class: buildingsurface:detail
         :return: false or new model api key
         """
+        # the model changes - the memoized basic info is outdated
+        self.invalidate_basic_info()
         url = self._base_url + 'BasicModelModification_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -1140,7 +1231,7 @@ class Model(object):
         if class_name is not None:
             payload['class_name'] = class_name
 
-        r = request_post(url, params=payload)
+        r = request_post(url, params=payload, session=self._session)
 
         if r.status_code == 200:
             data = r.json()
@@ -1176,11 +1267,10 @@ class Model(object):
         :return: new model API key
 
         """
+        # the model changes - the memoized basic info is outdated
+        self.invalidate_basic_info()
         url = self._base_url + 'ModifyModel_API'
-        track_label = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track_label = "track_token"
+        track_label = self.__track_key()
 
         payload = {
             track_label: self._track_token,
@@ -1197,7 +1287,7 @@ class Model(object):
             payload[action.get_api_name()] = data_str
 
         print('Applying measure to model: ' + self._track_token)
-        r = request_post(url, params=payload)
+        r = request_post(url, params=payload, session=self._session)
 
         if r.status_code == 200:
             data = r.json()
@@ -1222,35 +1312,30 @@ class Model(object):
             return False
 
     def download_link(self):
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         url = self._base_url + 'GetModel_API?project_api_key='+ self._project_api_key + '&' + track + '=' + self._track_token
 
         return url
 
-    def download_model(self):
+    def download_model(self, path=None):
         """
         Help download a model from the a project
         the model will be the latest history of the model
 
-        :return:
+        :param path: optional, a file path - the model is streamed straight to this file
+        :return: the model, or the path if it is provided
         """
         url = self._base_url + 'GetModel_API'
 
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
             track: self._track_token,
         }
 
-        r = request_get(url, params=payload)
+        r = request_get(url, params=payload, stream=path is not None, session=self._session)
 
         # log action
         if self._logger is not None:
@@ -1258,6 +1343,9 @@ class Model(object):
                                           self._track_token, r.status_code,
                                           'download_model')
         if r.status_code == 200:
+            if path is not None:
+                r.save_to(path)
+                return path
             return r.json()
         else:
             rj = r.json()
@@ -1275,10 +1363,7 @@ class Model(object):
             variable_list_request = True
 
         url = self._base_url + 'GetHourlyVariableFromEso_API'
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -1288,7 +1373,8 @@ class Model(object):
         if not variable_list_request:
             payload['variable'] = data
 
-        r = request_get(url, params=payload)
+        r = cached_request_get(url, payload, self._project_api_key, self._track_token, self._session,
+                               self.__is_finished)
 
         # log action
         if self._logger is not None:
@@ -1312,6 +1398,38 @@ class Model(object):
                 print(rj)
             return False
 
+    def hourly_frame(self, variables=None, memmap_path=None, max_workers=8):
+        """
+        Get the hourly data of many variables at once, the requests are sent concurrently
+        and the variables are aligned on one timestamp index
+
+        Example:
+            df = model.hourly_frame(['Electricity:Facility', 'Cooling:Electricity'])
+            df.attrs['units']
+            {'Electricity:Facility': 'J', 'Cooling:Electricity': 'J'}
+
+        :param variables: the output variables, all the variables of the model (hourly_data()) if None
+        :param memmap_path: optional, keep the values in this memory-mapped file (for very large sets)
+            and return the HourlySeries instead of a DataFrame
+        :param max_workers: maximum number of requests in flight
+        :type variables: list
+        :type memmap_path: str
+        :return: DataFrame with a timestamp column and one column per variable,
+            the units are in frame.attrs['units']. Variables that fail or don't match the
+            resolution of the first one are skipped. False if no data
+        :rtype: pandas.DataFrame or HourlySeries
+        """
+        if variables is None:
+            variables = self.hourly_data()
+            if variables is False:
+                return False
+        if len(variables) == 0:
+            return False
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(variables)))) as executor:
+            # the columns are added as the responses come in, in the order of variables
+            return _hourly_frame(zip(variables, executor.map(self.hourly_data, variables)), memmap_path)
+
     def html_table(self, report, table, report_for='EntireFacility'):
         """
         get an HTML table for plot
@@ -1328,10 +1446,7 @@ class Model(object):
 
         table_id = r + ":" + rf + ":" + t
 
-        track = "folder_api_key"
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -1339,7 +1454,8 @@ class Model(object):
             'table_name': table_id
         }
 
-        r = request_get(url, params=payload)
+        r = cached_request_get(url, payload, self._project_api_key, self._track_token, self._session,
+                               self.__is_finished)
 
         # log action
         if self._logger is not None:
@@ -1377,6 +1493,41 @@ class Model(object):
     def monthly_setpoint_not_met_zone(self, zone=None):
         return self.__monthly_call_api('SetpointNotMetZoneMonthly', zone)
 
+    def results(self, metrics=None, as_frame=False, max_workers=8):
+        """
+        Get many result metrics at once, the requests are sent concurrently
+
+        Example:
+            model.results(['net_site_eui', 'cooling_electricity'])
+            {'net_site_eui': {'value': 512.3, 'unit': 'MJ/m2'}, 'cooling_electricity': {...}}
+
+        :param metrics: names of the result methods (see RESULT_METRICS), all of them if None.
+            Other names are sent to the server as they are
+        :param as_frame: return a one row pandas DataFrame, the units are in frame.attrs['units']
+        :param max_workers: maximum number of requests in flight
+        :type metrics: list
+        :type as_frame: bool
+        :return: metric -> {'value': value, 'unit': unit or None}, in the order of metrics.
+            The value is what the metric method returns, False or -1 on error
+        :rtype: dict or pandas.DataFrame
+        """
+        if metrics is None:
+            metrics = list(RESULT_METRICS.keys())
+
+        results = OrderedDict()
+        if len(metrics) > 0:
+            is_finished = self.__is_finished_once()
+
+            def fetch(metric):
+                return self.__fetch_result(RESULT_METRICS.get(metric, metric), is_finished=is_finished)
+
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(metrics)))) as executor:
+                for metric, (value, unit) in zip(metrics, executor.map(fetch, metrics)):
+                    results[metric] = {'value': value, 'unit': unit}
+        if as_frame:
+            return _results_frame(self._track_token, results)
+        return results
+
     # Below are the methods use for retrieving results
     def net_site_eui(self):
         return self.__call_api('NetSiteEUI')
@@ -1415,7 +1566,7 @@ class Model(object):
         return self.__call_api('ExteriorEquipmentElectricity')
 
     def exterior_equipment_naturalgas(self):
-        return self.__call_api('ExteriorEquipmentElectricity')
+        return self.__call_api('ExteriorEquipmentNaturalGas')
 
     def exterior_lighting_electricity(self):
         return self.__call_api('ExteriorLightingElectricity')
@@ -1507,13 +1658,69 @@ class Model(object):
     def bldg_sys_loads(self, type="cooling"):
         return self.__call_api('BuildingSysLoad', type)
 
+    def __basic_info_get(self, url, payload):
+        """request GetBuildingBasicInfo_API, the successful responses are memoized"""
+        key = (payload['request_data'], payload.get('zone_name'))
+        with self._basic_info_lock:
+            resp_json = self._basic_info.get(key)
+        if resp_json is not None:
+            # HTTPConnect copies the memoized response, the caller can modify what it gets
+            return HTTPConnect(200, resp_json)
+
+        r = request_get(url, params=payload, session=self._session)
+        resp_json = r.json()
+        if r.status_code == 200 and isinstance(resp_json, dict) and resp_json.get('status') == 'success':
+            with self._basic_info_lock:
+                self._basic_info[key] = json.loads(json.dumps(resp_json))
+        return r
+
+    def __track_key(self):
+        """the request parameter of the token, track_token for a commit (x-x-x), folder_api_key for a model key"""
+        if len(self._track_token.split('-')) == 3:
+            return 'track_token'
+        return 'folder_api_key'
+
+    def __is_finished(self):
+        """whether the simulation of the track token finished successfully, its results don't change anymore"""
+        if self._finished:
+            return True
+        if len(self._track_token.split('-')) != 3:
+            # a model key without a commit follows the latest simulation of the model
+            return False
+        url = self._base_url + 'TrackSimulation_API'
+        payload = {
+            'track_token': self._track_token,
+            'project_api_key': self._project_api_key
+        }
+        try:
+            r = request_get(url, params=payload, session=self._session)
+            resp_json = r.json()
+        except ConnectionError:
+            return False
+        if r.status_code != 200:
+            return False
+        # parallel simulations report one entry per simulation
+        entries = resp_json if isinstance(resp_json, list) else [resp_json]
+        self._finished = len(entries) > 0 and all(
+            isinstance(entry, dict) and not entry.get('has_more') and 'severe_error' not in entry and
+            entry.get('msg') == 'Simulation finished successfully' for entry in entries)
+        return self._finished
+
+    def __is_finished_once(self):
+        """
+        __is_finished asked once for the requests sent concurrently, the workers share the answer
+        instead of each sending TrackSimulation_API before it is memoized
+
+        :return: the is_finished callable for cached_request_get, None without a result cache
+        """
+        if get_result_cache(self._session) is None:
+            return None
+        finished = self.__is_finished()
+        return lambda: finished
+
     def __monthly_call_api(self, request_data, request_component=None):
         url = self._base_url + 'GetBuildingMonthlyResults_API'
-        track = 'folder_api_key'
-
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = 'track_token'
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -1524,7 +1731,8 @@ class Model(object):
         if request_component is not None:
             payload['request_for'] = request_component
 
-        r = request_get(url, params=payload)
+        r = cached_request_get(url, payload, self._project_api_key, self._track_token, self._session,
+                               self.__is_finished)
         resp_json = r.json()
         # log action
         if self._logger is not None:
@@ -1559,12 +1767,21 @@ class Model(object):
             return -1
 
     def __call_api(self, request_data, zone_name=''):
-        url = self._base_url + 'GetBuildingSimulationResults_API'
-        track = "folder_api_key"
+        value, unit = self.__fetch_result(request_data, zone_name)
+        if unit is not None:
+            self._last_parameter_unit = unit
+        return value
 
-        test = self._track_token.split("-")
-        if len(test) is 3:
-            track = "track_token"
+    def __fetch_result(self, request_data, zone_name='', is_finished=None):
+        """
+        request GetBuildingSimulationResults_API, safe to call from many threads
+
+        :param is_finished: optional, replaces __is_finished (see __is_finished_once)
+
+        :return: (value, unit) - the unit is None if the server did not send one
+        """
+        url = self._base_url + 'GetBuildingSimulationResults_API'
+        track = self.__track_key()
 
         payload = {
             'project_api_key': self._project_api_key,
@@ -1573,7 +1790,8 @@ class Model(object):
             'zone_name': zone_name
         }
 
-        r = request_get(url, params=payload)
+        r = cached_request_get(url, payload, self._project_api_key, self._track_token, self._session,
+                               is_finished or self.__is_finished)
         resp_json = r.json()
         # log action
         if self._logger is not None:
@@ -1585,8 +1803,8 @@ class Model(object):
                 print('Code: ' + str(r.status_code) + ' message: ' + resp_json['error_msg'])
             except TypeError:
                 print(resp_json)
-                return
-            return False
+                return None, None
+            return False, None
 
         if resp_json['status'] == 'success':
             data = resp_json['data']
@@ -1595,16 +1813,12 @@ class Model(object):
             collections = data['collection']
 
             if value_type == 'Numeric':
-                value = data['value']
-                if 'unit' in data:
-                    self._last_parameter_unit = data['unit']
-                return value
+                return data['value'], data.get('unit')
             elif value_type == 'JsonObject':
                 if collections == 'true':
-                    value = data['array']
-                    return value
+                    return data['array'], None
                 else:
-                    value = data['value']
-                    return value
+                    return data['value'], None
+            return None, None
         else:
-            return -1
+            return -1, None
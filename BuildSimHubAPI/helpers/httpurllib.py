@@ -1,4 +1,3 @@
-import ssl
 import json
 try:
     import httplib
@@ -6,9 +5,27 @@ except ImportError:
     import http.client as httplib
 
 import urllib
-from .bldgsim_info import MetaInfo
+from .connection_pool import get_connection_pool
+from .multipart_encoder import MultipartEncoder
+from .compression import ACCEPT_ENCODING
+from .compression import GzipBody
+from .compression import decode_body
+from .streaming_response import StreamingResponse
+from .session import get_default_session
+from .retry import IDEMPOTENT_METHODS
 
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# number of pages request_large_data requests in parallel
+LARGE_DATA_WORKERS = 4
+
+try:
+    _STALE_CONNECTION_ERRORS = (httplib.BadStatusLine, ConnectionResetError, BrokenPipeError)
+except NameError:
+    # python 2
+    import socket
+    _STALE_CONNECTION_ERRORS = (httplib.BadStatusLine, socket.error)
 
 
 class HTTPConnect(object):
@@ -56,16 +73,15 @@ class HTTPConnect(object):
         return self._response_error
 
     def iter_content(self, chunk_size=1024):
-        contents = []
-
-        try:
-            chunk = self.response.read(chunk_size)
-            while len(chunk) > 0:
-                contents.append(chunk)
-                chunk = self.response.read(chunk_size)
-        except:
+        """iterate over the response body in chunks of bytes"""
+        content = self._original_response
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        if not isinstance(content, bytes):
             print('ERROR: response object cannot be iter read')
-        return contents
+            return
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
 
 
 def __split_path(path):
@@ -93,19 +109,106 @@ def __split_path(path):
         host = path[:slash_idx]
         req_path = path[slash_idx:]
 
+    return {'status': 'success', 'host': host, 'is_ssl': is_ssl, 'req_path': req_path}
+
+
+def __send(process, method, url, body=None, headers=None):
+    """
+    send one request over a pooled keep-alive connection
+
+    a reused connection that was closed by the server in the meantime
+    is replaced by a new one and the request is sent again: always if it failed while sending
+    the request, only for idempotent methods if it failed while reading the response
+    (the server may have processed the request). Compressed responses are accepted unless the headers ask for another Accept-Encoding
+
+    :return: the connection and its response
+    """
+    pool = get_connection_pool()
+    host = process['host']
+    is_ssl = process['is_ssl']
+    if headers is None:
+        headers = dict()
+    if 'Accept-Encoding' not in headers:
+        headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    conn, reused = pool.acquire(host, is_ssl)
+    sent = False
     try:
-        _create_unverified_https_context = ssl._create_unverified_context()
-    except AttributeError:
-        # Python < 2.7.9 doesn't support ssl
-        conn = httplib.HTTPConnection(host)
-    else:
-        if is_ssl:
-            conn = httplib.HTTPSConnection(host,
-                                           context=_create_unverified_https_context)
+        try:
+            conn.request(method, url, body, headers)
+            sent = True
+            resp = conn.getresponse()
+        except _STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            if sent and method.upper() not in IDEMPOTENT_METHODS:
+                # the response was lost, the retry policy decides
+                raise
+            if hasattr(body, 'rewind') and not body.rewind():
+                raise
+            pool.record_reconnect()
+            conn = pool.new_connection(host, is_ssl)
+            conn.request(method, url, body, headers)
+            resp = conn.getresponse()
+    except Exception:
+        conn.close()
+        raise
+    return conn, resp
+
+
+def __send_with_retry(process, method, url, body, headers, session):
+    """
+    send one request with the retry policy and the circuit breaker of the session
+
+    connection errors are raised again once the retries are exhausted,
+    a response with a retryable status is returned as it is
+
+    :return: the connection and its response
+    """
+    policy = session.retry_policy
+    breaker = session.circuit_breaker
+    host = process['host']
+    attempt = 0
+    while True:
+        breaker.before_request(host)
+        try:
+            conn, resp = __send(process, method, url, body, dict(headers))
+        except (OSError, httplib.HTTPException) as e:
+            breaker.record_failure(host)
+            if not policy.retry_on_error(method, attempt, e):
+                raise
+            if hasattr(body, 'rewind') and not body.rewind():
+                raise
+            time.sleep(policy.backoff(attempt))
+            attempt += 1
+            continue
+
+        if resp.status >= 500:
+            breaker.record_failure(host)
         else:
-            conn = httplib.HTTPConnection(host)
+            breaker.record_success(host)
 
-    return {'status': 'success', 'conn': conn, 'req_path': req_path}
+        if not policy.retry_on_status(method, attempt, resp.status):
+            return conn, resp
+        if hasattr(body, 'rewind') and not body.rewind():
+            return conn, resp
+        delay = policy.backoff(attempt, resp.getheader('Retry-After'))
+        # read the error body so the connection can be reused
+        __read(process, conn, resp)
+        time.sleep(delay)
+        attempt += 1
+
+
+def __read(process, conn, resp):
+    """read the whole response, decompress it and give the connection back to the pool"""
+    try:
+        data = resp.read()
+    except Exception:
+        conn.close()
+        raise
+    get_connection_pool().release(process['host'], process['is_ssl'], conn, not resp.will_close)
+    return decode_body(data, resp.getheader('Content-Encoding'))
 
 
 """
@@ -141,166 +244,234 @@ def __encode_multipart_formdata(fields, files):
 
 
 def __encode_multipart_formdata(params, files):
-    boundry = uuid.uuid4().hex
-    lines = list()
-    for key, val in params.items():
-        if val is None:
-            continue
-
-        lines.append('--' + boundry)
-        lines.append('Content-Disposition: form-data; name="%s"' % key)
-        lines.extend(['', val])
-
-    for key, f in files.items():
-        filename = f.name
-        slash = max(filename.rfind('/'), filename.rfind('\\'))
-        if slash >= 0:
-            filename = filename[slash + 1:]
+    """
+    build a streaming multipart body, the files are read while the request is sent
 
-        lines.append('--' + boundry)
-        lines.append('Content-Disposition: form-data; name="{0}"; filename="{1}"'.format(key, filename))
-        lines.append('Content-Type: application/octet-stream')
-        lines.append('')
-        lines.append(f.read())
+    :return: the request headers and the body
+    :rtype: (dict, MultipartEncoder)
+    """
+    body = MultipartEncoder(params, files)
+    return body.headers(), body
 
-    lines.append('--%s--' % boundry)
 
-    body = bytes()
-    for l in lines:
-        if isinstance(l, bytes):
-            body += l + b'\r\n'
-        else:
-            body += bytes(str(l), encoding='utf8') + b'\r\n'
-
-    headers = {'Content-Type' : 'multipart/form-data; boundary=' + boundry}
+def __request_page(process, params, start, session):
+    """
+    request one page of a large data request
 
-    return headers, body
+    :return: the page json, or None if the request failed
+    """
+    header = session.headers()
+    page_params = dict(params)
+    page_params['start'] = str(start)
+    # check 2.x and 3.x differences in using urllib
+    try:
+        url = process['req_path'] + "?" + urllib.urlencode(page_params)
+    except AttributeError:
+        url = process['req_path'] + "?" + urllib.parse.urlencode(page_params)
+    conn, resp = __send_with_retry(process, "GET", url, None, header, session)
+
+    if resp.status != 200:
+        print("Code: " + str(resp.status))
+        resp_obj = HTTPConnect(resp.status, __read(process, conn, resp)).json()
+        print(resp_obj)
+        return None
+    resp_obj_read = __read(process, conn, resp)
+    resp_obj = HTTPConnect(resp.status, resp_obj_read).json()
+    if type(resp_obj) is str:
+        try:
+            resp_obj = json.loads(resp_obj)
+        except:
+            # return error msg
+            print("parse json str failed")
+            # print(resp_obj)
+            return None
+    elif type(resp_obj) is dict:
+        try:
+            resp_obj = json.loads(json.dumps(resp_obj))
+        except:
+            print("parse dict failed")
+            print(resp_obj)
+            return None
+    else:
+        print("result not str")
+        print(resp_obj)
+        return None
+    return resp_obj
 
 
-def request_large_data(path, params):
+def request_large_data(path, params, max_workers=None, session=None):
     """
     This function is used to request parametric data
-    :return:
+
+    The first page tells the total number of records and the page size,
+    the remaining pages are then requested in parallel and put back in order.
+    If a page does not match the expected page size, the rest is requested one page at a time.
+
+    :param path: url
+    :param params: query parameters
+    :param max_workers: number of pages requested in parallel, 1 requests the pages one by one.
+        LARGE_DATA_WORKERS is used if None
+    :param session: optional, the Session the request settings come from
+    :return: list of records
     """
-    start = 0
     result = []
-    while True:
-        process = __split_path(path)
-        if process['status'] == 'success':
-            conn = process['conn']
-            info = MetaInfo()
-            header = {'vendor_key': info.vendor_id}
-            # check 2.x and 3.x differences in using urllib
-            params['start'] = str(start)
-            try:
-                conn.request("GET", process['req_path'] + "?" +
-                             urllib.urlencode(params), headers=header)
-            except AttributeError:
-                conn.request("GET", process['req_path'] + "?" +
-                             urllib.parse.urlencode(params), headers=header)
-            resp = conn.getresponse()
-
-            if resp.status != 200:
-                print("Code: " + str(resp.status))
-                resp_obj = HTTPConnect(resp.status, resp.read()).json()
-                print(resp_obj)
-                break
-            resp_obj_read = resp.read()
-            resp_obj = HTTPConnect(resp.status, resp_obj_read).json()
-            if type(resp_obj) is str:
-                try:
-                    resp_obj = json.loads(resp_obj)
-                except:
-                    # return error msg
-                    print("parse json str failed")
-                    # print(resp_obj)
-                    break
-            elif type(resp_obj) is dict:
-                try:
-                    resp_obj = json.loads(json.dumps(resp_obj))
-                except:
-                    print("parse dict failed")
-                    print(resp_obj)
+    process = __split_path(path)
+    if process['status'] != 'success':
+        return result
+    if session is None:
+        session = get_default_session()
+
+    if max_workers is None:
+        max_workers = LARGE_DATA_WORKERS
+
+    resp_obj = __request_page(process, params, 0, session)
+    if resp_obj is None:
+        return result
+    total = int(resp_obj['total'])
+    start = int(resp_obj['next_start'])
+    result.extend(resp_obj['data'])
+
+    page_size = start
+    if max_workers > 1 and 0 < page_size < total:
+        starts = list(range(start, total, page_size))
+        workers = min(max_workers, len(starts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = executor.map(lambda page_start: __request_page(process, params, page_start, session), starts)
+            for page_start, page in zip(starts, pages):
+                expected = min(page_start + page_size, total)
+                if page is None or int(page['next_start']) != expected or int(page['total']) != total:
+                    # the server does not page as expected - continue one page at a time
                     break
-            else:
-                print("result not str")
-                print(resp_obj)
-                break
+                result.extend(page['data'])
+                start = expected
+        print("Finish extracting: " + str(len(result)) + " records")
+
+    while start < total:
+        resp_obj = __request_page(process, params, start, session)
+        if resp_obj is None:
+            break
+        total = int(resp_obj['total'])
+        next_start = int(resp_obj['next_start'])
+
+        result.extend(resp_obj['data'])
+        print("Finish extracting: " + str(start+1) + " to " + str(next_start-1) + " , remaining: "
+              + str(total - next_start))
+        if next_start <= start:
+            break
+        start = next_start
+    return result
+
 
+def iter_large_data(path, params, session=None):
+    """
+    Generator version of request_large_data
+
+    The records are yielded page by page so the whole result never has to be held in memory.
+    The next page is requested in the background while the current one is consumed.
+
+    :param path: url
+    :param params: query parameters
+    :param session: optional, the Session the request settings come from
+    :return: generator of records
+    """
+    process = __split_path(path)
+    if process['status'] != 'success':
+        return
+    if session is None:
+        session = get_default_session()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(__request_page, process, params, 0, session)
+        start = 0
+        while future is not None:
+            resp_obj = future.result()
+            future = None
+            if resp_obj is None:
+                break
             total = int(resp_obj['total'])
             next_start = int(resp_obj['next_start'])
-
-            result.extend(resp_obj['data'])
-            print("Finish extracting: " + str(start+1) + " to " + str(next_start-1) + " , remaining: "
-                  + str(total - next_start))
+            if start < next_start < total:
+                future = executor.submit(__request_page, process, params, next_start, session)
+            for record in resp_obj['data']:
+                yield record
             start = next_start
-            conn.close()
-            if start == total:
-                break
-    return result
 
 
-def request_get(path, params, stream=False):
+def request_get(path, params, stream=False, session=None):
     """
     send GET request to server
 
     :param path: url
     :param params: header
-    :param stream:
-    :return:
+    :param stream: return a StreamingResponse instead of reading the whole body
+    :param session: optional, the Session the request settings come from
+    :return: HTTPConnect, or StreamingResponse if stream is True
     """
     process = __split_path(path)
 
     if process['status'] == 'success':
-        conn = process['conn']
-        info = MetaInfo()
-        header = {'vendor_key': info.vendor_id}
+        if session is None:
+            session = get_default_session()
+        header = session.headers()
         # check 2.x and 3.x differences in using urllib
         try:
-            conn.request("GET", process['req_path'] + "?" +
-                         urllib.urlencode(params), headers=header)
+            url = process['req_path'] + "?" + urllib.urlencode(params)
         except AttributeError:
-            conn.request("GET", process['req_path'] + "?" +
-                         urllib.parse.urlencode(params), headers=header)
+            url = process['req_path'] + "?" + urllib.parse.urlencode(params)
 
-        resp = conn.getresponse()
+        conn, resp = __send_with_retry(process, "GET", url, None, header, session)
 
         if stream:
-            resp_obj = resp
-        else:
-            assert isinstance(resp, object)
-            resp_obj = resp.read()
+            # the connection goes back to the pool once the body is consumed
+            return StreamingResponse(process, conn, resp)
+        resp_obj = __read(process, conn, resp)
         return HTTPConnect(resp.status, resp_obj)
     else:
         return HTTPConnect(404, process)
 
 
-def request_post(path, params, files=None, stream=False):
+def request_post(path, params, files=None, stream=False, compress=False, session=None):
+    """
+    send POST request to server
+
+    :param path: url
+    :param params: form fields
+    :param files: optional, form field name -> opened file, sent as multipart/form-data
+    :param stream: return a StreamingResponse instead of reading the whole body
+    :param compress: gzip the multipart body, the server has to accept Content-Encoding: gzip
+    :param session: optional, the Session the request settings come from
+    :return: HTTPConnect, or StreamingResponse if stream is True
+    """
     process = __split_path(path)
 
     if process['status'] == 'success':
-        conn = process['conn']
-
+        if session is None:
+            session = get_default_session()
         if files:
             header, body = __encode_multipart_formdata(params, files)
-            info = MetaInfo()
-            header['vendor_key'] = info.vendor_id
-
-            conn.request("POST", process['req_path'], body, header)
+            if compress:
+                body = GzipBody(body)
+                header = body.headers()
+            url = process['req_path']
         else:
-            info = MetaInfo()
-            header = {'vendor_key': info.vendor_id}
+            header = dict()
+            body = None
             try:
-                conn.request("POST", process['req_path'] + "?" + urllib.urlencode(params), headers=header)
+                url = process['req_path'] + "?" + urllib.urlencode(params)
             except AttributeError:
-                conn.request("POST", process['req_path'] + "?" + urllib.parse.urlencode(params), headers=header)
+                url = process['req_path'] + "?" + urllib.parse.urlencode(params)
 
-        resp = conn.getresponse()
+        header.update(session.headers())
+
+        try:
+            conn, resp = __send_with_retry(process, "POST", url, body, header, session)
+        finally:
+            if body is not None:
+                body.close()
 
         if stream:
-            resp_obj = resp
-        else:
-            resp_obj = resp.read()
+            return StreamingResponse(process, conn, resp)
+        resp_obj = __read(process, conn, resp)
         return HTTPConnect(resp.status, resp_obj)
     else:
         return HTTPConnect(404, process)
@@ -0,0 +1,301 @@
+"""
+Track many simulations at once.
+
+SimulationJob.run(track=True) and ParametricJob.submit_*(track=True) block in their own
+polling loop. A JobTracker instead registers any number of track tokens, model keys or
+parametric folder keys, polls them from a small thread pool driven by one scheduling thread,
+and resolves a future (and calls an optional callback) with the Model / ParametricModel
+once a job is completed. The polling interval adapts to the progress reported by the server.
+
+tracker = bsh.new_job_tracker(project_key)
+futures = [tracker.add_simulation(token) for token in track_tokens]
+models = tracker.wait()
+"""
+import time
+import heapq
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+try:
+    from concurrent.futures import InvalidStateError
+except ImportError:
+    # python < 3.8, setting a cancelled future does not raise
+    class InvalidStateError(Exception):
+        pass
+
+from .energy_model import Model
+from .parametric_model import ParametricModel
+from .simulation_job import SimulationJob
+from .parametric_job import ParametricJob
+
+
+class _TrackedJob(object):
+
+    def __init__(self, key, kind, job, callback, interval):
+        self.key = key
+        self.kind = kind
+        self.job = job
+        self.callback = callback
+        self.future = Future()
+        self.interval = interval
+        self.polls = 0
+        # (time, progress) of the first progress reported
+        self.first_progress = None
+
+
+class JobTracker(object):
+
+    def __init__(self, project_key, base_url=None, logger=None, session=None, max_workers=8,
+                 initial_interval=5, min_interval=1, max_interval=60):
+        """
+        Construct a job tracker
+
+        :param project_key: the project key, required
+        :param base_url: optional
+        :param logger: optional
+        :param session: optional, the Session the request settings come from
+        :param max_workers: maximum number of tracking requests in flight
+        :param initial_interval: seconds between the first polls, before the server reports a progress
+        :param min_interval: minimum seconds between two polls of a job
+        :param max_interval: maximum seconds between two polls of a job
+        :type project_key: str
+        :type max_workers: int
+        """
+        self._project_key = project_key
+        self._base_url = base_url
+        self._logger = logger
+        self._session = session
+        self._max_workers = max_workers
+        self._initial_interval = initial_interval
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+
+        self._cond = threading.Condition()
+        # (next poll time, sequence, tracked job)
+        self._heap = list()
+        self._sequence = 0
+        self._jobs = list()
+        self._executor = None
+        self._thread = None
+        self._stopped = False
+
+    def add_simulation(self, track_token, callback=None):
+        """
+        Track a single simulation (the track token returned by SimulationJob.run or run_model_simulation)
+
+        :param track_token: the track token of the simulation
+        :param callback: optional, called with the result once the simulation is completed
+        :return: a future resolving to the Model, or False if the simulation failed
+        :rtype: Future
+        """
+        job = SimulationJob(self._project_key, self._base_url, self._logger, self._session)
+        job.track_token = track_token
+        return self.__add(track_token, 'simulation', job, callback)
+
+    def add_batch_simulation(self, model_key, callback=None):
+        """
+        Track a batch simulation (SimulationJob.run with a list of models)
+
+        :param model_key: the model key of the batch
+        :param callback: optional, called with the result once all the simulations are completed
+        :return: a future resolving to the ParametricModel of the batch
+        :rtype: Future
+        """
+        job = SimulationJob(self._project_key, self._base_url, self._logger, self._session)
+        job.track_token = model_key
+        return self.__add(model_key, 'batch', job, callback)
+
+    def add_parametric(self, folder_key, callback=None):
+        """
+        Track a parametric study (ParametricJob.submit_parametric_study / submit_parametric_study_local)
+
+        :param folder_key: the folder key of the parametric study
+        :param callback: optional, called with the result once the parametric study is completed
+        :return: a future resolving to the ParametricModel
+        :rtype: Future
+        """
+        job = ParametricJob(self._project_key, '', self._base_url, self._logger, self._session)
+        job.track_token = folder_key
+        return self.__add(folder_key, 'parametric', job, callback)
+
+    def add_job(self, job, callback=None):
+        """
+        Track a SimulationJob or ParametricJob that was submitted with track=False
+
+        AsyncSimulationJob and AsyncParametricJob track with coroutines, await them in their event loop instead
+
+        :param job: the submitted job
+        :param callback: optional, called with the result once the job is completed
+        :return: a future resolving to a Model or a ParametricModel
+        :rtype: Future
+        :raise TypeError: if the job is not a SimulationJob or a ParametricJob
+        """
+        if not isinstance(job, (SimulationJob, ParametricJob)):
+            raise TypeError('JobTracker tracks a SimulationJob or a ParametricJob, not ' + type(job).__name__ +
+                            ' - await the tracking of an async job in its event loop')
+        if isinstance(job, ParametricJob):
+            return self.__add(job.track_token, 'parametric', job, callback)
+        if len(job.track_token.split('-')) == 3:
+            return self.__add(job.track_token, 'simulation', job, callback)
+        return self.__add(job.track_token, 'batch', job, callback)
+
+    def status(self):
+        """
+        :return: the tracking status of every registered job
+        :rtype: dict
+        """
+        result = dict()
+        for entry in list(self._jobs):
+            result[entry.key] = entry.job.track_status
+        return result
+
+    def wait(self, timeout=None):
+        """
+        Wait for all the registered jobs
+
+        :param timeout: optional, maximum seconds to wait
+        :return: the results in the registration order, None for the jobs not completed in time
+        :rtype: list
+        """
+        entries = list(self._jobs)
+        wait_futures([entry.future for entry in entries], timeout)
+        result = list()
+        for entry in entries:
+            if entry.future.done() and not entry.future.cancelled() and entry.future.exception() is None:
+                result.append(entry.future.result())
+            else:
+                result.append(None)
+        return result
+
+    def stop(self):
+        """Stop tracking, the jobs not completed yet are cancelled"""
+        with self._cond:
+            self._stopped = True
+            self._heap = list()
+            self._cond.notify_all()
+        for entry in self._jobs:
+            entry.future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __add(self, key, kind, job, callback):
+        if not key:
+            print('The job has no track token - submit it first')
+            return None
+        entry = _TrackedJob(key, kind, job, callback, self._initial_interval)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('the job tracker is stopped')
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+                self._thread = threading.Thread(target=self.__run, name='JobTracker')
+                self._thread.daemon = True
+                self._thread.start()
+            self._jobs.append(entry)
+            self.__schedule(entry, time.time())
+        return entry.future
+
+    def __schedule(self, entry, when):
+        # the caller holds self._cond
+        self._sequence += 1
+        heapq.heappush(self._heap, (when, self._sequence, entry))
+        self._cond.notify()
+
+    def __run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = time.time()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._cond.wait(self._heap[0][0] - now if self._heap else None)
+                if self._stopped:
+                    return
+                when, sequence, entry = heapq.heappop(self._heap)
+            try:
+                self._executor.submit(self.__poll, entry)
+            except RuntimeError:
+                # the executor is shut down
+                return
+
+    def __poll(self, entry):
+        if entry.future.cancelled():
+            return
+        try:
+            if entry.kind == 'simulation':
+                running = entry.job.track_simulation()
+            elif entry.kind == 'batch':
+                running = entry.job.track_batch_simulation()
+            else:
+                running = entry.job.track_simulation()
+        except Exception as e:
+            self.__resolve(entry.future, exception=e)
+            return
+        entry.polls += 1
+
+        if running:
+            now = time.time()
+            entry.interval = self.__next_interval(entry, entry.job.track_progress, now)
+            with self._cond:
+                if not self._stopped:
+                    self.__schedule(entry, now + entry.interval)
+            return
+
+        result = self.__result(entry)
+        if not self.__resolve(entry.future, result):
+            return
+        if entry.callback is not None:
+            try:
+                entry.callback(result)
+            except Exception as e:
+                print('Job tracker callback failed: ' + str(e))
+
+    @staticmethod
+    def __resolve(future, result=None, exception=None):
+        """
+        set the result or the exception of the future, stop() may cancel it at any time before
+
+        :return: False if the future was cancelled
+        """
+        if future.cancelled():
+            return False
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            return False
+        return True
+
+    def __next_interval(self, entry, progress, now):
+        """
+        poll about twice before the expected completion time, estimated from the progress rate
+        and back off if the server reports no progress
+        """
+        if progress is not None and entry.first_progress is None:
+            entry.first_progress = (now, progress)
+            interval = self._initial_interval
+        elif progress is not None and progress > entry.first_progress[1] and progress < 1:
+            first_time, first_progress = entry.first_progress
+            rate = (progress - first_progress) / max(now - first_time, 1e-3)
+            interval = (1 - progress) / rate / 2
+        else:
+            interval = entry.interval * 1.5
+        return min(max(interval, self._min_interval), self._max_interval)
+
+    def __result(self, entry):
+        job = entry.job
+        if entry.kind == 'simulation':
+            if job.track_status == 'Simulation finished successfully':
+                return Model(self._project_key, entry.key, self._base_url, self._logger, self._session)
+            return False
+        return ParametricModel(self._project_key, entry.key, self._base_url, self._logger, self._session)
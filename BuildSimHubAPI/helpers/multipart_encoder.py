@@ -0,0 +1,166 @@
+"""
+Streaming multipart/form-data body used by the upload requests.
+
+The files are read chunk by chunk while the request is sent, so uploading
+a large model, weather file or add_folder.zip doesn't keep a copy of the file in memory.
+"""
+import os
+import uuid
+
+
+class MultipartEncoder(object):
+    # size of the chunks read from the files
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, params, files, boundary=None):
+        """
+        Construct a multipart body
+
+        :param params: form fields, None values are skipped
+        :param files: form field name -> opened file
+        :param boundary: optional, a random one is used if None
+        :type params: dict
+        :type files: dict
+        """
+        if boundary is None:
+            boundary = uuid.uuid4().hex
+        self._boundary = boundary
+        self._files = list(files.values())
+
+        # the body is a list of bytes segments and files
+        self._parts = list()
+        for key, val in params.items():
+            if val is None:
+                continue
+            self._parts.append(self.__encode('--' + boundary + '\r\n' +
+                                             'Content-Disposition: form-data; name="%s"\r\n' % key +
+                                             '\r\n' + str(val) + '\r\n'))
+
+        for key, f in files.items():
+            filename = f.name
+            slash = max(filename.rfind('/'), filename.rfind('\\'))
+            if slash >= 0:
+                filename = filename[slash + 1:]
+
+            self._parts.append(self.__encode('--' + boundary + '\r\n' +
+                                             'Content-Disposition: form-data; name="{0}"; filename="{1}"\r\n'
+                                             .format(key, filename) +
+                                             'Content-Type: application/octet-stream\r\n\r\n'))
+            self._parts.append(f)
+            self._parts.append(b'\r\n')
+
+        self._parts.append(self.__encode('--%s--\r\n' % boundary))
+
+        # remember where every file starts so the body can be sent again
+        self._offsets = dict()
+        for f in self._files:
+            try:
+                self._offsets[id(f)] = f.tell()
+            except (AttributeError, IOError, OSError):
+                pass
+
+        self._len = self.__compute_length()
+        self._index = 0
+        self._buffer = b''
+
+    @property
+    def content_type(self):
+        return 'multipart/form-data; boundary=' + self._boundary
+
+    @property
+    def len(self):
+        """Length of the body in bytes, None if it is unknown (a text mode file)"""
+        return self._len
+
+    def headers(self):
+        """
+        The request headers that describe the body
+
+        If the length is unknown, no Content-Length is given
+        and the body is sent with chunked transfer encoding
+        """
+        headers = {'Content-Type': self.content_type}
+        if self._len is not None:
+            headers['Content-Length'] = str(self._len)
+        return headers
+
+    def read(self, size=-1):
+        """
+        Read the next bytes of the body
+
+        :param size: maximum number of bytes, everything left if negative
+        :return: empty bytes at the end of the body
+        """
+        if size is None or size < 0:
+            chunks = list()
+            chunk = self.read(self.CHUNK_SIZE)
+            while chunk:
+                chunks.append(chunk)
+                chunk = self.read(self.CHUNK_SIZE)
+            return b''.join(chunks)
+
+        while len(self._buffer) < size and self._index < len(self._parts):
+            part = self._parts[self._index]
+            if isinstance(part, bytes):
+                self._buffer += part
+                self._index += 1
+                continue
+            data = part.read(max(size - len(self._buffer), self.CHUNK_SIZE))
+            if not data:
+                self._index += 1
+                continue
+            self._buffer += self.__encode(data)
+
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def __iter__(self):
+        chunk = self.read(self.CHUNK_SIZE)
+        while chunk:
+            yield chunk
+            chunk = self.read(self.CHUNK_SIZE)
+
+    def rewind(self):
+        """
+        Go back to the beginning of the body so it can be sent again
+
+        :return: True if the body was rewound, False if a file cannot seek
+        """
+        for f in self._files:
+            if id(f) not in self._offsets:
+                return False
+            f.seek(self._offsets[id(f)])
+        self._index = 0
+        self._buffer = b''
+        return True
+
+    def close(self):
+        """Close the files"""
+        for f in self._files:
+            f.close()
+
+    def __compute_length(self):
+        length = 0
+        for part in self._parts:
+            if isinstance(part, bytes):
+                length += len(part)
+                continue
+            if 'b' not in getattr(part, 'mode', 'b') or id(part) not in self._offsets:
+                # the number of bytes of a text mode file is only known once it is encoded
+                return None
+            try:
+                length += os.fstat(part.fileno()).st_size - self._offsets[id(part)]
+            except (AttributeError, IOError, OSError, ValueError):
+                # in memory file
+                current = part.tell()
+                part.seek(0, 2)
+                length += part.tell() - current
+                part.seek(current)
+        return length
+
+    @staticmethod
+    def __encode(data):
+        if isinstance(data, bytes):
+            return data
+        return data.encode('utf8')
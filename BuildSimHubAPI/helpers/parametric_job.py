@@ -2,19 +2,19 @@ import time
 from .httpurllib import request_get
 from .httpurllib import request_post
 from .parametric_model import ParametricModel
-from .compat import is_py2
+from .simulation_job import SimulationJob
 
 
-class ParametricJob(object):
+class BaseParametricJob(object):
+    """
+    The measures, the job state and the tracking response handling shared by ParametricJob
+    and AsyncParametricJob, the requests and the tracking loops are in the subclasses
+    """
     # every call will connect to this base URL
     BASE_URL = 'https://my.buildsim.io/'
 
     def __init__(self, project_api_key, model_api_key='', base_url=None, logger=None):
         """
-        Construct a parametric job
-
-        Specify EEM and do parametrics
-
         :param project_api_key: required
         :param model_api_key: optional
         :param base_url: optional - use for testing only
@@ -26,9 +26,11 @@ class ParametricJob(object):
         self._model_api_key = model_api_key
         self._track_token = ""
         self._track_status = ""
+        # 0 - 1, None if the server did not report the progress yet
+        self._track_progress = None
         # list of data
         self._model_action_list = list()
-        self._base_url = ParametricJob.BASE_URL
+        self._base_url = BaseParametricJob.BASE_URL
         self._logger = None
 
         if base_url is not None:
@@ -45,6 +47,11 @@ class ParametricJob(object):
         """Get the tracking status"""
         return self._track_status
 
+    @property
+    def track_progress(self):
+        """The progress of the last tracking call, 0 - 1 or None if unknown"""
+        return self._track_progress
+
     @property
     def model_api_key(self):
         return self._model_api_key
@@ -86,6 +93,100 @@ class ParametricJob(object):
                 num_total = num_total * self._model_action_list[i].get_num_value()
         return num_total
 
+    def _add_measures(self, payload, algorithm, customize):
+        """
+        add the measures to the request payload
+
+        :return: False if a measure cannot be processed
+        """
+        for i in range(len(self._model_action_list)):
+            action = self._model_action_list[i]
+
+            if algorithm == 'montecarlo':
+                data_str = action.get_boundary_string()
+            else:
+                data_str = action.get_datalist_string()
+            if data_str == "":
+                # error processing measures
+                return False
+
+            # client specific requested measures
+            if customize == 'true' and data_str == '[]':
+                data_str = 'default'
+
+            # User defined measures
+            if action.get_api_name() == 'user_defined':
+                if payload.get(action.get_api_name()) is None:
+                    payload[action.get_api_name()] = []
+                payload[action.get_api_name()].append(data_str)
+            else:
+                payload[action.get_api_name()] = data_str
+
+            # design customized template
+            design_template = action.get_design_template()
+            if len(design_template) > 0:
+                if payload.get("custom_template") is None:
+                    payload["custom_template"] = []
+                payload["custom_template"].extend(design_template)
+        return True
+
+    def _parametric_track_info(self, status_code, resp_json):
+        if status_code > 200:
+            try:
+                print('Code: ' + str(status_code) + ' message: ' + resp_json['error_msg'])
+            except TypeError:
+                print(resp_json)
+            return False
+
+        if 'error_msg' in resp_json:
+            self._track_status = resp_json['error_msg']
+            return False
+
+        if 'success' in resp_json:
+
+            success = float(resp_json['success'])
+            running = float(resp_json['running'])
+            error = float(resp_json['error'])
+            queue = float(resp_json['queue'])
+
+            divider = success + running + error + queue
+            if divider == 0:
+                total_progress = 1
+            else:
+                total_progress = (success + error) / divider
+
+            message = "Total progress %d%%, success: %d, failure: %d, running: %d, queue: %d"
+            self._track_status = message % (total_progress * 100, success, error, running, queue)
+            self._track_progress = total_progress
+
+            if total_progress == 1:
+                return False
+            else:
+                return True
+        else:
+            print(resp_json['message'])
+            return True
+
+
+class ParametricJob(BaseParametricJob):
+
+    def __init__(self, project_api_key, model_api_key='', base_url=None, logger=None, session=None):
+        """
+        Construct a parametric job
+
+        Specify EEM and do parametrics
+
+        :param project_api_key: required
+        :param model_api_key: optional
+        :param base_url: optional - use for testing only
+        :param session: optional, the Session the request settings come from - None uses the shared one
+        :type project_api_key: str
+        :type model_api_key: str
+        :type base_url: str
+        """
+        BaseParametricJob.__init__(self, project_api_key, model_api_key, base_url, logger)
+        self._session = session
+
     def submit_parametric_study_local(self, file_dir, epw_dir=None, unit='ip', simulation_type="parametric",
                                       track=False, request_time=5, customize='false', design_condition='yes',
                                       algorithm='Default', size=200, comment=None):
@@ -98,6 +199,9 @@ class ParametricJob(object):
             new_sj = buildsimhub.new_parametric_job(project_api_key)
             new_sj.submit_parametric_study_local(file_dir, track=True)
 
+        If the client has an upload cache, the seed model is uploaded once (SimulationJob.create_model)
+        and the parametric studies of the same files use it as their seed, the files are not sent again
+
         :param file_dir:
         :param epw_dir:
         :param unit:
@@ -138,85 +242,24 @@ class ParametricJob(object):
             # this will override the model description
             payload['comment'] = comment
 
-        for i in range(len(self._model_action_list)):
-            action = self._model_action_list[i]
-            if algorithm == 'montecarlo':
-                data_str = action.get_boundary_string()
-                if data_str == "":
-                    return
-            else:
-                data_str = action.get_datalist_string()
-                if data_str == "":
-                    return
-
-            # client specific requested measures
-            if customize == 'true' and data_str == '[]':
-                data_str = 'default'
-            # payload[action.get_api_name()] = data_str
-
-            # User defined measures
-            if action.get_api_name() == 'user_defined':
-                if payload.get(action.get_api_name()) is None:
-                    payload[action.get_api_name()] = []
-                payload[action.get_api_name()].append(data_str)
-            else:
-                payload[action.get_api_name()] = data_str
+        if not self._add_measures(payload, algorithm, customize):
+            return
 
-            # design customized template
-            design_template = action.get_design_template()
-            if len(design_template) > 0:
-                if payload.get("custom_template") is None:
-                    payload["custom_template"] = []
-                payload["custom_template"].extend(design_template)
+        seed_job = SimulationJob(self._project_key, self._base_url, self._logger, self._session)
+        cache_key = seed_job._upload_cache_key(file_dir, epw_dir, None)
+        if cache_key is not None:
+            return self.__submit_cached_seed(seed_job, cache_key, file_dir, epw_dir, payload, track, request_time)
 
         # Upload files
         files = dict()
-        if is_py2:
-            files['model'] = open(file_dir, 'r')
-            if epw_dir is not None:
-                files['weather_file'] = open(epw_dir, 'r')
-        else:
-            # py3 cannot decode incompatible utf-8 string
-            files['model'] = open(file_dir, 'r', errors='ignore')
-            if epw_dir is not None:
-                files['weather_file'] = open(epw_dir, 'r', errors='ignore')
+        # binary so the files are streamed as they are, without decoding
+        files['model'] = open(file_dir, 'rb')
+        if epw_dir is not None:
+            files['weather_file'] = open(epw_dir, 'rb')
 
         print('Submitting parametric simulation job request...')
-        r = request_post(url, params=payload, files=files)
-        if r.status_code == 500:
-            print('Code: ' + str(r.status_code))
-            return False
-        resp_json = r.json()
-        if r.status_code > 200:
-            try:
-                print('Code: ' + str(r.status_code) + ' message: ' + resp_json['error_msg'])
-            except TypeError:
-                print(resp_json)
-            return False
-
-        print('Received server response')
-        if resp_json['status'] == 'success':
-            self._track_token = resp_json['tracking']
-
-            # log
-            if self._logger is not None:
-                self._logger.write_in_message('ParametricSimulation', 'UploadRun', self._project_key,
-                                              self._track_token, '200', self._track_token)
-
-            print('You can track the parametric using API key: ' + self._track_token)
-            if track:
-                while self.track_simulation():
-                    print(self._track_status)
-                    time.sleep(request_time)
-                print(self._track_status)
-                print('Completed! You can retrieve results using the key: '+self._track_token)
-                res = ParametricModel(self._project_key, self._track_token, self._base_url)
-                return res
-            else:
-                return True
-        else:
-            print(resp_json['error_msg'])
-            return False
+        r = request_post(url, params=payload, files=files, session=self._session)
+        return self.__submit_response(r, 'UploadRun', track, request_time)
 
     def submit_parametric_study(self, unit='ip', simulation_type='parametric', model_api_key=None,
                                 design_condition="yes", track=False, request_time=5, customize='false',
@@ -279,39 +322,64 @@ class ParametricJob(object):
             # this will override the model description
             payload['comment'] = comment
 
-        for i in range(len(self._model_action_list)):
-            action = self._model_action_list[i]
+        if not self._add_measures(payload, algorithm, customize):
+            return
 
-            if algorithm == 'montecarlo':
-                data_str = action.get_boundary_string()
-                if data_str == "":
-                    # error processing measures
-                    return
-            else:
-                data_str = action.get_datalist_string()
-                if data_str == "":
-                    # error processing measures
-                    return
+        print('Submitting parametric simulation job request...')
+        r = request_post(url, params=payload, session=self._session)
+        return self.__submit_response(r, 'Run', track, request_time)
 
-            if customize == 'true' and data_str == '[]':
-                data_str = 'default'
+    def __submit_cached_seed(self, seed_job, cache_key, file_dir, epw_dir, payload, track, request_time):
+        """
+        submit the study with the model uploaded before with the same files as its seed,
+        on a miss the seed is uploaded once with create_model (the upload endpoint of the study
+        returns no model key to cache)
 
-            if action.get_api_name() == 'user_defined':
-                if payload.get(action.get_api_name()) is None:
-                    payload[action.get_api_name()] = []
-                payload[action.get_api_name()].append(data_str)
-            else:
-                payload[action.get_api_name()] = data_str
+        Only a clear rejection of a cached seed key (e.g. the model was deleted) drops the cache entry
+        and uploads the seed again. After a server error or a lost connection the study may be created
+        already and is not submitted again, and a new seed is never uploaded twice
 
-            # design customized template
-            design_template = action.get_design_template()
-            if len(design_template) > 0:
-                if payload.get("custom_template") is None:
-                    payload["custom_template"] = []
-                payload["custom_template"].extend(design_template)
+        :return: the submit result
+        """
+        cache = seed_job._upload_cache()
+        entry = cache.get(cache_key)
+        if entry is not None:
+            print('The seed model was uploaded before: ' + entry['model_api_key'])
+            r = self.__post_seed_study(entry['model_api_key'], payload)
+            if not self.__seed_rejected(r):
+                return self.__submit_response(r, 'Run', track, request_time)
+            print('The seed model is not available, uploading it again')
+            cache.discard(cache_key)
+
+        # create_model stores the new seed in the upload cache
+        seed = seed_job.create_model(file_dir, epw_dir)
+        if not seed:
+            return False
+        r = self.__post_seed_study(seed_job.model_api_key, payload)
+        return self.__submit_response(r, 'Run', track, request_time)
 
+    def __post_seed_study(self, model_api_key, payload):
+        self._model_api_key = model_api_key
+        payload = dict(payload)
+        payload['model_api_key'] = model_api_key
         print('Submitting parametric simulation job request...')
-        r = request_post(url, params=payload)
+        return request_post(self._base_url + 'ParametricSettingCopyModel_API', params=payload, session=self._session)
+
+    @staticmethod
+    def __seed_rejected(resp):
+        """a client error, or an error message about the model - 429 and server errors are not rejections"""
+        if resp.status_code == 429 or resp.status_code >= 500:
+            return False
+        if resp.status_code >= 400:
+            return True
+        try:
+            resp_json = resp.json()
+        except ValueError:
+            return False
+        return isinstance(resp_json, dict) and resp_json.get('status') == 'error' and \
+            'model' in str(resp_json.get('error_msg', '')).lower()
+
+    def __submit_response(self, r, log_request, track, request_time):
         if r.status_code == 500:
             print('Code: ' + str(r.status_code))
             return False
@@ -322,30 +390,29 @@ class ParametricJob(object):
             except TypeError:
                 print(resp_json)
             return False
+
         print('Received server response')
+        if resp_json['status'] != 'success':
+            print(resp_json['error_msg'])
+            return False
 
-        if resp_json['status'] == 'success':
-            self._track_token = resp_json['tracking']
+        self._track_token = resp_json['tracking']
 
-            # log
-            if self._logger is not None:
-                self._logger.write_in_message('ParametricSimulation', 'Run', self._project_key,
-                                              self._track_token, '200', self._track_token)
+        # log
+        if self._logger is not None:
+            self._logger.write_in_message('ParametricSimulation', log_request, self._project_key,
+                                          self._track_token, '200', self._track_token)
 
-            print('You can track the parametric using API key: ' + self._track_token)
-            if track:
-                while self.track_simulation():
-                    print(self._track_status)
-                    time.sleep(request_time)
+        print('You can track the parametric using API key: ' + self._track_token)
+        if track:
+            while self.track_simulation():
                 print(self._track_status)
-                print('Completed! You can retrieve results using the key: '+self._track_token)
-                res = ParametricModel(self._project_key, self._track_token, self._base_url)
-                return res
-            else:
-                return True
+                time.sleep(request_time)
+            print(self._track_status)
+            print('Completed! You can retrieve results using the key: ' + self._track_token)
+            return ParametricModel(self._project_key, self._track_token, self._base_url, session=self._session)
         else:
-            print(resp_json['error_msg'])
-            return False
+            return True
 
     def track_simulation(self):
         if self._track_token == "":
@@ -358,42 +425,10 @@ class ParametricJob(object):
         }
 
         try:
-            r = request_get(url, params=payload)
+            r = request_get(url, params=payload, session=self._session)
             resp_json = r.json()
-        except ConnectionResetError:
+        except ConnectionError:
+            # the retries are exhausted or the circuit is open - keep tracking
             return "Reconnecting to server..."
 
-        if r.status_code > 200:
-            try:
-                print('Code: ' + str(r.status_code) + ' message: ' + resp_json['error_msg'])
-            except TypeError:
-                print(resp_json)
-            return False
-
-        if 'error_msg' in resp_json:
-            self._track_status = resp_json['error_msg']
-            return False
-
-        if 'success' in resp_json:
-
-            success = float(resp_json['success'])
-            running = float(resp_json['running'])
-            error = float(resp_json['error'])
-            queue = float(resp_json['queue'])
-
-            divider = success + running + error + queue
-            if divider == 0:
-                total_progress = 1
-            else:
-                total_progress = (success + error) / divider
-
-            message = "Total progress %d%%, success: %d, failure: %d, running: %d, queue: %d"
-            self._track_status = message % (total_progress * 100, success, error, running, queue)
-
-            if total_progress == 1:
-                return False
-            else:
-                return True
-        else:
-            print(resp_json['message'])
-            return True
+        return self._parametric_track_info(r.status_code, resp_json)
@@ -1,6 +1,11 @@
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
 from .httpurllib import request_large_data
+from .httpurllib import iter_large_data
 from .httpurllib import make_url
+from .httpurllib import request_get
+from .result_cache import get_result_cache
+from .energy_model import RESULT_METRICS
 # This is a class that contains all the model information for user
 # to read
 
@@ -11,23 +16,27 @@ class ParametricModel(object):
     # every call will connect to this base URL
     BASE_URL = 'https://my.buildsim.io/'
 
-    def __init__(self, project_key, track_token, base_url=None, logger=None):
+    def __init__(self, project_key, track_token, base_url=None, logger=None, session=None):
         """
         Construct parametric result object
 
         :param project_key: required
         :param track_token: required
         :param base_url: optional
+        :param session: optional, the Session the request settings come from - None uses the shared one
         :type project_key: str
         :type track_token: str
         :type base_url: str
 
         """
         self._project_key = project_key
+        self._session = session
         self._last_parameter_unit = ""
         self._track_token = track_token
         self._base_url = ParametricModel.BASE_URL
         self._logger = None
+        # whether all the cases are completed, only then the results are cached
+        self._finished = False
 
         if base_url is not None:
             self._base_url = base_url
@@ -83,7 +92,7 @@ class ParametricModel(object):
             'load_type': load_type
         }
 
-        data_list = request_large_data(url, params=payload)
+        data_list = self.__large_data(url, payload)
 
         # log action
         if self._logger is not None:
@@ -93,20 +102,153 @@ class ParametricModel(object):
         value = list()
         model = list()
         model_plot = list()
-        counter = 1
-        for i in range(len(data_list)):
-            value.append(data_list[i]['value'])
-            model.append(data_list[i]['model'])
-            model_plot.append('case' + str(counter))
-            counter += 1
-            if 'unit' in data_list[i]:
-                self._last_parameter_unit = data_list[i]['unit']
+        for record in self.__records(data_list):
+            value.append(record['value'])
+            model.append(record['model'])
+            model_plot.append(record['model_plot'])
         result = dict()
         result['value'] = value
         result['model'] = model
         result['model_plot'] = model_plot
         return result
 
+    def iter_bldg_load(self, load_type='cooling'):
+        """
+        Streaming version of bldg_load
+
+        The records are requested page by page and yielded one case at a time,
+        so large parametric studies can be processed in constant memory.
+
+        :param load_type: cooling or heating
+        :return: generator of dict with keys value, model and model_plot
+        """
+        url = self._base_url + 'GetTotalLoadForParametric_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'folder_api_key': self._track_token,
+            'type': 'parametric',
+            'load_type': load_type
+        }
+
+        # log action
+        if self._logger is not None:
+            self._logger.write_in_message('ParametricModel', 'BuildingLoad', self._project_key, self._track_token,
+                                          '200', "building load: " + load_type)
+
+        return self.__records(self.__iter_large_data(url, payload))
+
+    def iter_results(self, request_data, zone_name=''):
+        """
+        Streaming version of the result methods
+
+        The records are requested page by page and yielded one case at a time,
+        so large parametric studies can be processed in constant memory.
+        last_parameter_unit is updated as the records are consumed.
+
+        :param request_data: the result name, e.g. NetSiteEUI, TotalSiteEUI, NotMetHoursTotal
+        :param zone_name: optional, used by the zone level results
+        :return: generator of dict with keys value, model and model_plot
+        """
+        url = self._base_url + 'ParametricResults_API'
+        payload = {
+            'project_api_key': self._project_key,
+            'folder_api_key': self._track_token,
+            'request_data': request_data,
+            'zone_name': zone_name
+        }
+
+        # log action
+        if self._logger is not None:
+            self._logger.write_in_message('ParametricModel', 'ParametricResults', self._project_key, self._track_token,
+                                          '200', "results: " + request_data)
+
+        return self.__records(self.__iter_large_data(url, payload))
+
+    def results_frame(self, metrics=None, max_workers=4):
+        """
+        Get many result metrics of all the cases in one table
+
+        The metrics are requested concurrently (and the pages of every metric in parallel),
+        the parameter descriptions of the cases are parsed once into parameter columns.
+
+        Example:
+            df = parametric.results_frame(['net_site_eui', 'not_met_hour_total'])
+                   WWR  LPD  Shade  net_site_eui  not_met_hour_total
+            case
+            case1  0.3  5.5      1         512.3                 12.0
+
+        :param metrics: names of the result methods (see RESULT_METRICS), all of them if None.
+            Other names are sent to the server as they are
+        :param max_workers: maximum number of metrics requested at a time
+        :type metrics: list
+        :return: DataFrame indexed by case with one numeric column per parameter and per metric.
+            On / Off parameters are 1 / 0, a metric the server has no value for is NaN.
+            The units are in frame.attrs['units']
+        :rtype: pandas.DataFrame
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            print('pandas is not installed')
+            return None
+
+        if metrics is None:
+            metrics = list(RESULT_METRICS.keys())
+        if len(metrics) == 0:
+            return pd.DataFrame()
+
+        url = self._base_url + 'ParametricResults_API'
+
+        def fetch(metric):
+            payload = {
+                'project_api_key': self._project_key,
+                'folder_api_key': self._track_token,
+                'request_data': RESULT_METRICS.get(metric, metric),
+                'zone_name': ''
+            }
+            return self.__large_data(url, payload)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(metrics)))) as executor:
+            data_lists = list(executor.map(fetch, metrics))
+
+        # log action
+        if self._logger is not None:
+            self._logger.write_in_message('ParametricModel', 'ParametricResults', self._project_key, self._track_token,
+                                          '200', "results: " + ', '.join(metrics))
+
+        # the cases are matched across the metrics by their parameter description
+        # (and by their order if several cases have the same description)
+        cases = dict()
+        descriptions = list()
+        values = dict()
+        units = dict()
+        for metric, data_list in zip(metrics, data_lists):
+            metric_values = dict()
+            occurrences = dict()
+            units[metric] = None
+            for data in data_list:
+                description = data['model']
+                occurrence = occurrences.get(description, 0)
+                occurrences[description] = occurrence + 1
+                case = cases.get((description, occurrence))
+                if case is None:
+                    case = len(descriptions)
+                    cases[(description, occurrence)] = case
+                    descriptions.append(description)
+                metric_values[case] = data['value']
+                if 'unit' in data:
+                    units[metric] = data['unit']
+            values[metric] = metric_values
+
+        from ..postprocess.parametric_descriptor import decode_descriptors
+        frame = decode_descriptors(descriptions,
+                                   index=pd.Index(['case' + str(i + 1) for i in range(len(descriptions))], name='case'))
+        for metric in metrics:
+            column = [values[metric].get(case) for case in range(len(descriptions))]
+            frame[metric] = pd.to_numeric(pd.Series(column, index=frame.index, dtype=object), errors='coerce')
+        frame.attrs['units'] = units
+        return frame
+
     # Below are the methods use for retrieving results
     def net_site_eui(self):
         return self.__call_api('NetSiteEUI')
@@ -145,7 +287,7 @@ class ParametricModel(object):
         return self.__call_api('ExteriorEquipmentElectricity')
 
     def exterior_equipment_naturalgas(self):
-        return self.__call_api('ExteriorEquipmentElectricity')
+        return self.__call_api('ExteriorEquipmentNaturalGas')
 
     def exterior_lighting_electricity(self):
         return self.__call_api('ExteriorLightingElectricity')
@@ -246,7 +388,7 @@ class ParametricModel(object):
             'zone_name': zone_name
         }
 
-        data_list = request_large_data(url, params=payload)
+        data_list = self.__large_data(url, payload)
 
         # log action
         if self._logger is not None:
@@ -256,16 +398,70 @@ class ParametricModel(object):
         value = list()
         model = list()
         model_plot = list()
-        counter = 1
-        for i in range(len(data_list)):
-            value.append(data_list[i]['value'])
-            model.append(data_list[i]['model'])
-            model_plot.append('case' + str(counter))
-            counter += 1
-            if 'unit' in data_list[i]:
-                self._last_parameter_unit = data_list[i]['unit']
+        for record in self.__records(data_list):
+            value.append(record['value'])
+            model.append(record['model'])
+            model_plot.append(record['model_plot'])
         result = dict()
         result['value'] = value
         result['model'] = model
         result['model_plot'] = model_plot
         return result
+
+    def __large_data(self, url, payload):
+        """request_large_data, the records of a completed parametric study are read from / written to the result cache"""
+        cache = get_result_cache(self._session)
+        if cache is None:
+            return request_large_data(url, params=payload, session=self._session)
+        endpoint = url.rsplit('/', 1)[-1]
+        data_list = cache.get(self._project_key, self._track_token, endpoint, payload)
+        if data_list is not None:
+            return data_list
+        data_list = request_large_data(url, params=payload, session=self._session)
+        if len(data_list) > 0 and self.__is_finished():
+            cache.put(self._project_key, self._track_token, endpoint, payload, data_list)
+        return data_list
+
+    def __iter_large_data(self, url, payload):
+        """iter_large_data, the records are read from the result cache if they are there"""
+        cache = get_result_cache(self._session)
+        if cache is not None:
+            data_list = cache.get(self._project_key, self._track_token, url.rsplit('/', 1)[-1], payload)
+            if data_list is not None:
+                return iter(data_list)
+        return iter_large_data(url, params=payload, session=self._session)
+
+    def __is_finished(self):
+        """whether no case of the parametric study is queued or running anymore"""
+        if self._finished:
+            return True
+        url = self._base_url + 'ParametricTracking_API'
+        payload = {
+            'folder_api_key': self._track_token,
+            'project_api_key': self._project_key
+        }
+        try:
+            r = request_get(url, params=payload, session=self._session)
+            resp_json = r.json()
+        except ConnectionError:
+            return False
+        if r.status_code != 200 or not isinstance(resp_json, dict) or 'success' not in resp_json:
+            return False
+        try:
+            pending = float(resp_json['running']) + float(resp_json['queue'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        self._finished = pending == 0
+        return self._finished
+
+    def __records(self, data_list):
+        counter = 1
+        for data in data_list:
+            if 'unit' in data:
+                self._last_parameter_unit = data['unit']
+            record = dict()
+            record['value'] = data['value']
+            record['model'] = data['model']
+            record['model_plot'] = 'case' + str(counter)
+            counter += 1
+            yield record
@@ -0,0 +1,219 @@
+"""
+Local on-disk cache of the results of completed simulations.
+
+The results of a simulation don't change once it is completed, so the responses of the
+result endpoints are kept on disk, keyed by project key, track token (or folder key),
+endpoint and query parameters. Model and ParametricModel look their results up here
+before they request them, repeated analyses run without the server.
+
+The cache is opt-in (BuildSimHubAPIClient(result_cache=True)). The files are kept in
+~/.buildsimhub/result_cache by default, the least recently used are removed above max_bytes.
+"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+from .httpurllib import HTTPConnect
+from .httpurllib import request_get
+from .session import get_default_session
+
+
+class ResultCache(object):
+
+    def __init__(self, path=None, max_bytes=512 * 1024 * 1024):
+        """
+        Construct a result cache
+
+        :param path: optional, the cache directory, ~/.buildsimhub/result_cache if None
+        :param max_bytes: maximum total size of the cached results, the least recently used are removed first
+        :type path: str
+        :type max_bytes: int
+        """
+        if path is None:
+            path = os.path.join(os.path.expanduser('~'), '.buildsimhub', 'result_cache')
+        self._path = path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # file -> [size, last use], loaded from the directory on first use
+        self._files = None
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    def get(self, project_key, track_token, endpoint, params):
+        """
+        :return: the cached response of the request, None if it is not cached
+        """
+        file_path = self.__file(project_key, track_token, endpoint, params)
+        with self._lock:
+            files = self.__load()
+            try:
+                with open(file_path, 'r') as f:
+                    entry = json.load(f)
+            except (IOError, OSError, ValueError):
+                entry = None
+            if entry is None or entry.get('endpoint') != endpoint or entry.get('params') != self.__params(params):
+                self._misses += 1
+                return None
+            # the modification time records the last use
+            try:
+                os.utime(file_path, None)
+                if file_path in files:
+                    files[file_path][1] = os.path.getmtime(file_path)
+            except OSError:
+                pass
+            self._hits += 1
+            return entry['value']
+
+    def put(self, project_key, track_token, endpoint, params, value):
+        """
+        Cache the response of a request
+
+        :param value: json serializable response
+        """
+        file_path = self.__file(project_key, track_token, endpoint, params)
+        data = json.dumps({'endpoint': endpoint, 'params': self.__params(params), 'value': value})
+        with self._lock:
+            files = self.__load()
+            try:
+                directory = os.path.dirname(file_path)
+                if not os.path.isdir(directory):
+                    os.makedirs(directory)
+                temp_path = file_path + '.' + str(os.getpid()) + '.tmp'
+                with open(temp_path, 'w') as f:
+                    f.write(data)
+                os.replace(temp_path, file_path)
+            except (IOError, OSError) as e:
+                print('Could not write the result cache ' + self._path + ': ' + str(e))
+                return
+            old = files.pop(file_path, None)
+            if old is not None:
+                self._size -= old[0]
+            files[file_path] = [len(data), os.path.getmtime(file_path)]
+            self._size += len(data)
+            self.__evict(file_path)
+
+    def invalidate(self, project_key=None, track_token=None):
+        """
+        Remove cached results
+
+        :param project_key: optional, only the results of this project
+        :param track_token: optional, only the results of this model / parametric study of the project
+        """
+        if project_key is None:
+            self.clear()
+            return
+        directory = os.path.join(self._path, self.__digest(project_key))
+        if track_token is not None:
+            directory = os.path.join(directory, self.__digest(track_token))
+        with self._lock:
+            files = self.__load()
+            shutil.rmtree(directory, ignore_errors=True)
+            for file_path in [p for p in files if p.startswith(directory + os.sep)]:
+                self._size -= files.pop(file_path)[0]
+
+    def clear(self):
+        """Remove all the cached results"""
+        with self._lock:
+            shutil.rmtree(self._path, ignore_errors=True)
+            self._files = dict()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            files = self.__load()
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                    'entries': len(files), 'bytes': self._size}
+
+    def __file(self, project_key, track_token, endpoint, params):
+        request = self.__digest(endpoint + '?' + json.dumps(self.__params(params), sort_keys=True))
+        return os.path.join(self._path, self.__digest(project_key), self.__digest(track_token), request + '.json')
+
+    @staticmethod
+    def __params(params):
+        # the values are compared after a json round trip
+        return dict((str(key), str(value)) for key, value in params.items())
+
+    @staticmethod
+    def __digest(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+    def __load(self):
+        # the caller holds self._lock
+        if self._files is not None:
+            return self._files
+        self._files = dict()
+        self._size = 0
+        for root, dirs, names in os.walk(self._path):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                self._files[file_path] = [stat.st_size, stat.st_mtime]
+                self._size += stat.st_size
+        return self._files
+
+    def __evict(self, keep):
+        # the caller holds self._lock
+        if self._size <= self._max_bytes:
+            return
+        for file_path, entry in sorted(self._files.items(), key=lambda item: item[1][1]):
+            if self._size <= self._max_bytes:
+                break
+            if file_path == keep:
+                continue
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            del self._files[file_path]
+            self._size -= entry[0]
+            self._evictions += 1
+
+
+def get_result_cache(session=None):
+    """The result cache of the session, None if it has none"""
+    if session is None:
+        session = get_default_session()
+    return session.result_cache
+
+
+def is_cacheable(resp_json):
+    """only complete, successful responses are cached"""
+    if isinstance(resp_json, dict):
+        return resp_json.get('status', 'success') == 'success' and 'error_msg' not in resp_json
+    return isinstance(resp_json, list)
+
+
+def cached_request_get(url, params, project_key, track_token, session=None, is_finished=None):
+    """
+    request_get for the result endpoints, the response is read from / written to the result cache of the session
+
+    :param is_finished: optional, called before a response is written - nothing is written if it returns False,
+        e.g. while the simulation is still running
+    :return: HTTPConnect
+    """
+    cache = get_result_cache(session)
+    if cache is None:
+        return request_get(url, params=params, session=session)
+
+    endpoint = url.rsplit('/', 1)[-1]
+    value = cache.get(project_key, track_token, endpoint, params)
+    if value is not None:
+        return HTTPConnect(200, value)
+
+    r = request_get(url, params=params, session=session)
+    if r.status_code == 200 and is_cacheable(r.json()) and (is_finished is None or is_finished()):
+        cache.put(project_key, track_token, endpoint, params, r.json())
+    return r
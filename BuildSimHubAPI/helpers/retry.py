@@ -0,0 +1,227 @@
+"""
+Retry and circuit breaker settings used by httpurllib and the asyncio transport.
+
+A RetryPolicy decides whether a failed request is sent again and how long to wait:
+exponential backoff with jitter, Retry-After is honored, and requests that are
+not idempotent (POST) are only retried when the server cannot have processed them.
+
+A CircuitBreaker counts the consecutive failures of every host and fails fast
+with CircuitOpenError while the host looks down.
+"""
+import time
+import random
+import threading
+import email.utils
+
+# methods that can be sent again without side effects
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request while the circuit of the host is open"""
+
+    def __init__(self, host, retry_in):
+        ConnectionError.__init__(self, 'BuildSimHub server %s is unavailable, retry in %.0f seconds' %
+                                 (host, retry_in))
+        self.host = host
+        self.retry_in = retry_in
+
+
+class RetryPolicy(object):
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30, status_forcelist=(429, 502, 503, 504),
+                 max_retry_after=120):
+        """
+        Construct a retry policy
+
+        :param max_retries: maximum number of times a request is sent again, 0 disables the retries
+        :param backoff_factor: the wait before retry n is a random time up to backoff_factor * 2 ** n
+        :param max_backoff: maximum seconds of a backoff wait
+        :param status_forcelist: response status codes that are retried
+        :param max_retry_after: maximum seconds waited for a Retry-After header
+        :type max_retries: int
+        :type backoff_factor: float
+        """
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
+        self._max_backoff = max_backoff
+        self._status_forcelist = tuple(status_forcelist)
+        self._max_retry_after = max_retry_after
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._exhausted = 0
+
+    @property
+    def max_retries(self):
+        return self._max_retries
+
+    @property
+    def retries(self):
+        """Number of requests sent again"""
+        return self._retries
+
+    @property
+    def exhausted(self):
+        """Number of requests that still failed after all their retries"""
+        return self._exhausted
+
+    def retry_on_error(self, method, attempt, error):
+        """
+        Whether a request that raised a connection error is sent again
+
+        A request that is not idempotent is only retried if the connection was refused,
+        the server never received it.
+        """
+        if method.upper() not in IDEMPOTENT_METHODS and not isinstance(error, ConnectionRefusedError):
+            return False
+        return self.__can_retry(attempt)
+
+    def retry_on_status(self, method, attempt, status):
+        """
+        Whether a request that got a response with this status is sent again
+
+        A request that is not idempotent is only retried on 429, the server rejected it without processing it.
+        """
+        if status not in self._status_forcelist:
+            return False
+        if method.upper() not in IDEMPOTENT_METHODS and status != 429:
+            return False
+        return self.__can_retry(attempt)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Seconds to wait before sending the request again
+
+        :param attempt: 0 for the first retry
+        :param retry_after: the Retry-After header of the response, if there is one
+        """
+        delay = self.__parse_retry_after(retry_after)
+        if delay is None:
+            # full jitter
+            delay = random.uniform(0, min(self._max_backoff, self._backoff_factor * (2 ** attempt)))
+        with self._lock:
+            self._retries += 1
+        return delay
+
+    def stats(self):
+        with self._lock:
+            return {'retries': self._retries, 'exhausted': self._exhausted}
+
+    def reset_stats(self):
+        with self._lock:
+            self._retries = 0
+            self._exhausted = 0
+
+    def __can_retry(self, attempt):
+        if attempt < self._max_retries:
+            return True
+        if self._max_retries > 0:
+            with self._lock:
+                self._exhausted += 1
+        return False
+
+    def __parse_retry_after(self, retry_after):
+        if retry_after is None:
+            return None
+        retry_after = retry_after.strip()
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            date = email.utils.parsedate_tz(retry_after)
+            if date is None:
+                return None
+            delay = email.utils.mktime_tz(date) - time.time()
+        return min(max(delay, 0), self._max_retry_after)
+
+
+class CircuitBreaker(object):
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Construct a per host circuit breaker
+
+        After failure_threshold consecutive failures the circuit of the host opens and the requests fail
+        fast with CircuitOpenError. After reset_timeout seconds one trial request is let through:
+        a success closes the circuit, a failure opens it again.
+
+        :param failure_threshold: consecutive failures that open the circuit, 0 disables the breaker
+        :param reset_timeout: seconds the circuit stays open
+        :type failure_threshold: int
+        :type reset_timeout: float
+        """
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        # host -> [consecutive failures, time the circuit opened or None]
+        self._hosts = dict()
+        self._trips = 0
+        self._rejected = 0
+
+    @property
+    def trips(self):
+        """Number of times a circuit opened"""
+        return self._trips
+
+    @property
+    def rejected(self):
+        """Number of requests failed fast because the circuit was open"""
+        return self._rejected
+
+    def state(self, host):
+        """
+        :return: closed, open or half-open
+        """
+        with self._lock:
+            failures, opened = self._hosts.get(host, (0, None))
+        if opened is None:
+            return 'closed'
+        if time.time() - opened < self._reset_timeout:
+            return 'open'
+        return 'half-open'
+
+    def before_request(self, host):
+        """
+        Check the circuit of the host before a request is sent
+
+        :raise CircuitOpenError: if the circuit is open
+        """
+        if self._failure_threshold <= 0:
+            return
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None or entry[1] is None:
+                return
+            elapsed = time.time() - entry[1]
+            if elapsed >= self._reset_timeout:
+                # half-open: let this trial request through, the circuit stays open for the others
+                entry[1] = time.time()
+                return
+            self._rejected += 1
+        raise CircuitOpenError(host, self._reset_timeout - elapsed)
+
+    def record_success(self, host):
+        with self._lock:
+            if host in self._hosts:
+                del self._hosts[host]
+
+    def record_failure(self, host):
+        if self._failure_threshold <= 0:
+            return
+        with self._lock:
+            entry = self._hosts.setdefault(host, [0, None])
+            entry[0] += 1
+            if entry[0] >= self._failure_threshold:
+                if entry[1] is None:
+                    self._trips += 1
+                entry[1] = time.time()
+
+    def stats(self):
+        with self._lock:
+            open_hosts = [host for host, entry in self._hosts.items() if entry[1] is not None]
+            return {'trips': self._trips, 'rejected': self._rejected, 'open_hosts': open_hosts}
+
+    def reset(self):
+        with self._lock:
+            self._hosts = dict()
+            self._trips = 0
+            self._rejected = 0
@@ -0,0 +1,101 @@
+"""
+Per client request settings shared by the helpers created from one client.
+
+The request headers are built once instead of on every request,
+the retry policy and the circuit breaker are shared by all the requests of the session,
+the jobs of the session look up their uploads in the upload cache and the models
+their results in the result cache, if there are ones.
+"""
+from .bldgsim_info import get_settings
+from .compression import ACCEPT_ENCODING
+from .retry import RetryPolicy
+from .retry import CircuitBreaker
+
+
+class Session(object):
+
+    def __init__(self, vendor_id=None, retry_policy=None, circuit_breaker=None, upload_cache=None,
+                 result_cache=None):
+        """
+        Construct a session
+
+        :param vendor_id: optional, the vendor id sent with every request.
+            If None, the shared settings are used (see MetaInfo) and followed when they change
+        :param retry_policy: optional, RetryPolicy() if None
+        :param circuit_breaker: optional, CircuitBreaker() if None
+        :param upload_cache: optional, repeat uploads of the same model are copied on the server
+            instead of sent again. None disables it
+        :param result_cache: optional, the results of completed simulations are read from it
+            instead of requested again. None disables it
+        :type vendor_id: str
+        :type retry_policy: RetryPolicy
+        :type circuit_breaker: CircuitBreaker
+        :type upload_cache: UploadCache
+        :type result_cache: ResultCache
+        """
+        self._vendor_id = vendor_id
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        if circuit_breaker is None:
+            circuit_breaker = CircuitBreaker()
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
+        self._upload_cache = upload_cache
+        self._result_cache = result_cache
+        self._settings = None
+        self._headers = None
+        if vendor_id is not None:
+            self._headers = self.__build_headers(vendor_id)
+
+    @property
+    def vendor_id(self):
+        if self._vendor_id is not None:
+            return self._vendor_id
+        return get_settings()['vendor_id']
+
+    @property
+    def retry_policy(self):
+        return self._retry_policy
+
+    @property
+    def circuit_breaker(self):
+        return self._circuit_breaker
+
+    @property
+    def upload_cache(self):
+        return self._upload_cache
+
+    @property
+    def result_cache(self):
+        return self._result_cache
+
+    def stats(self):
+        """Retry and circuit breaker metrics"""
+        stats = self._retry_policy.stats()
+        stats.update(self._circuit_breaker.stats())
+        return stats
+
+    def headers(self):
+        """
+        The request headers, a new dict the caller can modify
+
+        :rtype: dict
+        """
+        if self._vendor_id is None:
+            settings = get_settings()
+            if settings is not self._settings:
+                self._headers = self.__build_headers(settings['vendor_id'])
+                self._settings = settings
+        return dict(self._headers)
+
+    @staticmethod
+    def __build_headers(vendor_id):
+        return {'vendor_key': vendor_id, 'Accept-Encoding': ACCEPT_ENCODING}
+
+
+_default_session = Session()
+
+
+def get_default_session():
+    """The session used by the requests that are not given one"""
+    return _default_session
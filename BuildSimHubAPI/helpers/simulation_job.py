@@ -1,22 +1,29 @@
 from .energy_model import Model
 import time
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
 from .httpurllib import request_get
 from .httpurllib import request_post
 from .compat import is_py2
 from .parametric_model import ParametricModel
-import os
-import zipfile
+from .session import get_default_session
+from .add_files_zip import zip_add_files
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 
-class SimulationJob(object):
+class BaseSimulationJob(object):
+    """
+    The job state and the server response handling shared by SimulationJob and AsyncSimulationJob,
+    the requests and the tracking loops are in the subclasses
+    """
     # every call will connect to this base URL
     BASE_URL = 'https://my.buildsim.io/'
 
     def __init__(self, project_key, base_url=None, logger=None):
         """
-        Create simulation job object.
-
-        If parameters are supplied, all parameters must be present.
         :param project_key: the project key, required
         :param base_url: api connection url
         :type project_key: basestring
@@ -26,8 +33,12 @@ class SimulationJob(object):
         self._track_token = ""
         self._track_status = "No simulation is running or completed in this Job - " \
                              "please start simulation using run method."
+        # 0 - 1, None if the server did not report the progress yet
+        self._track_progress = None
+        # submit status of every model of the last batch run
+        self._batch_status = list()
         self._model_action_list = list()
-        self._base_url = SimulationJob.BASE_URL
+        self._base_url = BaseSimulationJob.BASE_URL
         self._model_api_key = ""
         self._logger = None
 
@@ -41,6 +52,21 @@ class SimulationJob(object):
     def track_status(self):
         return self._track_status
 
+    @property
+    def track_progress(self):
+        """The progress of the last tracking call, 0 - 1 or None if unknown"""
+        return self._track_progress
+
+    @property
+    def batch_status(self):
+        """
+        The submit status of every model of the last batch run (run with a list of models)
+
+        :return: list of dict with keys model, status (success or error) and message
+        :rtype: list
+        """
+        return self._batch_status
+
     @property
     def track_token(self):
         return self._track_token
@@ -57,25 +83,10 @@ class SimulationJob(object):
     def track_token(self, value):
         self._track_token = value
 
-    def track_batch_simulation(self):
-        if self._track_token == "":
-            return self._track_status
-
-        url = self._base_url + 'ParametricTracking_API'
-        payload = {
-            'folder_api_key': self._track_token,
-            'project_api_key': self._project_key
-        }
-
-        try:
-            r = request_get(url, params=payload)
-            resp_json = r.json()
-        except ConnectionResetError:
-            return "Reconnecting to server..."
-
-        if r.status_code > 200:
+    def _batch_track_info(self, status_code, resp_json):
+        if status_code > 200:
             try:
-                print('Code: ' + str(r.status_code) + ' message: ' + resp_json['error_msg'])
+                print('Code: ' + str(status_code) + ' message: ' + resp_json['error_msg'])
             except TypeError:
                 print(resp_json)
             return False
@@ -99,6 +110,7 @@ class SimulationJob(object):
 
             message = "Total progress %d%%, success: %d, failure: %d, running: %d, queue: %d"
             self._track_status = message % (total_progress * 100, success, error, running, queue)
+            self._track_progress = total_progress
 
             if total_progress == 1:
                 return False
@@ -108,6 +120,129 @@ class SimulationJob(object):
             print(resp_json['message'])
             return True
 
+    def _simulation_track_info(self, resp_json):
+        if 'severe_error' in resp_json:
+            self._track_status = resp_json['severe_error']
+            return False
+
+        if isinstance(resp_json, list):
+            # parallel simulation
+            sim_json = dict()
+            percent = 100
+            for sim_obj in resp_json:
+                if 'has_more' in sim_obj:
+                    if sim_obj['has_more']:
+                        sim_json['has_more'] = sim_obj['has_more']
+                if 'percent' in sim_obj:
+                    if sim_obj['percent'] < percent:
+                        sim_json['percent'] = sim_obj['percent']
+                        percent = sim_obj['percent']
+                        sim_json['doing'] = sim_obj['doing']
+            resp_json = sim_json
+        return self._track_info(resp_json)
+
+    def _track_info(self, resp_json):
+        if 'has_more' not in resp_json:
+            if 'error_msg' in resp_json:
+                self._track_status = resp_json['error_msg']
+                return False
+            else:
+                self._track_status = 'Finished'
+                return False
+
+        if resp_json['has_more']:
+            self._track_status = resp_json['doing'] + " " + str(resp_json['percent']) + "%"
+            self._track_progress = float(resp_json['percent']) / 100
+            return resp_json['has_more']
+        else:
+            if resp_json['percent'] == 100:
+                self._track_status = resp_json['msg']
+                self._track_progress = 1.0
+            # self._track_status = resp_json['error_msg']
+            return resp_json['has_more']
+
+    @staticmethod
+    def _decode_model_and_epw(model, epw):
+        files = dict()
+        if is_py2:
+            files['model'] = open(model, 'rb')
+            if epw is not None:
+                files['weather_file'] = open(epw, 'rb')
+        else:
+            # py3 cannot decode incompatible utf-8 string
+            files['model'] = open(model, 'rb')
+            if epw is not None:
+                files['weather_file'] = open(epw, 'rb')
+        return files
+
+    @staticmethod
+    def _batch_model_status(model, resp):
+        status = {'model': model, 'status': 'error', 'message': ''}
+        resp_json = resp.json()
+        if resp.status_code != 200 or not isinstance(resp_json, dict):
+            status['message'] = 'Code: ' + str(resp.status_code)
+            if isinstance(resp_json, dict) and 'error_msg' in resp_json:
+                status['message'] += ' message: ' + resp_json['error_msg']
+        elif resp_json.get('status') == 'error':
+            status['message'] = resp_json.get('error_msg', '')
+        else:
+            status['status'] = 'success'
+        return status
+
+    def _http_code_check(self, resp):
+        if resp.status_code == 500:
+            self._track_status = 'Code: ' + str(resp.status_code)
+            print(self._track_status)
+            return False
+        resp_json = resp.json()
+        if resp.status_code > 200:
+            try:
+                self._track_status = 'Code: ' + \
+                    str(resp.status_code) + ' message: ' + resp_json['error_msg']
+            except TypeError:
+                print(resp_json)
+            print(self._track_status)
+            return False
+        # None of those code, then it should be 200
+        print("Received server response")
+        return True
+
+
+class SimulationJob(BaseSimulationJob):
+
+    def __init__(self, project_key, base_url=None, logger=None, session=None):
+        """
+        Create simulation job object.
+
+        If parameters are supplied, all parameters must be present.
+        :param project_key: the project key, required
+        :param base_url: api connection url
+        :param session: optional, the Session the request settings come from - None uses the shared one
+        :type project_key: basestring
+        :type base_url: basestring
+        """
+        BaseSimulationJob.__init__(self, project_key, base_url, logger)
+        self._session = session
+
+    def track_batch_simulation(self):
+        if self._track_token == "":
+            return self._track_status
+
+        url = self._base_url + 'ParametricTracking_API'
+        payload = {
+            'folder_api_key': self._track_token,
+            'project_api_key': self._project_key
+        }
+
+        try:
+            r = request_get(url, params=payload, session=self._session)
+            resp_json = r.json()
+        except ConnectionError:
+            # the retries are exhausted or the circuit is open - keep tracking
+            return "Reconnecting to server..."
+
+        return self._batch_track_info(r.status_code, resp_json)
+
     def track_simulation(self):
         """
         track the simulation progress
@@ -133,33 +268,16 @@ class SimulationJob(object):
         }
 
         try:
-            r = request_get(url, params=payload)
+            r = request_get(url, params=payload, session=self._session)
             resp_json = r.json()
-        except ConnectionResetError:
+        except ConnectionError:
+            # the retries are exhausted or the circuit is open - keep tracking
             return "Reconnecting to server..."
 
-        if 'severe_error' in resp_json:
-            self._track_status = resp_json['severe_error']
-            return False
-
-        if isinstance(resp_json, list):
-            # parallel simulation
-            sim_json = dict()
-            percent = 100
-            for sim_obj in resp_json:
-                if 'has_more' in sim_obj:
-                    if sim_obj['has_more']:
-                        sim_json['has_more'] = sim_obj['has_more']
-                if 'percent' in sim_obj:
-                    if sim_obj['percent'] < percent:
-                        sim_json['percent'] = sim_obj['percent']
-                        percent = sim_obj['percent']
-                        sim_json['doing'] = sim_obj['doing']
-            resp_json = sim_json
-        return self._track_info(resp_json)
+        return self._simulation_track_info(resp_json)
 
     def run(self, file_dir, epw_dir=None, add_files=None, unit='ip', design_condition='yes', agent=1,
-            comment="Python API", track=False, request_time=5):
+            comment="Python API", track=False, request_time=5, max_workers=4, submit_interval=1):
         """
         The function allows user to upload a model or a list of models (idf, osm or gbXML) and a epw file
         (required for global project) for simulation.
@@ -170,6 +288,9 @@ class SimulationJob(object):
 
         or go to the simulation dashboard on the web UI to manually retrieve the model results.
 
+        If the client has an upload cache and the same files (single model) were uploaded to the project before,
+        the model is copied on the server and the copy is simulated, the files are not sent again.
+
         :param file_dir: directory of the energy file (idf, osm, or gbXML) or list of directories
         :param epw_dir: directory of the .epw file, only customized project supports this function
         :param unit: si or ip
@@ -180,6 +301,10 @@ class SimulationJob(object):
         :param add_files: directory of a folder that contains all the additional simulation files
         :param design_condition: default is no, if yes, the function will attempt to modify the design day condition
                 using ASHRAE design condition 2013 data based on the closest weather station / lat and lon.
+        :param max_workers: list of models only - the first model is uploaded alone, then up to max_workers
+                models are uploaded at the same time
+        :param submit_interval: list of models only - minimum seconds between the start of two uploads,
+                keeps the batch under the server throttle
         :type file_dir: str
         :type epw_dir: str
         :type unit: str
@@ -203,41 +328,31 @@ class SimulationJob(object):
         }
 
         if type(file_dir) is str:
+            cache_key = self._upload_cache_key(file_dir, epw_dir, add_files)
+            copy_token = self._copy_cached_model(cache_key)
+            if copy_token is not None:
+                if self.run_model_simulation(copy_token, unit, design_condition, agent) is not True:
+                    return False
+                return self._single_run_result(track, request_time)
 
             files = self._decode_model_and_epw(file_dir, epw_dir)
 
             if add_files is not None:
-                # parent parent dir
-                directory = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                zipf = zipfile.ZipFile(directory+'/add_folder.zip', 'w', zipfile.ZIP_DEFLATED)
-                self._zip_dir(add_files, zipf)
-                zipf.close()
-                files['schedule_csv'] = open(directory+'/add_folder.zip', 'rb')
+                files['schedule_csv'] = zip_add_files(add_files)
             print("Submitting simulation request...")
-            r = request_post(url, params=payload, files=files)
+            r = request_post(url, params=payload, files=files, session=self._session)
             if self._http_code_check(r):
                 resp_json = r.json()
                 if resp_json['status'] == 'success':
                     self._track_token = resp_json['tracking']
                     self._model_api_key = resp_json['model_api_key']
+                    self._store_upload(cache_key)
 
                     # log
                     if self._logger is not None:
                         self._logger.write_in_message('ModelSimulation', 'BatchRun', self._project_key,
                                                       self._track_token, '200', self._track_token)
-                    if track:
-                        while self.track_simulation():
-                            print(self.track_status)
-                            time.sleep(request_time)
-                    if self.track_status == 'Simulation finished successfully':
-                        print(self.track_status)
-                        # check whether there is requested data
-                        print('Completed! You can retrieve results using the key: '+self._track_token)
-                        res = Model(self._project_key, self._track_token, self._base_url)
-                        return res
-                    else:
-                        print(self.track_status)
-                        return False
+                    return self._single_run_result(track, request_time)
                 else:
                     try:
                         print(resp_json['error_msg'])
@@ -254,14 +369,9 @@ class SimulationJob(object):
             files = self._decode_model_and_epw(file_dir[0], epw_dir)
 
             if add_files is not None:
-                # parent parent dir
-                directory = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                zipf = zipfile.ZipFile(directory+'/add_folder.zip', 'w', zipfile.ZIP_DEFLATED)
-                self._zip_dir(add_files, zipf)
-                zipf.close()
-                files['schedule_csv'] = open(directory+'/add_folder.zip', 'rb')
-
-            r = request_post(url, params=payload, files=files)
+                files['schedule_csv'] = zip_add_files(add_files)
+
+            r = request_post(url, params=payload, files=files, session=self._session)
             if self._http_code_check(r):
                 resp_json = r.json()
                 if resp_json['status'] == 'success':
@@ -275,25 +385,16 @@ class SimulationJob(object):
                                                       self._track_token, '200', self._track_token)
 
                     payload['model_api_key'] = self._track_token
-                    for i in range(1, len(file_dir)):
-                        time.sleep(5)
-                        print("Submitting the model number: " + str(i + 1))
-                        temp_files = self._decode_model_and_epw(file_dir[i], None)
-                        r = request_post(url, params=payload, files=temp_files)
-                        if self._http_code_check(r):
-                            resp_json = r.json()
-                            if resp_json['status'] == 'error':
-                                print(resp_json['error_msg'])
-                                return False
-                        else:
-                            return False
+                    self._batch_status = [self._batch_model_status(file_dir[0], r)]
+                    self._submit_batch(url, payload, file_dir, max_workers, submit_interval)
                     if track:
                         while self.track_batch_simulation():
                             print(self._track_status)
                             time.sleep(request_time)
                         print(self._track_status)
                         print('Completed! You can retrieve results using the key: '+self._track_token)
-                        res = ParametricModel(self._project_key, self._track_token, self._base_url)
+                        res = ParametricModel(self._project_key, self._track_token, self._base_url,
+                                              session=self._session)
 
                         return res
                     else:
@@ -376,7 +477,7 @@ class SimulationJob(object):
             payload['do_load_simulation'] = 'yes'
 
         print("Submitting simulation request...")
-        r = request_post(url, params=payload)
+        r = request_post(url, params=payload, session=self._session)
         if self._http_code_check(r):
             resp_json = r.json()
             if resp_json['status'] == 'success':
@@ -395,7 +496,7 @@ class SimulationJob(object):
                 if self.track_status == 'Simulation finished successfully':
                     print('Completed! You can retrieve results using the key: ' + self._track_token)
                     # check whether there is requested data
-                    res = Model(self._project_key, self._track_token, self._base_url)
+                    res = Model(self._project_key, self._track_token, self._base_url, session=self._session)
                     return res
                 else:
                     # print(self.track_status)
@@ -407,7 +508,7 @@ class SimulationJob(object):
             return False
 
     def create_run_model(self, file_dir, epw_dir=None, add_files=None, unit='ip', design_condition='yes', agent=1,
-                         comment="Python API", track=False, request_time=5):
+                         comment="Python API", track=False, request_time=5, max_workers=4, submit_interval=1):
         """
         deprecated - works the same as the run function now.
 
@@ -433,7 +534,7 @@ class SimulationJob(object):
         :rtype: bool or Model
         """
         return self.run(file_dir, epw_dir, add_files, unit, design_condition, agent,
-                        comment, track, request_time)
+                        comment, track, request_time, max_workers, submit_interval)
 
     def create_model(self, file_dir, epw_dir=None, add_files=None, comment="Upload through Python API"):
         """
@@ -446,6 +547,9 @@ class SimulationJob(object):
         new_sj = bsh.new_simulation_job("xxx-x-xxx-xx")
         new_sj.create_model("local/usr/in.idf")
 
+        If the client has an upload cache and the same files were uploaded to the project before,
+        the model is copied on the server instead of uploaded again.
+
         :param file_dir:
         :param comment:
         :param add_files: directory of a folder that contains all the additional simulation files
@@ -460,28 +564,20 @@ class SimulationJob(object):
             'agents': ''
         }
 
-        files = dict()
+        cache_key = self._upload_cache_key(file_dir, epw_dir, add_files)
+        copy_token = self._copy_cached_model(cache_key)
+        if copy_token is not None:
+            self._track_token = copy_token
+            self._model_api_key = copy_token
+            return Model(self.project_key, self._track_token, self._base_url, session=self._session)
 
-        if is_py2:
-            files['model'] = open(file_dir, 'r')
-            if epw_dir is not None:
-                files['weather_file'] = open(epw_dir, 'r')
-        else:
-            # py3 cannot decode incompatible utf-8 string
-            files['model'] = open(file_dir, 'r', errors='ignore')
-            if epw_dir is not None:
-                files['weather_file'] = open(epw_dir, 'r', errors='ignore')
+        files = self._decode_model_and_epw(file_dir, epw_dir)
 
         if add_files is not None:
-            # parent parent dir
-            directory = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            zipf = zipfile.ZipFile(directory + '/add_folder.zip', 'w', zipfile.ZIP_DEFLATED)
-            self._zip_dir(add_files, zipf)
-            zipf.close()
-            files['schedule_csv'] = open(directory + '/add_folder.zip', 'rb')
+            files['schedule_csv'] = zip_add_files(add_files)
 
         print('submitting model to the server...')
-        r = request_post(url, params=payload, files=files)
+        r = request_post(url, params=payload, files=files, session=self._session)
         if r.status_code == 500:
             self._track_status = 'Code: ' + str(r.status_code)
             print(self._track_status)
@@ -498,13 +594,14 @@ class SimulationJob(object):
         if resp_json['status'] == 'no_simulation':
             self._track_token = resp_json['tracking']
             self._model_api_key = resp_json['model_api_key']
+            self._store_upload(cache_key)
 
             # log
             if self._logger is not None:
                 self._logger.write_in_message('ModelSimulation', 'UploadModel', self._project_key,
                                               self._track_token, '200', self._track_token)
             print(self._track_token)
-            return Model(self.project_key, self._track_token, self._base_url)
+            return Model(self.project_key, self._track_token, self._base_url, session=self._session)
         else:
             if 'error_msg' in resp_json:
                 print(resp_json['error_msg'])
@@ -512,58 +609,92 @@ class SimulationJob(object):
                 print(resp_json)
             return False
 
-    def _track_info(self, resp_json):
-        if 'has_more' not in resp_json:
-            if 'error_msg' in resp_json:
-                self._track_status = resp_json['error_msg']
-                return False
-            else:
-                self._track_status = 'Finished'
-                return False
-
-        if resp_json['has_more']:
-            self._track_status = resp_json['doing'] + " " + str(resp_json['percent']) + "%"
-            return resp_json['has_more']
+    def _single_run_result(self, track, request_time):
+        if track:
+            while self.track_simulation():
+                print(self.track_status)
+                time.sleep(request_time)
+        if self.track_status == 'Simulation finished successfully':
+            print(self.track_status)
+            # check whether there is requested data
+            print('Completed! You can retrieve results using the key: '+self._track_token)
+            res = Model(self._project_key, self._track_token, self._base_url, session=self._session)
+            return res
         else:
-            if resp_json['percent'] == 100:
-                self._track_status = resp_json['msg']
-            # self._track_status = resp_json['error_msg']
-            return resp_json['has_more']
+            print(self.track_status)
+            return False
 
-    @staticmethod
-    def _decode_model_and_epw(model, epw):
-        files = dict()
-        if is_py2:
-            files['model'] = open(model, 'rb')
-            if epw is not None:
-                files['weather_file'] = open(epw, 'rb')
-        else:
-            # py3 cannot decode incompatible utf-8 string
-            files['model'] = open(model, 'rb')
-            if epw is not None:
-                files['weather_file'] = open(epw, 'rb')
-        return files
+    def _upload_cache(self):
+        session = self._session
+        if session is None:
+            session = get_default_session()
+        return session.upload_cache
 
-    @staticmethod
-    def _zip_dir(path, ziph):
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                ziph.write(os.path.join(root, file), arcname=file)
+    def _upload_cache_key(self, file_dir, epw_dir, add_files):
+        """the fingerprint of the upload, None if there is no upload cache"""
+        cache = self._upload_cache()
+        if cache is None:
+            return None
+        return cache.fingerprint(self._project_key, file_dir, epw_dir, add_files)
 
-    def _http_code_check(self, resp):
-        if resp.status_code == 500:
-            self._track_status = 'Code: ' + str(resp.status_code)
-            print(self._track_status)
-            return False
-        resp_json = resp.json()
-        if resp.status_code > 200:
+    def _copy_cached_model(self, cache_key):
+        """
+        copy the model uploaded before with the same files on the server
+
+        :return: the track token of the copy, None if the files were not uploaded before or the copy failed
+        """
+        if cache_key is None:
+            return None
+        entry = self._upload_cache().get(cache_key)
+        if entry is None:
+            return None
+        print('The model was uploaded before, copying model: ' + entry['track_token'])
+        seed = Model(self._project_key, entry['track_token'], self._base_url, self._logger, self._session)
+        try:
+            copy_token = seed.model_copy()
+        except (KeyError, TypeError):
+            copy_token = None
+        if not copy_token:
+            # most likely the model was deleted on the server - upload it again
+            self._upload_cache().discard(cache_key)
+            return None
+        return copy_token
+
+    def _store_upload(self, cache_key):
+        if cache_key is not None:
+            self._upload_cache().put(cache_key, {'track_token': self._track_token,
+                                                 'model_api_key': self._model_api_key})
+
+    def _submit_batch(self, url, payload, file_dir, max_workers, submit_interval):
+        """
+        upload the models after the first one concurrently, a failed model does not stop the others
+        """
+        total = len(file_dir)
+        lock = threading.Lock()
+        # start time of the next upload
+        next_start = [time.time()]
+
+        def submit(i):
+            with lock:
+                wait = next_start[0] - time.time()
+                next_start[0] = max(next_start[0], time.time()) + submit_interval
+            if wait > 0:
+                time.sleep(wait)
             try:
-                self._track_status = 'Code: ' + \
-                    str(resp.status_code) + ' message: ' + resp_json['error_msg']
-            except TypeError:
-                print(resp_json)
-            print(self._track_status)
-            return False
-        # None of those code, then it should be 200
-        print("Received server response")
-        return True
+                temp_files = self._decode_model_and_epw(file_dir[i], None)
+                r = request_post(url, params=payload, files=temp_files, session=self._session)
+                status = self._batch_model_status(file_dir[i], r)
+            except (IOError, OSError, httplib.HTTPException, ValueError) as e:
+                # lost connection or an unreadable response - recorded, the other models go on
+                status = {'model': file_dir[i], 'status': 'error', 'message': str(e)}
+            if status['status'] == 'success':
+                print("Submitted the model number: " + str(i + 1) + " of " + str(total))
+            else:
+                print("Failed to submit the model number: " + str(i + 1) + " " + status['message'])
+            return status
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            self._batch_status.extend(executor.map(submit, range(1, total)))
+
+        failed = len([status for status in self._batch_status if status['status'] != 'success'])
+        print("Submitted " + str(total - failed) + " of " + str(total) + " models")
@@ -0,0 +1,165 @@
+"""
+Streaming response returned by httpurllib when a request is sent with stream=True.
+
+The body is read from the socket chunk by chunk (and decompressed on the fly),
+so large result files can be written to disk without holding them in memory.
+The connection goes back to the pool once the body has been read completely.
+"""
+import json
+
+from .connection_pool import get_connection_pool
+from .compression import decompressor
+from .compression import get_compression_stats
+
+
+class StreamingResponse(object):
+    # default chunk size of iter_content and save_to
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, process, conn, resp):
+        """
+        Construct a streaming response
+
+        :param process: the split path of the request
+        :param conn: the connection the response is read from
+        :param resp: http.client response
+        """
+        self._process = process
+        self._conn = conn
+        self._resp = resp
+        self._decomp = decompressor(resp.getheader('Content-Encoding'))
+        self._buffer = b''
+        self._finished = False
+        self._closed = False
+        self._wire = 0
+        self._decoded = 0
+        self._response = None
+
+    @property
+    def status_code(self):
+        return self._resp.status
+
+    def getheader(self, name, default=None):
+        return self._resp.getheader(name, default)
+
+    def original_response(self):
+        return self._resp
+
+    def json(self):
+        """Read the rest of the body and parse it like HTTPConnect.json"""
+        if self._response is None:
+            data = self.read().decode('utf-8', errors='ignore')
+            try:
+                self._response = json.loads(data)
+            except ValueError:
+                self._response = data
+        return self._response
+
+    def read(self, size=-1):
+        """
+        Read decoded bytes of the body
+
+        :param size: maximum number of bytes, everything left if negative
+        :return: empty bytes at the end of the body
+        """
+        if size is None or size < 0:
+            chunks = [self._buffer]
+            self._buffer = b''
+            while not self._finished:
+                chunks.append(self.__next_chunk(self.CHUNK_SIZE))
+            return b''.join(chunks)
+
+        while len(self._buffer) < size and not self._finished:
+            self._buffer += self.__next_chunk(max(size, self.CHUNK_SIZE))
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def readinto(self, b):
+        """
+        Read decoded bytes into a pre-allocated, writable bytes-like object
+
+        :return: the number of bytes read, 0 at the end of the body
+        """
+        data = self.read(len(b))
+        n = len(data)
+        memoryview(b).cast('B')[:n] = data
+        return n
+
+    def iter_content(self, chunk_size=None):
+        """
+        Iterate over the decoded body
+
+        :param chunk_size: number of bytes read from the socket at a time
+        :return: generator of bytes
+        """
+        if chunk_size is None:
+            chunk_size = self.CHUNK_SIZE
+        if self._buffer:
+            data = self._buffer
+            self._buffer = b''
+            yield data
+        while not self._finished:
+            data = self.__next_chunk(chunk_size)
+            if data:
+                yield data
+
+    def save_to(self, path, chunk_size=None):
+        """
+        Write the body straight to a file
+
+        :param path: the file to write
+        :param chunk_size: number of bytes read from the socket at a time
+        :return: the number of bytes written
+        """
+        written = 0
+        try:
+            with open(path, 'wb') as f:
+                for chunk in self.iter_content(chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+        finally:
+            self.close()
+        return written
+
+    def close(self):
+        """
+        Close the response, the connection is only reused if the body was read completely
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._finished:
+            get_connection_pool().release(self._process['host'], self._process['is_ssl'], self._conn,
+                                          not self._resp.will_close)
+        else:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __next_chunk(self, size):
+        try:
+            data = self._resp.read(size)
+        except Exception:
+            # the connection is in an unknown state - never reuse it
+            self._finished = True
+            self._closed = True
+            self._conn.close()
+            raise
+        if not data:
+            self._finished = True
+            if self._decomp is not None:
+                data = self._decomp.flush()
+                self._decoded += len(data)
+                get_compression_stats().record_response(self._wire, self._decoded)
+            self.close()
+            return data
+        if self._decomp is not None:
+            self._wire += len(data)
+            data = self._decomp.decompress(data)
+            self._decoded += len(data)
+        return data
@@ -0,0 +1,179 @@
+"""
+Content addressed index of the models uploaded to the server.
+
+The SHA-256 of the model, the weather file and the additional files (and the project key)
+is mapped to the track token the server returned for the upload. A repeat submission of the
+same files finds the track token and copies the model on the server instead of uploading it again.
+
+The index is kept in a json file (~/.buildsimhub/upload_cache.json by default), the entries
+expire after ttl seconds and the least recently used entries are dropped above max_entries.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class UploadCache(object):
+    # bytes read at a time when hashing a file
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600, max_entries=1000):
+        """
+        Construct an upload cache
+
+        :param path: optional, the json file of the index, ~/.buildsimhub/upload_cache.json if None.
+            False keeps the index in memory only
+        :param ttl: seconds an entry is used after the upload, the server copy may have been deleted since
+        :param max_entries: maximum number of entries, the least recently used are dropped first
+        :type path: str
+        :type ttl: float
+        :type max_entries: int
+        """
+        if path is None:
+            path = os.path.join(os.path.expanduser('~'), '.buildsimhub', 'upload_cache.json')
+        self._path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> {'time': upload time, 'value': dict}, least recently used first
+        self._entries = None
+        # file path -> (size, mtime, digest) so an unchanged file is hashed once per process
+        self._digests = dict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def path(self):
+        return self._path
+
+    def fingerprint(self, project_key, model, weather=None, add_files=None):
+        """
+        The cache key of an upload
+
+        :param project_key: the project the model is uploaded to
+        :param model: the model file
+        :param weather: optional, the weather file
+        :param add_files: optional, the folder of the additional simulation files
+        :return: hex digest
+        :rtype: str
+        """
+        sha = hashlib.sha256()
+        sha.update(project_key.encode('utf-8'))
+        sha.update(b'\0model\0' + self.__file_digest(model).encode('ascii'))
+        if weather is not None:
+            sha.update(b'\0weather\0' + self.__file_digest(weather).encode('ascii'))
+        if add_files is not None:
+            sha.update(b'\0add_files\0')
+            for root, dirs, files in os.walk(add_files):
+                # os.walk order depends on the file system
+                dirs.sort()
+                for name in sorted(files):
+                    file_path = os.path.join(root, name)
+                    rel_path = os.path.relpath(file_path, add_files).replace(os.sep, '/')
+                    sha.update(rel_path.encode('utf-8') + b'\0' + self.__file_digest(file_path).encode('ascii'))
+        return sha.hexdigest()
+
+    def get(self, key):
+        """
+        :return: the value stored for the key, None if there is none or it expired
+        :rtype: dict
+        """
+        with self._lock:
+            entries = self.__load()
+            entry = entries.get(key)
+            if entry is not None and time.time() - entry['time'] > self._ttl:
+                del entries[key]
+                self.__save()
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            entries.move_to_end(key)
+            self._hits += 1
+            return dict(entry['value'])
+
+    def put(self, key, value):
+        """
+        Store the server keys of an upload
+
+        :param key: the fingerprint of the upload
+        :param value: json serializable, e.g. {'track_token': ..., 'model_api_key': ...}
+        :type value: dict
+        """
+        with self._lock:
+            entries = self.__load()
+            entries.pop(key, None)
+            entries[key] = {'time': time.time(), 'value': dict(value)}
+            while len(entries) > self._max_entries:
+                entries.popitem(last=False)
+                self._evictions += 1
+            self.__save()
+
+    def discard(self, key):
+        """Remove an entry, e.g. the server copy of the model does not exist anymore"""
+        with self._lock:
+            entries = self.__load()
+            if entries.pop(key, None) is not None:
+                self.__save()
+
+    def clear(self):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._digests = dict()
+            self.__save()
+
+    def stats(self):
+        with self._lock:
+            entries = self.__load()
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                    'entries': len(entries)}
+
+    def __file_digest(self, file_path):
+        stat = os.stat(file_path)
+        memo = self._digests.get(file_path)
+        if memo is not None and memo[0] == stat.st_size and memo[1] == stat.st_mtime:
+            return memo[2]
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            chunk = f.read(self.CHUNK_SIZE)
+            while chunk:
+                sha.update(chunk)
+                chunk = f.read(self.CHUNK_SIZE)
+        digest = sha.hexdigest()
+        self._digests[file_path] = (stat.st_size, stat.st_mtime, digest)
+        return digest
+
+    def __load(self):
+        # the caller holds self._lock
+        if self._entries is not None:
+            return self._entries
+        self._entries = OrderedDict()
+        if self._path and os.path.exists(self._path):
+            try:
+                with open(self._path, 'r') as f:
+                    data = json.load(f)
+                for key, entry in data.items():
+                    if isinstance(entry, dict) and 'time' in entry and 'value' in entry:
+                        self._entries[key] = entry
+            except (IOError, OSError, ValueError) as e:
+                print('Ignored the upload cache ' + self._path + ': ' + str(e))
+        return self._entries
+
+    def __save(self):
+        # the caller holds self._lock
+        if not self._path:
+            return
+        try:
+            directory = os.path.dirname(self._path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            temp_path = self._path + '.' + str(os.getpid()) + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(temp_path, self._path)
+        except (IOError, OSError) as e:
+            print('Could not write the upload cache ' + self._path + ': ' + str(e))
@@ -1,2 +1,6 @@
 from .html_utility import extract_value_from_table
 from .html_utility import save_html
+from .html_utility import table_index
+from .table_index import HTMLTableIndex
+from .batch_extract import extract_values_from_files
+from .batch_extract import iter_values_from_files
@@ -0,0 +1,99 @@
+"""
+Extract the same values from many local HTML reports (eplustbl.htm) with a process pool.
+
+Every report is read and parsed once by a worker process. Only the file paths go to the
+workers and only the extracted values come back, so the memory stays bounded by the
+reports being parsed at a time, however many files there are.
+"""
+import io
+import multiprocessing
+
+from .table_index import HTMLTableIndex
+from .table_index import to_number
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+COLUMNS = ['file', 'report', 'table', 'column', 'row', 'value', 'unit']
+
+# the specs of the worker process, set by the pool initializer
+_worker_specs = None
+
+
+def iter_values_from_files(paths, specs, processes=None, chunksize=4):
+    """
+    Extract values from many HTML reports, the rows are yielded as the reports are done
+
+    On Windows the pool starts new interpreters, call it under if __name__ == '__main__':
+
+    :param paths: the HTML report files
+    :param specs: (report, table, column_name, row_name) or (report, table, column_name, row_name, report_for)
+        tuples, as the arguments of extract_value_from_table
+    :param processes: number of worker processes, the number of cores if None. 1 runs in this process
+    :param chunksize: number of files sent to a worker at a time
+    :return: generator of [file, report, table, column, row, value, unit] lists, in the order of paths.
+        The value is a float if the cell is numeric, None if the cell is not found
+    """
+    specs = [_normalize_spec(spec) for spec in specs]
+    if processes == 1:
+        _init_worker(specs)
+        for path in paths:
+            for row in _extract_file(path):
+                yield row
+        return
+
+    pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(specs,))
+    try:
+        for rows in pool.imap(_extract_file, paths, chunksize):
+            for row in rows:
+                yield row
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def extract_values_from_files(paths, specs, processes=None, chunksize=4):
+    """
+    Extract values from many HTML reports into one tidy DataFrame, see iter_values_from_files
+
+    Example:
+        specs = [('Annual Building Utility Performance Summary', 'Site and Source Energy',
+                  'Energy Per Total Building Area', 'Net Site Energy')]
+        df = extract_values_from_files(glob.glob('results/*/eplustbl.htm'), specs)
+        df.pivot_table(index='file', columns='row', values='value')
+
+    :return: DataFrame with the columns file, report, table, column, row, value and unit
+    """
+    if pd is None:
+        print('pandas is not installed')
+        return None
+    return pd.DataFrame(list(iter_values_from_files(paths, specs, processes, chunksize)), columns=COLUMNS)
+
+
+def _normalize_spec(spec):
+    if len(spec) == 4:
+        return tuple(spec) + ("EntireFacility",)
+    return tuple(spec)
+
+
+def _init_worker(specs):
+    global _worker_specs
+    _worker_specs = specs
+
+
+def _extract_file(path):
+    try:
+        with io.open(path, 'r', encoding='utf-8', errors='replace') as f:
+            index = HTMLTableIndex(f.read())
+    except (IOError, OSError) as e:
+        print('Could not read ' + str(path) + ': ' + str(e))
+        return []
+
+    rows = list()
+    for report, table, column_name, row_name, report_for in _worker_specs:
+        result = index.value(report, table, column_name, row_name, report_for)
+        value = to_number(result['value']) if result['value'] != '' else None
+        rows.append([path, report, table, column_name, row_name, value, result['unit']])
+    return rows
@@ -1,4 +1,12 @@
-from .numeric_value_parser import NumericValueParser
+import hashlib
+import threading
+from collections import OrderedDict
+from .table_index import HTMLTableIndex
+
+# the indexes of the last reports, repeat lookups in a report don't parse it again
+_INDEX_CACHE_SIZE = 4
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
 
 
 def save_html(content, directory):
@@ -7,7 +15,29 @@ def save_html(content, directory):
     text_file.close()
 
 
+def table_index(content):
+    """
+    The HTMLTableIndex of a report, the indexes of the last few reports are kept
+
+    :param content: the HTML report
+    :return: HTMLTableIndex
+    """
+    # keyed on a digest, the cache doesn't keep the reports themselves in memory
+    key = hashlib.sha1(content.encode('utf-8')).digest()
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    # parsed outside of the lock, two threads may index the same report at once
+    index = HTMLTableIndex(content)
+    with _index_cache_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
 def extract_value_from_table(content, report, table, column_name, row_name, report_for="EntireFacility"):
-    parser = NumericValueParser(report, table, column_name, row_name, report_for)
-    parser.feed(content)
-    return {'value': parser.data, 'unit': parser.unit}
+    return table_index(content).value(report, table, column_name, row_name, report_for)
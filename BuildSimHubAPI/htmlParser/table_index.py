@@ -0,0 +1,201 @@
+import re
+
+try:
+    from html.parser import HTMLParser
+except ImportError:
+    # python 2
+    from HTMLParser import HTMLParser
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def table_id(report, table, report_for="EntireFacility"):
+    """the tableid attribute of a table in the EnergyPlus HTML report"""
+    r = re.sub(r'\W', '', report)
+    t = re.sub(r'\W', '', table)
+    rf = re.sub(r'\W', '', report_for)
+    return r + ":" + rf + ":" + t
+
+
+def split_unit(text):
+    """Total Energy [GJ] -> (Total Energy, GJ)"""
+    index = text.find('[')
+    if index > -1 and text.endswith(']'):
+        return text[:index].strip(), text[index + 1:-1]
+    return text, ''
+
+
+def to_number(text):
+    """the cell as a float, the text itself if it is not numeric"""
+    try:
+        return float(text.replace(',', ''))
+    except ValueError:
+        return text
+
+
+class HTMLTableIndex(object):
+
+    def __init__(self, content):
+        """
+        Parse an EnergyPlus HTML report once and index all its tables
+
+        Example:
+            index = HTMLTableIndex(html)
+            index.value('Annual Building Utility Performance Summary', 'Site and Source Energy',
+                        'Total Energy', 'Net Site Energy')
+            {'value': '2707.79', 'unit': 'GJ'}
+
+        :param content: the HTML report, e.g. Model.get_simulation_results('html')
+        :type content: str
+        """
+        collector = _TableCollector()
+        collector.feed(content)
+        collector.close()
+
+        # tableid -> {'columns', 'units', 'rows', 'row_units', 'cells', 'column_index', 'row_index'}
+        self._tables = dict()
+        for tid, rows in collector.tables.items():
+            header = rows[0] if len(rows) > 0 else []
+            columns = list()
+            units = list()
+            for text in header[1:]:
+                column, unit = split_unit(text)
+                columns.append(column)
+                units.append(unit)
+            row_names = list()
+            row_units = list()
+            cells = list()
+            for row in rows[1:]:
+                if len(row) == 0:
+                    continue
+                row_names.append(row[0])
+                row_units.append(split_unit(row[0])[1])
+                # short rows are padded so every row has a cell per column
+                cells.append(row[1:] + [''] * (len(columns) - len(row) + 1))
+            self._tables[tid] = {
+                'columns': columns,
+                'units': units,
+                'rows': row_names,
+                'row_units': row_units,
+                'cells': cells,
+                'column_index': self.__first_index(columns),
+                # rows like Latitude [deg] are found without the unit too
+                'row_index': self.__first_index(row_names + [split_unit(name)[0] for name in row_names])
+            }
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, tid):
+        return tid in self._tables
+
+    def table_ids(self):
+        """the tableid of every table in the report"""
+        return list(self._tables.keys())
+
+    def value(self, report, table, column_name, row_name, report_for="EntireFacility"):
+        """
+        Look up one cell
+
+        It differs from the NumericValueParser that extract_value_from_table used before in two ways:
+        the cells are counted per td, an empty cell keeps its column where NumericValueParser skipped it
+        and read the next cell, and a column without a unit takes the unit of the row, e.g. Latitude [deg]
+
+        :return: {'value': the cell text, 'unit': the unit of the column or else of the row},
+            empty strings if not found
+        :rtype: dict
+        """
+        entry = self._tables.get(table_id(report, table, report_for))
+        if entry is None:
+            return {'value': '', 'unit': ''}
+        column = entry['column_index'].get(column_name)
+        if column is None:
+            return {'value': '', 'unit': ''}
+        unit = entry['units'][column]
+        row = entry['row_index'].get(row_name)
+        if row is None:
+            return {'value': '', 'unit': unit}
+        row = row % len(entry['rows'])
+        return {'value': entry['cells'][row][column], 'unit': unit or entry['row_units'][row]}
+
+    def table(self, report, table, report_for="EntireFacility"):
+        """
+        A whole table, numeric cells are converted to float
+
+        :return: {'columns': [...], 'units': [...], 'rows': [...], 'values': rows x columns}, None if not found
+        :rtype: dict
+        """
+        entry = self._tables.get(table_id(report, table, report_for))
+        if entry is None:
+            return None
+        return {'columns': list(entry['columns']),
+                'units': list(entry['units']),
+                'rows': list(entry['rows']),
+                'values': [[to_number(cell) for cell in row] for row in entry['cells']]}
+
+    def pandas_df(self, report, table, report_for="EntireFacility"):
+        """
+        A whole table as a DataFrame indexed by the row names, the units are in frame.attrs['units']
+
+        :return: DataFrame, None if not found
+        """
+        if pd is None:
+            print('pandas is not installed')
+            return None
+        data = self.table(report, table, report_for)
+        if data is None:
+            return None
+        df = pd.DataFrame(data['values'], index=data['rows'], columns=data['columns'])
+        df.attrs['units'] = dict(zip(data['columns'], data['units']))
+        return df
+
+    @staticmethod
+    def __first_index(names):
+        index = dict()
+        for i, name in enumerate(names):
+            index.setdefault(name, i)
+        return index
+
+
+class _TableCollector(HTMLParser):
+    """collects the cell texts of every table with a tableid attribute"""
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.tables = dict()
+        self._rows = None
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attributes):
+        if tag == 'table':
+            self._rows = None
+            for name, value in attributes:
+                if name == 'tableid':
+                    self._rows = self.tables.setdefault(value, list())
+                    break
+        elif self._rows is None:
+            return
+        elif tag == 'tr':
+            self._row = list()
+            self._rows.append(self._row)
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = list()
+
+    def handle_endtag(self, tag):
+        if self._rows is None:
+            return
+        if tag in ('td', 'th') and self._cell is not None:
+            self._row.append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+        elif tag == 'tr':
+            self._row = None
+        elif tag == 'table':
+            self._rows = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
@@ -1,116 +1,174 @@
 import BuildSimHubAPI as bsh_api
+from BuildSimHubAPI.postprocess.parametric_descriptor import decode_descriptors
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 
 class DataRequester(object):
     def __init__(self):
         '''
+        Collect the parametric results of one or many studies into one table
 
-        :param request_data:
-        :type request_data: RequestData
+        The data is kept per study: the case descriptions of a study are decoded once, every metric
+        is a column aligned on the cases of the study. The table is assembled (one concat of all the
+        studies) when it is read.
         '''
+        # (project_api_key, model_api_key) -> study, see __study
+        self._studies = OrderedDict()
         self._df = None
 
     def get_df(self):
+        if self._df is None and len(self._studies) > 0:
+            frames = list()
+            for study in self._studies.values():
+                size = len(study['descriptions'])
+                columns = OrderedDict()
+                for name, values in study['metrics'].items():
+                    if len(values) < size:
+                        # cases found after the metric was retrieved have no value
+                        values = np.append(values, np.full(size - len(values), np.nan))
+                    columns[name] = values
+                frames.append(pd.concat([study['params'].reset_index(drop=True),
+                                         pd.DataFrame(columns, index=pd.RangeIndex(size))], axis=1))
+            self._df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True, sort=False)
         return self._df
 
-    def add_column_with_request(self, project_api_key, model_api_key, request, base_url=None):
-        if base_url is None:
-            bsh = bsh_api.BuildSimHubAPIClient()
-        else:
-            bsh = bsh_api.BuildSimHubAPIClient(base_url)
-
-        if not isinstance(request, RequestData):
-            raise Exception('Request data need to be the RequestData')
-
-        param = bsh.parametric_results(project_api_key, model_api_key)
-        results = self.__call_function(request, param)
-        result_unit = param.last_parameter_unit
-        temp_list = results['model']
-        result_dict = dict()
-        for i in range(len(temp_list)):
-            tempstr = results['model'][i]
-            templist = tempstr.split(',')
-            for j in range(len(templist)):
-                pair = templist[j].split(": ")
-                key = pair[0].strip()
-                if key not in result_dict:
-                    result_dict[key] = []
-                result_dict[key].append(pair[1])
-        temp_list = results['value']
-        temp_name = request.name + ' (' + result_unit + ')'
-        result_dict[temp_name] = []
-        for i in range(len(temp_list)):
-            result_dict[temp_name].append(temp_list[i])
-
-        if self._df is None:
-            self._df = pd.DataFrame(result_dict)
-        else:
+    def add_column_with_request(self, project_api_key, model_api_key, request, base_url=None, max_workers=4):
+        """
+        Add metric columns to the data of a parametric study
 
-            temp_df = pd.DataFrame(result_dict)
-            self._df[temp_name] = temp_df[temp_name]
-            print(self._df.to_string())
+        :param project_api_key:
+        :param model_api_key:
+        :param request: a RequestData or a list of RequestData, they are requested concurrently
+        :param base_url:
+        :param max_workers: maximum number of requests in flight
+        :return:
+        """
+        self.__retrieve(project_api_key, [model_api_key], request, base_url, max_workers)
 
     def retrieve_headers(self):
-        return list(self._df)
+        return list(self.get_df())
 
     def set_datatype_num(self, headers):
-        self._df[headers] = self._df[headers].apply(pd.to_numeric, errors='coerce')
+        """
+        Convert the columns to numbers, the values that are not numbers are NaN
 
-    def retrieve_data(self, project_api_key, model_api_key, request, base_url=None):
+        :param headers: the column names
+        """
+        for study in self._studies.values():
+            for header in headers:
+                if header in study['metrics']:
+                    study['metrics'][header] = pd.to_numeric(study['metrics'][header], errors='coerce')
+                elif header in study['params']:
+                    study['params'][header] = pd.to_numeric(study['params'][header], errors='coerce')
+        self._df = None
+
+    def retrieve_data(self, project_api_key, model_api_key, request, base_url=None, max_workers=4):
         """
         Retrieve the data from different parametric models with the same set of
         parameters (no guarantee that different parameters will be working)
 
+        The rows of every study are appended to the table, the metrics of a study
+        retrieved again are added to its rows
+
         :param project_api_key:
-        :param model_api_key:
-        :param request
+        :param model_api_key: a model api key or a list of them
+        :param request: a RequestData or a list of RequestData
         :param base_url:
+        :param max_workers: maximum number of requests in flight, the studies and metrics are requested concurrently
         :return:
         """
+        if not isinstance(model_api_key, (list, tuple)):
+            model_api_key = [model_api_key]
+        self.__retrieve(project_api_key, model_api_key, request, base_url, max_workers)
+
+    def data_describe(self):
+        df = self.get_df()
+        if df is None:
+            return 'No data available'
+        else:
+            return df.describe(include='all')
+
+    def __retrieve(self, project_api_key, model_api_keys, request, base_url, max_workers):
         if base_url is None:
             bsh = bsh_api.BuildSimHubAPIClient()
         else:
             bsh = bsh_api.BuildSimHubAPIClient(base_url)
 
-        if not isinstance(request, RequestData):
-            raise Exception('Request data need to be the RequestData')
-
-        param = bsh.parametric_results(project_api_key, model_api_key)
-
-        results = self.__call_function(request, param)
-        result_unit = param.last_parameter_unit
-
-        temp_list = results['model']
-        result_dict = dict()
-        for i in range(len(temp_list)):
-            tempstr = results['model'][i]
-            templist = tempstr.split(',')
-            for j in range(len(templist)):
-                pair = templist[j].split(": ")
-                key = pair[0].strip()
-                if key not in result_dict:
-                    result_dict[key] = []
-                result_dict[key].append(pair[1])
-        temp_list = results['value']
-        temp_name = request.name + ' (' + result_unit + ')'
-        result_dict[temp_name] = []
-        for i in range(len(temp_list)):
-            result_dict[temp_name].append(temp_list[i])
-
-        if self._df is None:
-            self._df = pd.DataFrame(result_dict)
-        else:
-            base_df = self._df
-            temp_df = pd.DataFrame(result_dict)
-            self._df = pd.concat([base_df, temp_df], ignore_index=True)
+        requests = request if isinstance(request, (list, tuple)) else [request]
+        for r in requests:
+            if not isinstance(r, RequestData):
+                raise Exception('Request data need to be the RequestData')
 
-    def data_describe(self):
-        if self._df is None:
-            return 'No data available'
-        else:
-            return self._df.describe(include='all')
+        def fetch(task):
+            # one ParametricModel per request - the unit is kept on the object
+            param = bsh.parametric_results(project_api_key, task[0])
+            results = self.__call_function(task[1], param)
+            return results, param.last_parameter_unit
+
+        tasks = [(model_api_key, r) for model_api_key in model_api_keys for r in requests]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+            fetched = list(executor.map(fetch, tasks))
+
+        for (model_api_key, r), (results, result_unit) in zip(tasks, fetched):
+            if not results:
+                print('No ' + r.name + ' results of ' + model_api_key)
+                continue
+            study = self.__study(project_api_key, model_api_key)
+            rows = self.__rows(study, results['model'])
+            # the values are kept as returned, with the dtype pandas gives them - set_datatype_num converts them
+            returned = pd.Series(results['value']).to_numpy()
+            if len(rows) == len(study['descriptions']):
+                values = np.empty(len(rows), dtype=returned.dtype)
+            else:
+                # the cases of the study the metric has no value for
+                values = np.full(len(study['descriptions']), np.nan, dtype=np.result_type(returned.dtype, float))
+            values[rows] = returned
+            study['metrics'][r.name + ' (' + result_unit + ')'] = values
+        self._df = None
+
+    def __study(self, project_api_key, model_api_key):
+        key = (project_api_key, model_api_key)
+        study = self._studies.get(key)
+        if study is None:
+            study = {
+                # (description, occurrence) -> row
+                'cases': dict(),
+                'descriptions': list(),
+                # the decoded parameters, one row per case
+                'params': pd.DataFrame(),
+                # metric column name -> values, one per case
+                'metrics': OrderedDict()
+            }
+            self._studies[key] = study
+        return study
+
+    @staticmethod
+    def __rows(study, descriptions):
+        """the rows of the cases, the cases not seen before are added to the study"""
+        cases = study['cases']
+        rows = list()
+        new_descriptions = list()
+        occurrences = dict()
+        for description in descriptions:
+            occurrence = occurrences.get(description, 0)
+            occurrences[description] = occurrence + 1
+            row = cases.get((description, occurrence))
+            if row is None:
+                row = cases[(description, occurrence)] = len(study['descriptions'])
+                study['descriptions'].append(description)
+                new_descriptions.append(description)
+            rows.append(row)
+        if len(new_descriptions) > 0:
+            params = decode_descriptors(new_descriptions)
+            if len(study['params']) == 0:
+                study['params'] = params
+            else:
+                study['params'] = pd.concat([study['params'], params], ignore_index=True, sort=False)
+        return np.array(rows, dtype=np.int64)
 
     @staticmethod
     def __call_function(request, parametric):
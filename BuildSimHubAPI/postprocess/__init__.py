@@ -4,6 +4,10 @@ from .file_util import save_file
 from .bldg_load import BuildingLoad
 from .one_zone_load import OneZoneLoad
 from .hourly_data_plot import HourlyPlot
+from .hourly_series import HourlySeries
+from .eso_reader import EsoReader
+from .parametric_descriptor import decode_descriptors
+from .parametric_descriptor import parse_descriptor
 from .html_table_plot import HTMLTable
 from .model_list import ModelList
 from .monthly_data import MonthlyTable
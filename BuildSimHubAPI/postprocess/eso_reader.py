@@ -0,0 +1,328 @@
+"""
+Reader of a local EnergyPlus ESO file (Model.get_simulation_results('eso', dest=path)).
+
+The file is memory-mapped. The first open scans the data section once and keeps an index of the
+line offsets of every report variable next to the file (eplusout.eso -> eplusout.eso.idx.npz).
+The values of a variable are then read from its own lines only, a multi-GB sub-hourly
+ESO is not parsed again for every query.
+"""
+import os
+import mmap
+import datetime
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    print('numpy is not installed')
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# report frequency -> id of the time stamp record of the data lines
+TIME_RECORDS = {'Each Call': 2, 'TimeStep': 2, 'Hourly': 2, 'Daily': 3, 'Monthly': 4, 'RunPeriod': 5, 'Annual': 6}
+ENVIRONMENT_RECORD = 1
+
+END_OF_DICTIONARY = b'End of Data Dictionary'
+END_OF_DATA = b'End of Data'
+
+# the ids of the data lines are scanned this many bytes at a time
+SCAN_CHUNK = 64 * 1024 * 1024
+# the longest report variable id read by the scan
+ID_DIGITS = 8
+
+
+class EsoReader(object):
+
+    def __init__(self, path, index_path=None):
+        """
+        Open an ESO file
+
+        ESO files don't record the year, see time_index
+
+        :param path: the ESO file
+        :param index_path: optional, the index file, path + '.idx.npz' if None.
+            False keeps the index in memory only
+        :type path: str
+        :type index_path: str
+        """
+        self._path = path
+        if index_path is None:
+            index_path = path + '.idx.npz'
+        self._index_path = index_path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._variables = OrderedDict()
+        data_start = self.__read_dictionary()
+        # line offsets of the data section, grouped by id and in file order within an id
+        self._ids, self._starts, self._offsets = self.__load_index(data_start)
+        self._environments = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def variables(self):
+        """id -> {'key': key value, 'name': variable name, 'unit': unit, 'frequency': e.g. Hourly}"""
+        return self._variables
+
+    def find(self, name, key=None):
+        """
+        :param name: the variable name, e.g. Site Outdoor Air Drybulb Temperature or Electricity:Facility
+        :param key: optional, the key value, e.g. Environment or a zone name, any key if None
+        :return: the ids of the matching variables
+        :rtype: list
+        """
+        found = list()
+        for variable_id, variable in self._variables.items():
+            if variable['name'].lower() != name.lower():
+                continue
+            if key is not None and variable['key'].lower() != key.lower():
+                continue
+            found.append(variable_id)
+        return found
+
+    def environments(self):
+        """the titles of the environments (design days, run periods) in the file"""
+        if self._environments is None:
+            self._environments = [self.__line(offset).split(b',')[1].decode('utf-8', 'replace').strip()
+                                  for offset in self.__lines(ENVIRONMENT_RECORD)]
+        return list(self._environments)
+
+    def values(self, variable, environment=None):
+        """
+        The values of a report variable, only its lines are read
+
+        :param variable: the id, or 'key:name' or the name if it is unique
+        :param environment: optional, the index or the title of an environment, all if None
+        :return: float64 array, False if the variable is not found
+        """
+        variable_id = self.__variable_id(variable)
+        if variable_id is False:
+            return False
+        offsets = self.__environment_lines(variable_id, environment)
+        if offsets is False:
+            return False
+        return np.array([self.__line(offset).split(b',', 2)[1] for offset in offsets], dtype=np.float64)
+
+    def time_index(self, variable, environment=None, year=2018):
+        """
+        The start of every reported interval of a variable
+
+        :param variable: the id, or 'key:name' or the name if it is unique
+        :param environment: optional, the index or the title of an environment, all if None
+        :param year: the year of the time stamps
+        :return: datetime64 array, False for run period and annual variables
+        """
+        variable_id = self.__variable_id(variable)
+        if variable_id is False:
+            return False
+        frequency = self._variables[variable_id]['frequency']
+        if frequency not in TIME_RECORDS or TIME_RECORDS[frequency] in (TIME_RECORDS['RunPeriod'],
+                                                                        TIME_RECORDS['Annual']):
+            print('No time stamps for the ' + frequency + ' variable ' + str(variable))
+            return False
+        offsets = self.__environment_lines(variable_id, environment)
+        if offsets is False:
+            return False
+
+        time_record = TIME_RECORDS[frequency]
+        time_offsets = self.__lines(time_record)
+        # every data line follows its time stamp line
+        stamps = time_offsets[np.searchsorted(time_offsets, offsets) - 1]
+        index = list()
+        for offset in stamps:
+            fields = self.__line(offset).split(b',')
+            if time_record == TIME_RECORDS['Monthly']:
+                index.append(np.datetime64(datetime.date(year, int(fields[2]), 1), 's'))
+                continue
+            start = np.datetime64(datetime.date(year, int(fields[2]), int(fields[3])), 's')
+            if time_record == TIME_RECORDS['Hourly']:
+                minutes = (int(fields[5]) - 1) * 60 + int(float(fields[6]))
+                start = start + np.timedelta64(minutes * 60, 's')
+            index.append(start)
+        return np.array(index, dtype='datetime64[s]')
+
+    def pandas_df(self, variables, environment=None, year=2018):
+        """
+        :param variables: the variables, see values. They share the frequency of the first one
+        :param environment: optional, the index or the title of an environment, all if None
+        :param year: the year of the time stamps
+        :return: DataFrame with a timestamp column and one column per variable,
+            the units are in frame.attrs['units']
+        """
+        if pd is None:
+            print('pandas is not installed')
+            return None
+        index = self.time_index(variables[0], environment, year)
+        if index is False:
+            return False
+        df = pd.DataFrame({'timestamp': index})
+        units = dict()
+        for variable in variables:
+            values = self.values(variable, environment)
+            if values is False:
+                return False
+            if len(values) != len(index):
+                print('Cannot add ' + str(variable) + ', ' + str(len(values)) + ' values to ' +
+                      str(len(index)) + ' time stamps')
+                return False
+            df[variable] = values
+            units[variable] = self._variables[self.__variable_id(variable)]['unit']
+        df.attrs['units'] = units
+        return df
+
+    def __variable_id(self, variable):
+        if isinstance(variable, int):
+            if variable in self._variables:
+                return variable
+            print('No report variable ' + str(variable))
+            return False
+        found = self.find(variable)
+        if len(found) == 0 and ':' in variable:
+            key, name = variable.split(':', 1)
+            found = self.find(name, key)
+        if len(found) == 1:
+            return found[0]
+        if len(found) == 0:
+            print('No report variable ' + variable)
+        else:
+            print('Report variable ' + variable + ' matches ' + str(len(found)) + ' variables, use key:name or the id')
+        return False
+
+    def __environment_lines(self, variable_id, environment):
+        offsets = self.__lines(variable_id)
+        if environment is None:
+            return offsets
+        titles = self.environments()
+        if not isinstance(environment, int):
+            if environment not in titles:
+                print('No environment ' + str(environment) + ' in ' + str(titles))
+                return False
+            environment = titles.index(environment)
+        bounds = np.append(self.__lines(ENVIRONMENT_RECORD), len(self._mm))
+        return offsets[(offsets > bounds[environment]) & (offsets < bounds[environment + 1])]
+
+    def __lines(self, record_id):
+        i = np.searchsorted(self._ids, record_id)
+        if i == len(self._ids) or self._ids[i] != record_id:
+            return np.array([], dtype=np.int64)
+        return self._offsets[self._starts[i]:self._starts[i + 1]]
+
+    def __line(self, offset):
+        end = self._mm.find(b'\n', offset)
+        if end < 0:
+            end = len(self._mm)
+        return self._mm[offset:end]
+
+    def __read_dictionary(self):
+        # the data dictionary is short, it is parsed on every open
+        self._mm.seek(0)
+        self._mm.readline()
+        for line in iter(self._mm.readline, b''):
+            if line.startswith(END_OF_DICTIONARY):
+                return self._mm.tell()
+            if b'!' not in line:
+                continue
+            definition, frequency = line.decode('utf-8', 'replace').split('!', 1)
+            fields = definition.strip().split(',')
+            variable_id = int(fields[0])
+            if variable_id in TIME_RECORDS.values() or variable_id == ENVIRONMENT_RECORD:
+                continue
+            if len(fields) > 3:
+                key, name = fields[2], ','.join(fields[3:])
+            else:
+                # meters don't have a key value
+                key, name = '', fields[2]
+            unit = ''
+            if '[' in name:
+                name, unit = name.rsplit('[', 1)
+                unit = unit.rstrip('] ')
+            self._variables[variable_id] = {'key': key.strip(), 'name': name.strip(), 'unit': unit,
+                                            'frequency': frequency.split('[')[0].strip()}
+        print('No data dictionary in ' + self._path)
+        return len(self._mm)
+
+    def __signature(self):
+        stat = os.stat(self._path)
+        return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    def __load_index(self, data_start):
+        signature = self.__signature()
+        if self._index_path and os.path.exists(self._index_path):
+            try:
+                with np.load(self._index_path) as index:
+                    if np.array_equal(index['signature'], signature):
+                        return index['ids'], index['starts'], index['offsets']
+            except (IOError, OSError, ValueError, KeyError) as e:
+                print('Ignored the ESO index ' + self._index_path + ': ' + str(e))
+
+        line_ids, offsets = self.__scan(data_start)
+        order = np.argsort(line_ids, kind='stable')
+        line_ids = line_ids[order]
+        offsets = offsets[order]
+        ids, starts = np.unique(line_ids, return_index=True)
+        starts = np.append(starts, len(offsets)).astype(np.int64)
+
+        if self._index_path:
+            try:
+                # np.savez adds .npz to a path without it
+                temp_path = self._index_path + '.' + str(os.getpid()) + '.tmp.npz'
+                np.savez(temp_path, signature=signature, ids=ids, starts=starts, offsets=offsets)
+                os.replace(temp_path, self._index_path)
+            except (IOError, OSError) as e:
+                print('Could not write the ESO index ' + self._index_path + ': ' + str(e))
+        return ids, starts, offsets
+
+    def __scan(self, data_start):
+        """the id and the offset of every line of the data section, vectorized by chunk"""
+        buf = np.frombuffer(self._mm, dtype=np.uint8)
+        end = self._mm.find(b'\n' + END_OF_DATA, data_start)
+        end = len(buf) if end < 0 else end + 1
+        powers = 10 ** np.arange(ID_DIGITS, dtype=np.int64)
+
+        line_ids = list()
+        offsets = list()
+        position = data_start
+        while position < end:
+            chunk = buf[position:min(position + SCAN_CHUNK, end)]
+            newlines = np.flatnonzero(chunk == 10)
+            if position + len(chunk) < end and len(newlines) > 0:
+                # the last line of the chunk is scanned with the next one
+                chunk = chunk[:newlines[-1] + 1]
+            starts = np.concatenate(([0], newlines + 1))
+            starts = starts[starts < len(chunk)]
+
+            # the leading digits of every line up to the comma
+            window = chunk[np.minimum(starts[:, None] + np.arange(ID_DIGITS + 1), len(chunk) - 1)]
+            digits = (window >= 48) & (window <= 57)
+            length = np.argmin(digits, axis=1)
+            valid = (length > 0) & (window[np.arange(len(starts)), length] == 44)
+            columns = np.arange(ID_DIGITS)
+            inside = columns < length[:, None]
+            exponent = np.where(inside, length[:, None] - 1 - columns, 0)
+            values = np.where(inside, (window[:, :ID_DIGITS].astype(np.int64) - 48) * powers[exponent], 0).sum(axis=1)
+
+            line_ids.append(values[valid])
+            offsets.append(starts[valid].astype(np.int64) + position)
+            position += len(chunk)
+        if len(line_ids) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        return np.concatenate(line_ids), np.concatenate(offsets)
@@ -6,7 +6,7 @@ It is required to have the latest plotly python package in your python.
 
 """
 import os
-import datetime as datetime
+from .hourly_series import HourlySeries
 
 try:
     import pandas as pd
@@ -31,23 +31,11 @@ class HourlyPlot(object):
         self._data = data['data']
         self._col_unit_dict = dict()
 
-        data_list = list()
-
-        # create data dictionary
-        for j in range(len(self._data)):
-            data_dict = dict()
-            data_time = self._data[j]
-
-            time_step = data_time['timestamp']
-            format_time = self.__date_time_str(time_step)
-            date = datetime.datetime.strptime(format_time, '%m/%d/%Y %H:%M:%S')
-            # col_list.append(date)
-            data_dict['timestamp'] = date
-            data_dict[variable_name] = float(data_time['value'])
-            data_list.append(data_dict)
+        # the values and the timestamps are decoded column wise
+        self._series = HourlySeries(data, variable_name)
 
         self._col_unit_dict[variable_name] = self._unit_prime
-        self._df = pd.DataFrame(data_list)
+        self._df = self._series.pandas_df()
 
     def add_column(self, data, variable_name):
         resolution = data['resolution']
@@ -71,18 +59,19 @@ class HourlyPlot(object):
         else:
             self._col_unit_dict[variable_name] = self._unit_prime
 
-        data_list = list()
-        data_array = data['data']
-        for i in range(len(data_array)):
-            data_list.append(float(data_array[i]['value']))
-
-        self._df[variable_name] = data_list
+        if not self._series.add_column(data, variable_name):
+            return False
+        self._df[variable_name] = self._series.values(variable_name)
         return True
 
     def pandas_df(self):
         """get the data in pandas dataframe"""
         return self._df
 
+    def series(self):
+        """get the data as an HourlySeries"""
+        return self._series
+
     def heat_map_plot(self, image_name="test", color_scale='Viridis'):
         """Plotly heat map plot
         Only plot the first column data
@@ -172,24 +161,3 @@ class HourlyPlot(object):
         fig = dict(data=data, layout=layout)
         plot(fig, filename=dir + '/' + image_name + '.html')
 
-    @staticmethod
-    def __date_time_str(dt):
-        """
-        reformat the date_tiem string
-        example: 1/1/2018 01:00:00 -> 1/1/2018 00:00:00
-        :param dt:
-        :return:
-        """
-
-        date_time_item = dt.split(' ')
-        date_str = date_time_item[0]
-
-        time_str = date_time_item[1]
-        time_item = time_str.split(':')
-
-        hr = time_item[0]
-        hr_int = int(hr)
-        hr_int = hr_int-1
-
-        return date_str + ' ' + str(hr_int)+':' + time_item[1] + ':' + time_item[2]
-
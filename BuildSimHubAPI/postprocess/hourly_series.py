@@ -0,0 +1,160 @@
+"""
+Columnar time series of the hourly data results (Model.hourly_data).
+
+The values of every variable are held in one NumPy array and the timestamp index is generated
+from the first timestamp and the time step of the data, instead of parsing every record.
+Hourly, sub-hourly and daily annual data load at array speed.
+"""
+import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    print('numpy is not installed')
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+class HourlySeries(object):
+
+    def __init__(self, data, variable_name=''):
+        """
+        Construct an hourly series
+
+        The timestamps of EnergyPlus mark the end of each interval (1/1/2018 01:00:00 is the first hour),
+        the index of the series marks the start of each interval (1/1/2018 00:00:00).
+
+        :param data: returned from Model.hourly_data
+        :param variable_name: the name of the column
+        """
+        self._resolution = data['resolution']
+        self._category = data.get('category')
+        self._columns = list()
+        self._values = dict()
+        self._units = dict()
+
+        records = data['data']
+        self._index = self.__time_index([record['timestamp'] for record in records])
+        self.__add(variable_name, records, data['unit'])
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def category(self):
+        return self._category
+
+    @property
+    def index(self):
+        """the start of every interval, numpy datetime64 array"""
+        return self._index
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def units(self):
+        """column -> unit"""
+        return dict(self._units)
+
+    def __len__(self):
+        return len(self._index)
+
+    def values(self, variable_name):
+        """
+        :return: the values of a column, numpy float array
+        """
+        return self._values[variable_name]
+
+    def unit(self, variable_name):
+        return self._units[variable_name]
+
+    def add_column(self, data, variable_name):
+        """
+        Add a variable with the same resolution and run period
+
+        :param data: returned from Model.hourly_data
+        :param variable_name: the name of the column
+        :return: True if added, False otherwise
+        """
+        if data['resolution'] != self._resolution:
+            print("Cannot add data resolution " + data['resolution'] + " to the primary data resolution: " +
+                  self._resolution)
+            return False
+        if len(data['data']) != len(self._index):
+            print("Cannot add " + str(len(data['data'])) + " records to a series of " + str(len(self._index)))
+            return False
+        self.__add(variable_name, data['data'], data['unit'])
+        return True
+
+    def pandas_df(self):
+        """
+        :return: DataFrame with a timestamp column and one column per variable
+        """
+        if pd is None:
+            print('pandas is not installed')
+            return None
+        df = pd.DataFrame({'timestamp': self._index})
+        for column in self._columns:
+            df[column] = self._values[column]
+        return df
+
+    def to_memmap(self, path):
+        """
+        Move the values into a memory-mapped file, one float64 column per variable.
+        values() returns views of the file afterwards
+
+        :param path: the file, it is overwritten
+        :return: records x columns array
+        :rtype: numpy.memmap
+        """
+        array = np.memmap(path, dtype=np.float64, mode='w+', shape=(len(self._index), len(self._columns)))
+        for i, column in enumerate(self._columns):
+            array[:, i] = self._values[column]
+            self._values[column] = array[:, i]
+        array.flush()
+        return array
+
+    def __add(self, variable_name, records, unit):
+        values = np.array([record['value'] for record in records], dtype=np.float64)
+        if variable_name not in self._values:
+            self._columns.append(variable_name)
+        self._values[variable_name] = values
+        self._units[variable_name] = unit
+
+    @classmethod
+    def __time_index(cls, timestamps):
+        count = len(timestamps)
+        if count == 0:
+            return np.array([], dtype='datetime64[s]')
+        first = cls.__end_time(timestamps[0])
+        if count == 1:
+            return np.array([first - np.timedelta64(1, 'h')], dtype='datetime64[s]')
+
+        step = cls.__end_time(timestamps[1]) - first
+        # one annual (or run period) series at a constant step - check a few records before generating it
+        index = first + np.arange(count) * step
+        for i in (count // 2, count - 1):
+            if cls.__end_time(timestamps[i]) != index[i]:
+                # irregular steps (e.g. monthly data or several run periods) - parse every record
+                index = np.array([cls.__end_time(timestamp) for timestamp in timestamps], dtype='datetime64[s]')
+                break
+        return index - step
+
+    @staticmethod
+    def __end_time(timestamp):
+        """parse m/d/Y H:M:S, the hour goes up to 24"""
+        date_str, time_str = timestamp.strip().split(' ', 1)
+        month, day, year = date_str.split('/')
+        time_item = time_str.split(':')
+        seconds = int(time_item[0]) * 3600 + int(time_item[1]) * 60
+        if len(time_item) > 2:
+            seconds += int(time_item[2])
+        date = datetime.date(int(year), int(month), int(day))
+        return np.datetime64(date, 's') + np.timedelta64(seconds, 's')
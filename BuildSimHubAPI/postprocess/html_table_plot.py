@@ -9,6 +9,7 @@ import os
 import math
 
 try:
+    import numpy as np
     import pandas as pd
 except ImportError:
     pd = None
@@ -26,38 +27,74 @@ class HTMLTable(object):
 
         self._data = data['data']['array']
 
-        # construct the 2d dictionary - col - row - val
-        data_dict = dict(dict())
-        self._unit_dict = dict(dict())
-        for i in range(len(self._data)):
-            js = self._data[i]
-            row = js['row']
-            col = js['col']
-            val_str = js['value']
-            if 'unit' in js:
-                unit = js['unit']
-            else:
-                unit = ''
-
-            if row.isspace():
-                continue
-            if col.isspace():
-                continue
-
+        # the rows, cols and cells are numbered as they come, blank labels are dropped
+        row_labels = np.array([js['row'] for js in self._data], dtype=object)
+        col_labels = np.array([js['col'] for js in self._data], dtype=object)
+        row_codes, rows = pd.factorize(row_labels)
+        col_codes, cols = pd.factorize(col_labels)
+        records = np.flatnonzero(~(self.__blank(rows)[row_codes] | self.__blank(cols)[col_codes]))
+        if len(records) < len(self._data):
+            row_codes, rows = pd.factorize(row_labels[records])
+            col_codes, cols = pd.factorize(col_labels[records])
+        cells = row_codes * len(cols) + col_codes
+        # a cell takes the place of its first record and the value of its last one
+        unique_cells, first = np.unique(cells, return_index=True)
+        last = len(cells) - 1 - np.unique(cells[::-1], return_index=True)[1]
+        order = np.argsort(first)
+        cell_rows, cell_cols = np.divmod(unique_cells[order], len(cols))
+        cell_records = records[last[order]]
+
+        cell_data = [self._data[i] for i in cell_records.tolist()]
+        values = np.array([js['value'] for js in cell_data], dtype=object)
+        units = np.array([js.get('unit', '') for js in cell_data], dtype=object)
+
+        # the order of DataFrame.from_dict(orient='index') on the row x col dictionaries:
+        # the cols as they come row after row, the rows as they come col after col
+        col_order = pd.unique(cell_cols[np.argsort(cell_rows, kind='stable')])
+        col_pos = np.empty(len(cols), dtype=np.int64)
+        col_pos[col_order] = np.arange(len(col_order))
+        row_order = pd.unique(cell_rows[np.lexsort((cell_rows, col_pos[cell_cols]))])
+        row_pos = np.empty(len(rows), dtype=np.int64)
+        row_pos[row_order] = np.arange(len(row_order))
+        index = list(rows[row_order])
+        columns = list(cols[col_order])
+        grid_rows = row_pos[cell_rows]
+        grid_cols = col_pos[cell_cols]
+
+        # the values are float as float(value) gives them, 'nan' included, a col with any text
+        # is kept as objects, the text and the float values
+        numbers = np.full((len(index), len(columns)), np.nan)
+        texts = dict()
+        for k in range(len(columns)):
+            in_col = grid_cols == k
             try:
-                val = float(val_str)
-            except ValueError:
-                val = val_str
-
-            if row not in data_dict:
-                data_dict[row] = dict()
-            data_dict[row][col] = val
-
-            if row not in self._unit_dict:
-                self._unit_dict[row] = dict()
-            self._unit_dict[row][col] = unit
-
-        self._df = pd.DataFrame.from_dict(data_dict, orient='index')
+                numbers[grid_rows[in_col], k] = values[in_col].astype(float)
+            except (TypeError, ValueError):
+                texts[columns[k]] = self.__text_column(len(index), grid_rows[in_col], values[in_col])
+        self._df = pd.DataFrame(numbers, index=index, columns=columns)
+        for col, column in texts.items():
+            self._df[col] = column
+
+        grid = np.full((len(index), len(columns)), np.nan, dtype=object)
+        grid[grid_rows, grid_cols] = units
+        self._units = pd.DataFrame(grid, index=index, columns=columns)
+        # the unit of a row is the one of its first cell
+        first = np.unique(cell_rows, return_index=True)[1]
+        self._row_units = dict(zip(rows[cell_rows[first]], units[first]))
+
+    @staticmethod
+    def __blank(labels):
+        return np.array([str(label).isspace() for label in labels], dtype=bool)
+
+    @staticmethod
+    def __text_column(size, rows, values):
+        column = np.full(size, np.nan, dtype=object)
+        for row, value in zip(rows, values):
+            try:
+                column[row] = float(value)
+            except (TypeError, ValueError):
+                column[row] = value
+        return column
 
     def pandas_df(self):
         return self._df
@@ -67,15 +104,12 @@ class HTMLTable(object):
             raise Exception("No cell or col or row is specified.")
 
         if col_name is None and row_name is not None:
-            unit_row_dict = self._unit_dict[row_name]
-            for k, v in unit_row_dict.items():
-                return v
+            return self._row_units[row_name]
 
         if row_name is None and col_name is not None:
-            for k, v in self._unit_dict.items():
-                return self._unit_dict[k][col_name]
+            return self._units[col_name].iloc[0]
 
-        return self._unit_dict[row_name][col_name]
+        return self._units.at[row_name, col_name]
 
     def table_bar_chart_plot(self, orientation='column', title='Table bar plot', image_name='bar_table', skip_rows=None,
                              skip_cols=None):
@@ -100,13 +134,11 @@ class HTMLTable(object):
                 col_name_list = []
                 row_val_list = []
 
-                for index, row in self._df.iterrows():
+                for index, row_val in self._df[col].items():
                     # skip this row
                     if skip_rows is not None and index in skip_rows:
                         continue
 
-                    row_val = row[col]
-
                     # only include the none zero values
                     if isinstance(row_val, str):
                         row_val = 0
@@ -116,7 +148,7 @@ class HTMLTable(object):
                     else:
                         continue
 
-                    unit_temp = self._unit_dict[index][col]
+                    unit_temp = self._units.at[index, col]
                     if unit == '':
                         unit = unit_temp
                         col_sum = row_val
@@ -161,7 +193,7 @@ class HTMLTable(object):
                         continue
 
                     # exclude different unit col
-                    unit_temp = self._unit_dict[index][col]
+                    unit_temp = self._units.at[index, col]
                     if unit == '':
                         unit = unit_temp
                         row_sum = row_val
@@ -234,12 +266,11 @@ class HTMLTable(object):
                 col_name_list = []
                 row_val_list = []
 
-                for index, row in self._df.iterrows():
+                for index, row_val in self._df[col].items():
                     # skip this row
                     if skip_rows is not None and index in skip_rows:
                         continue
                     # only include the none zero values
-                    row_val = row[col]
 
                     if isinstance(row_val, str):
                         row_val = 0
@@ -249,7 +280,7 @@ class HTMLTable(object):
                     else:
                         continue
 
-                    unit_temp = self._unit_dict[index][col]
+                    unit_temp = self._units.at[index, col]
                     if unit == '':
                         unit = unit_temp
                         col_sum = row_val
@@ -304,7 +335,7 @@ class HTMLTable(object):
                         continue
 
                     # exclude different unit col
-                    unit_temp = self._unit_dict[index][col]
+                    unit_temp = self._units.at[index, col]
                     if unit == '':
                         unit = unit_temp
                         row_sum = row_val
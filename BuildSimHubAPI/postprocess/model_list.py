@@ -8,6 +8,7 @@ to pandas dataframe
 It is required for pandas dataframe
 """
 import os
+from .parametric_descriptor import decode_descriptors
 
 try:
     import pandas as pd
@@ -32,17 +33,7 @@ class ModelList(object):
 
         :return:
         """
-        param_list = list()
-        for index, row in self._df.iterrows():
-            msg = row['commit_msg']
-            parameters = msg.split(",")
-            data_dict = dict()
-            for k in range(len(parameters)):
-                title, val = parameters[k].split(":")
-                # for cases like on off options
-                data_dict[title.strip()] = float(val.strip())
-            param_list.append(data_dict)
-        parameter_df = pd.DataFrame(param_list)
+        parameter_df = decode_descriptors(self._df['commit_msg'], index=self._df.index)
         return pd.concat([self._df, parameter_df], axis=1)
 
 
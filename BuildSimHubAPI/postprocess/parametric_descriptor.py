@@ -0,0 +1,122 @@
+"""
+Decoder of the case descriptions of a parametric study, e.g. 'WWR: 0.3, LPD: 5.5, Shade: On'.
+
+All the cases of a study share the parameter names (the schema, taken from the first description),
+and every parameter takes a few values only. The descriptions are split with one vectorized
+str.split, then only the distinct 'name: value' parts of each parameter are parsed and typed
+(On / Off become 1 / 0, numeric columns become floats). Descriptions with other parameters are
+parsed one by one, missing descriptions (None) give a row of NaN.
+"""
+from collections import OrderedDict
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    pd = None
+    print('pandas is not installed')
+
+# for cases like on off options
+ON_OFF = {'On': '1', 'Off': '0'}
+
+
+def parse_descriptor(description):
+    """
+    Parse one case description
+
+    :param description: e.g. WWR: 0.3, LPD: 5.5, Shade: On
+    :return: parameter -> value text, in the order of the description
+    :rtype: OrderedDict
+    """
+    parameters = OrderedDict()
+    for parameter in description.split(','):
+        if ':' not in parameter:
+            continue
+        title, val = parameter.split(':', 1)
+        parameters[title.strip()] = val.strip()
+    return parameters
+
+
+def decode_descriptors(descriptions, index=None):
+    """
+    Decode the case descriptions of a study into one typed column per parameter
+
+    Example:
+        decode_descriptors(['WWR: 0.3, Shade: On', 'WWR: 0.4, Shade: Off'])
+           WWR  Shade
+        0  0.3      1
+        1  0.4      0
+
+    :param descriptions: the case descriptions (the model field of the parametric results, or commit messages)
+    :param index: optional, the index of the DataFrame
+    :return: DataFrame with a column per parameter, in the order of the first description.
+        On / Off are 1 / 0, a column is float if all its values are numbers, text otherwise.
+        The row of a missing description (None) is NaN
+    :rtype: pandas.DataFrame
+    """
+    series = pd.Series(list(descriptions), dtype=object)
+    if index is not None:
+        series.index = index
+
+    # repeated descriptions are decoded once
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return pd.DataFrame(index=series.index)
+    frame = _decode_unique(pd.Series(uniques, dtype=object))
+    # the missing descriptions (code -1) take the appended row of NaN
+    frame = frame.reindex(range(len(uniques) + 1))
+    frame = frame.iloc[np.where(codes < 0, len(uniques), codes)]
+    frame.index = series.index
+    return frame
+
+
+def _decode_unique(series):
+    keys = tuple(parse_descriptor(series.iloc[0]).keys())
+    if len(keys) == 0 or len(set(keys)) != len(keys):
+        # the descriptions can't follow one schema
+        frame = pd.DataFrame([parse_descriptor(d) for d in series], index=series.index)
+    else:
+        parts = series.str.split(',', expand=True)
+        # a description matches the schema if its parts are the parameters of the schema, in order
+        matched = np.ones(len(series), dtype=bool)
+        if parts.shape[1] > len(keys):
+            matched &= parts.iloc[:, len(keys):].isna().all(axis=1).values
+        columns = OrderedDict()
+        for i, key in enumerate(keys):
+            if i >= parts.shape[1]:
+                matched[:] = False
+                break
+            part_codes, part_values = pd.factorize(parts[i])
+            names = list()
+            values = list()
+            for part in part_values:
+                title, val = part.split(':', 1) if ':' in part else ('', None)
+                names.append(title.strip())
+                values.append(None if val is None else val.strip())
+            # the missing parts (code -1) are taken from the appended None
+            names.append(None)
+            values.append(None)
+            matched &= np.array(names, dtype=object)[part_codes] == key
+            columns[key] = np.array(values, dtype=object)[part_codes]
+        frame = pd.DataFrame(columns, index=series.index, columns=list(keys))
+
+        # the cases with other parameters
+        unmatched = ~matched
+        if unmatched.any():
+            others = pd.DataFrame([parse_descriptor(d) for d in series[unmatched]], index=series.index[unmatched])
+            frame = pd.concat([frame[matched], others], sort=False).reindex(series.index)
+
+    for column in frame.columns:
+        frame[column] = _typed(frame[column])
+    return frame
+
+
+def _typed(column):
+    """the column as numbers, with On / Off as 1 / 0, unchanged if some of the values are not numbers"""
+    codes, values = pd.factorize(column)
+    values = pd.Series(values, dtype=object).replace(ON_OFF)
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.notna().all():
+        # the missing values (code -1) are NaN
+        return pd.Series(np.append(numbers.values.astype(np.float64), np.nan)[codes], index=column.index)
+    return pd.Series(np.append(values.values, None)[codes], index=column.index, dtype=object)
@@ -6,6 +6,7 @@ It is required to have the latest plotly python package in your python.
 
 """
 import os
+from .parametric_descriptor import decode_descriptors
 
 try:
     import pandas as pd
@@ -20,36 +21,26 @@ class ParametricPlot(object):
         """
         Construct parametric plot
 
-        :param data: returned from the parametric result call
+        :param data: returned from the parametric result call, or the records
+            yielded by ParametricModel.iter_results
         :param unit:
         """
-        self._value = data['value']
+        if isinstance(data, dict):
+            self._value = data['value']
+            self._model_plot = data['model_plot']
+            self._model_des = data['model']
+        else:
+            self._value = list()
+            self._model_plot = list()
+            self._model_des = list()
+            for record in data:
+                self._value.append(record['value'])
+                self._model_des.append(record['model'])
+                self._model_plot.append(record['model_plot'])
         self._unit = unit
 
-        self._model_plot = data['model_plot']
-        self._model_des = data['model']
-
-        data_list = list()
-
-        # create data dictionary
-        for j in range(len(self._model_des)):
-            col_list = self._model_des[j]
-            parameters = col_list.split(",")
-            data_dict = dict()
-            for k in range(len(parameters)):
-                title, val = parameters[k].split(":")
-                # for cases like on off options
-                if val.strip() == 'Off':
-                    val = '0'
-                if val.strip() == 'On':
-                    val = '1'
-
-                data_dict[title.strip()] = val.strip()
-            # data_dict['Value'] = self._value[j]
-
-            data_list.append(data_dict)
-
-        self._df = pd.DataFrame(data_list, index=self._model_plot)
+        # one column per parameter, on off options are 1 / 0
+        self._df = decode_descriptors(self._model_des, index=self._model_plot)
         self._df['Value'] = self._value
 
     def pandas_df(self):
@@ -4,11 +4,11 @@ in the BuildSim cloud.
 """
 
 import BuildSimHubAPI as bshapi
+from BuildSimHubAPI.postprocess.parametric_descriptor import decode_descriptors
 import plotly.graph_objs as go
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-import pandas as pd
 from sklearn import linear_model
 
 # USER INPUTS
@@ -65,27 +65,11 @@ def cost(x_pred):
 
 
 def convert_parajson_pandas(result_dict):
-    for i in range(len(result_dict)):
-        tempstr = result_dict["value"]
-
-    dict = {}
+    df = decode_descriptors(result_dict['model'])
     for key in result_dict:
-        if key == "model":
-            templist = result_dict[key]
-            tempdict = {}
-            for i in range(len(templist)):
-                tempstr = result_dict["model"][i]
-                templist = tempstr.split(',')
-                for j in range(len(templist)):
-                    pair = templist[j].split(': ')
-                    if pair[0] not in tempdict:
-                        tempdict[pair[0]] = []
-                    tempdict[pair[0]].append(pair[1])
-            for subkey in tempdict:
-                dict[subkey] = tempdict[subkey]
-        elif key != 'model_plot':
-            dict[key] = result_dict[key]
-    return pd.DataFrame(dict)
+        if key not in ('model', 'model_plot'):
+            df[key] = result_dict[key]
+    return df
 
 
 def generate_parametric_dict(models):
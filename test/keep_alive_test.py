@@ -0,0 +1,81 @@
+"""
+This example checks that the requests survive a server that closes its idle keep-alive connections,
+no BuildSimHub account is needed: it starts a local HTTP/1.1 server with a 0.5 s keep-alive timeout
+and sends a GET then a POST after a longer pause, with httpurllib then with async_httpurllib
+"""
+import json
+import time
+import asyncio
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    # python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from BuildSimHubAPI.helpers import httpurllib
+from BuildSimHubAPI.helpers import async_httpurllib
+from BuildSimHubAPI.helpers import get_connection_pool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # the idle connection is closed by the server after this many seconds
+    timeout = 0.5
+
+    def do_GET(self):
+        self.__reply()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.__reply()
+
+    def __reply(self):
+        body = json.dumps({'status': 'success', 'method': self.command}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+server = ThreadingServer(('127.0.0.1', 0), KeepAliveHandler)
+threading.Thread(target=server.serve_forever).start()
+url = 'http://127.0.0.1:%d/' % server.server_address[1]
+
+try:
+    pool = get_connection_pool()
+    pool.reset_stats()
+    print(httpurllib.request_get(url + 'GET_API', {'a': 1}).json())
+    # longer than the keep-alive timeout of the server, shorter than the idle timeout of the pool
+    time.sleep(1.5)
+    resp = httpurllib.request_post(url + 'POST_API', {'a': 1})
+    print(resp.status_code, resp.json())
+    assert resp.status_code == 200
+    # two new connections, the closed one is not reused
+    print(pool.stats())
+    assert pool.stats()['hits'] == 0
+
+    # the same with the asyncio transport
+    async def get_then_post():
+        transport = async_httpurllib.AsyncTransport()
+        print((await async_httpurllib.request_get(url + 'GET_API', {'a': 1}, transport)).json())
+        await asyncio.sleep(1.5)
+        return await async_httpurllib.request_post(url + 'POST_API', {'a': 1}, transport=transport)
+
+    resp = asyncio.run(get_then_post())
+    print(resp.status_code, resp.json())
+    assert resp.status_code == 200
+finally:
+    server.shutdown()
+    server.server_close()
@@ -3,7 +3,7 @@ Author: Weili Xu
 """
 import time
 import BuildSimHubAPI as bsh_api
-import pandas as pd
+from BuildSimHubAPI.postprocess.parametric_descriptor import decode_descriptors
 import numpy as np
 from sklearn import linear_model
 import scipy.optimize as opt
@@ -29,27 +29,11 @@ def pretty_print_linear(coefs, names=None, sort=False):
 
 
 def convert_parajson_pandas(result_dict):
-    for i in range(len(result_dict)):
-        tempstr = result_dict["value"]
-
-    dict = {}
+    df = decode_descriptors(result_dict['model'])
     for key in result_dict:
-        if key == "model":
-            templist = result_dict[key]
-            tempdict = {}
-            for i in range(len(templist)):
-                tempstr = result_dict["model"][i]
-                templist = tempstr.split(',')
-                for j in range(len(templist)):
-                    pair = templist[j].split(': ')
-                    if pair[0] not in tempdict:
-                        tempdict[pair[0]] = []
-                    tempdict[pair[0]].append(pair[1])
-            for subkey in tempdict:
-                dict[subkey] = tempdict[subkey]
-        elif key != 'model_plot':
-            dict[key] = result_dict[key]
-    return pd.DataFrame(dict)
+        if key not in ('model', 'model_plot'):
+            df[key] = result_dict[key]
+    return df
 
 
 def window_wall_ratio_cost(val):